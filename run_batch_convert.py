@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""
+Launcher script cho batch thermal conversion (headless)
+Ví dụ: python run_batch_convert.py input.mp4 output.avi -j 8
+"""
+
+import sys
+import os
+
+# Add thermal_scanner to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+thermal_scanner_path = os.path.join(current_dir, 'thermal_scanner')
+sys.path.insert(0, thermal_scanner_path)
+
+# Import và chạy batch converter
+from batch_convert import main
+
+if __name__ == "__main__":
+    sys.exit(main())
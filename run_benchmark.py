@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""
+Launcher script cho benchmark các stage xử lý frame
+Ví dụ: python run_benchmark.py -r vga --baseline benchmark_baseline.json
+"""
+
+import sys
+import os
+
+# Add thermal_scanner to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+thermal_scanner_path = os.path.join(current_dir, 'thermal_scanner')
+sys.path.insert(0, thermal_scanner_path)
+
+# Import và chạy benchmark
+from benchmark import main
+
+if __name__ == "__main__":
+    sys.exit(main())
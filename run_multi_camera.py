@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""
+Launcher script cho multi-camera mode (headless)
+Ví dụ: python run_multi_camera.py 0 1 2 --duration 30 --output tiles.png
+"""
+
+import sys
+import os
+
+# Add thermal_scanner to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+thermal_scanner_path = os.path.join(current_dir, 'thermal_scanner')
+sys.path.insert(0, thermal_scanner_path)
+
+# Import và chạy multi-camera manager
+from multi_camera import main
+
+if __name__ == "__main__":
+    sys.exit(main())
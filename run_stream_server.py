@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""
+Launcher script cho MJPEG streaming server (headless)
+Ví dụ: python run_stream_server.py 0 --port 8080  (mở http://127.0.0.1:8080/)
+"""
+
+import sys
+import os
+
+# Add thermal_scanner to path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+thermal_scanner_path = os.path.join(current_dir, 'thermal_scanner')
+sys.path.insert(0, thermal_scanner_path)
+
+# Import và chạy streaming server
+from streaming import main
+
+if __name__ == "__main__":
+    sys.exit(main())
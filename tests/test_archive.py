@@ -0,0 +1,134 @@
+"""
+Tests cho raw intensity archive
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+# Add thermal_scanner to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'thermal_scanner'))
+
+from archive import ArchiveSource, ArchiveWriter, FrameArchive
+from camera_handler import ThermalCameraHandler
+from frame_source import SyntheticSource, open_frame_source
+from palette import apply_lut, build_day_lut
+
+
+class TestFrameArchive(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'scan.tca')
+        rng = np.random.default_rng(0)
+        self.frames = [rng.integers(0, 256, (24, 32), dtype=np.uint8) for _ in range(5)]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, frames, **kwargs):
+        writer = ArchiveWriter(self.path, 32, 24, **kwargs)
+        for i, frame in enumerate(frames):
+            writer.append(frame, timestamp=10.0 + i, brightness=float(frame.mean()), is_low_light=i % 2)
+        writer.close()
+
+    def test_roundtrip_and_metadata(self):
+        self.write(self.frames)
+        archive = FrameArchive(self.path)
+        self.assertEqual(len(archive), 5)
+        for i, frame in enumerate(self.frames):
+            np.testing.assert_array_equal(archive[i], frame)
+        np.testing.assert_array_equal(archive.metadata['seq'], np.arange(5))
+        np.testing.assert_array_equal(archive.metadata['is_low_light'], [0, 1, 0, 1, 0])
+        self.assertEqual(archive.find(12.5), 3)
+        archive.close()
+
+    def test_random_access_is_zero_copy(self):
+        self.write(self.frames)
+        archive = FrameArchive(self.path)
+        frame = archive[3]
+        self.assertFalse(frame.flags.owndata)
+        self.assertTrue(np.shares_memory(frame, archive.records))
+        archive.close()
+
+    def test_append_and_truncated_record(self):
+        self.write(self.frames[:2])
+        # Record ghi dở bị bỏ khi mở lại
+        with open(self.path, 'ab') as f:
+            f.write(b'\x01' * 100)
+        self.assertEqual(len(FrameArchive(self.path)), 2)
+
+        self.write(self.frames[2:])
+        archive = FrameArchive(self.path)
+        self.assertEqual(len(archive), 5)
+        np.testing.assert_array_equal(archive[4], self.frames[4])
+
+        with self.assertRaises(ValueError):
+            ArchiveWriter(self.path, 16, 16)
+
+    def test_render_reapplies_palette(self):
+        self.write(self.frames)
+        archive = FrameArchive(self.path)
+        lut = build_day_lut()
+        np.testing.assert_array_equal(archive.render(1, lut), apply_lut(self.frames[1], lut))
+
+    def test_uint16_archive(self):
+        frame = np.arange(24 * 32, dtype=np.uint16).reshape(24, 32) * 80
+        writer = ArchiveWriter(self.path, 32, 24, dtype=np.uint16)
+        writer.append(frame)
+        writer.close()
+        archive = FrameArchive(self.path)
+        self.assertEqual(archive.dtype, np.uint16)
+        np.testing.assert_array_equal(archive[0], frame)
+
+    def test_append_after_close_is_ignored(self):
+        writer = ArchiveWriter(self.path, 32, 24)
+        writer.append(self.frames[0])
+        writer.close()
+        self.assertIsNone(writer.append(self.frames[1]))
+        self.assertEqual(len(FrameArchive(self.path)), 1)
+
+    def test_archive_closed_mid_frame_keeps_rendered_frame(self):
+        handler = ThermalCameraHandler()
+        handler.start_archive(self.path)
+        bgr = np.dstack([self.frames[0]] * 3)
+        expected = handler._process_frame(bgr).copy()
+
+        # stop_archive() chạy giữa lúc worker lấy archive và lúc append
+        archive = handler.archive
+        archive.close()
+        np.testing.assert_array_equal(handler._process_frame(bgr), expected)
+        self.assertEqual(archive.count, 1)
+
+        # Lỗi archive chỉ được log, không thay frame bằng fallback
+        archive.append = None
+        np.testing.assert_array_equal(handler._process_frame(bgr), expected)
+        handler.stop_archive()
+
+    def test_handler_archive_replay(self):
+        handler = ThermalCameraHandler(frame_source=SyntheticSource(64, 48, num_frames=6))
+        handler.start_archive(self.path)
+        self.assertTrue(handler.start_capture())
+        handler.wait(timeout=10)
+        handler.stop_capture()
+
+        archive = FrameArchive(self.path)
+        self.assertEqual(len(archive), 6)
+        self.assertEqual((archive.width, archive.height), (64, 48))
+
+        # Phát lại archive qua thermal pipeline
+        source = open_frame_source(self.path)
+        self.assertIsInstance(source, ArchiveSource)
+        replay = ThermalCameraHandler(frame_source=source)
+        frames = []
+        self.assertTrue(replay.start_capture(frames.append))
+        replay.wait(timeout=10)
+        replay.stop_capture()
+        self.assertEqual(len(frames), 6)
+        self.assertEqual(frames[0].shape, (48, 64, 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+"""
+Tests cho batch thermal conversion
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+import cv2
+import numpy as np
+
+# Add thermal_scanner to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'thermal_scanner'))
+
+import batch_convert
+from batch_convert import FrameWriter, _init_worker, _process_in_worker, convert, parse_args
+from frame_source import SyntheticSource, open_frame_source
+
+
+class DimmingSource(SyntheticSource):
+    """Synthetic source tối dần để có cả frame day và night"""
+
+    def read(self, image=None):
+        ret, frame = super().read(image)
+        if ret and self.frame_index > self.num_frames // 2:
+            frame //= 6
+        return ret, frame
+
+
+def read_outputs(directory):
+    """Đọc image sequence output theo thứ tự tên file"""
+    return [cv2.imread(os.path.join(directory, name)) for name in sorted(os.listdir(directory))]
+
+
+class TestBatchConvert(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def run_convert(self, name, workers, num_frames=12):
+        source = DimmingSource(64, 48, num_frames=num_frames)
+        source.open()
+        output = os.path.join(self.tmp.name, name)
+        writer = FrameWriter(output)
+        try:
+            stats = convert(source, writer, workers=workers)
+        finally:
+            writer.close()
+        return stats, read_outputs(output)
+
+    def test_output_independent_of_worker_count(self):
+        _, sequential = self.run_convert('j1', workers=1)
+        _, parallel = self.run_convert('j3', workers=3)
+        self.assertEqual(len(sequential), len(parallel))
+        for index, (expected, actual) in enumerate(zip(sequential, parallel)):
+            np.testing.assert_array_equal(actual, expected, err_msg=f"frame {index}")
+
+    def test_frame_count(self):
+        stats, outputs = self.run_convert('count', workers=2, num_frames=9)
+        self.assertEqual(stats['frames'], 9)
+        self.assertEqual(stats['workers'], 2)
+        self.assertEqual(len(outputs), 9)
+        self.assertTrue(all(frame.shape == (48, 64, 3) for frame in outputs))
+
+    def test_output_order_with_workers(self):
+        _, outputs = self.run_convert('order', workers=3)
+
+        # Xử lý tuần tự từng frame trong process này làm chuẩn
+        _init_worker(None, None)
+        self.addCleanup(setattr, batch_convert, '_worker_handler', None)
+        source = DimmingSource(64, 48, num_frames=12)
+        source.open()
+        for index, actual in enumerate(outputs):
+            _, frame = source.read()
+            np.testing.assert_array_equal(actual, _process_in_worker(frame), err_msg=f"frame {index}")
+
+    def test_cheap_night_backend_is_worker_independent(self):
+        def run(name, workers):
+            source = DimmingSource(64, 48, num_frames=12)
+            source.open()
+            writer = FrameWriter(os.path.join(self.tmp.name, name))
+            convert(source, writer, workers=workers, night_backend='bilateral')
+            return read_outputs(writer.output)
+
+        for expected, actual in zip(run('bilateral_j1', 1), run('bilateral_j3', 3)):
+            np.testing.assert_array_equal(actual, expected)
+
+
+class TestParseArgs(unittest.TestCase):
+    def test_unknown_palette_is_rejected(self):
+        self.assertEqual(parse_args(['in', 'out', '--day-palette', 'jet']).day_palette, 'jet')
+        for option in ('--day-palette', '--night-palette'):
+            with contextlib.redirect_stderr(io.StringIO()) as stderr, self.assertRaises(SystemExit) as cm:
+                parse_args(['in', 'out', option, 'no_such_palette'])
+            self.assertEqual(cm.exception.code, 2)
+            self.assertIn('no_such_palette', stderr.getvalue())
+
+
+class TestFrameWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.frames = [np.full((48, 64, 3), value, dtype=np.uint8) for value in (0, 80, 160)]
+
+    def test_image_directory(self):
+        output = os.path.join(self.tmp.name, 'images')
+        writer = FrameWriter(output, image_ext='png')
+        for frame in self.frames:
+            writer.write(frame)
+        writer.close()
+
+        self.assertFalse(writer.is_video)
+        self.assertEqual(sorted(os.listdir(output)),
+                         ['thermal_000000.png', 'thermal_000001.png', 'thermal_000002.png'])
+        for frame, actual in zip(self.frames, read_outputs(output)):
+            np.testing.assert_array_equal(actual, frame)
+
+    def test_video_file(self):
+        output = os.path.join(self.tmp.name, 'thermal.avi')
+        writer = FrameWriter(output, fps=10.0)
+        for frame in self.frames:
+            writer.write(frame)
+        writer.close()
+
+        self.assertTrue(writer.is_video)
+        self.assertEqual(writer.count, 3)
+        with self.assertRaises(ValueError):
+            writer.next_path()
+        source = open_frame_source(output)
+        self.assertTrue(source.open())
+        decoded = []
+        while True:
+            ret, frame = source.read()
+            if not ret:
+                break
+            decoded.append(frame)
+        self.assertEqual(len(decoded), 3)
+        for frame, actual in zip(self.frames, decoded):
+            self.assertEqual(actual.shape, frame.shape)
+            # MJPG là lossy: chỉ so độ sáng trung bình
+            self.assertAlmostEqual(float(actual.mean()), float(frame.mean()), delta=3.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+"""
+Tests cho benchmark harness
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+# Add thermal_scanner to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'thermal_scanner'))
+
+from benchmark import build_stages, compare, main, run_benchmark, synthetic_frame
+from camera_handler import ThermalCameraHandler
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_run_reports_every_stage(self):
+        report = run_benchmark({'tiny': (64, 48)}, iterations=2, warmup=1,
+                               stages=['process_frame', 'display_convert', 'enhance_low_light:clahe'])
+        stages = report['results']['tiny']
+        self.assertEqual(set(stages), {'process_frame', 'display_convert', 'enhance_low_light:clahe'})
+        for timing in stages.values():
+            self.assertGreater(timing['ms'], 0)
+            self.assertGreater(timing['fps'], 0)
+
+    def test_motion_stage_sees_motion(self):
+        handler = ThermalCameraHandler()
+        stages = build_stages(handler, synthetic_frame(64, 48), synthetic_frame(64, 48, brightness=0.15))
+        for _ in range(6):
+            stages['motion_overlay']()
+        # Frame luân phiên -> motion layer thấy chuyển động thật
+        self.assertGreater(handler.motion_layer.get_energy(), 0)
+
+    def test_compare_flags_regressions(self):
+        baseline = {'results': {'vga': {'a': {'ms': 10.0}, 'b': {'ms': 0.01}}}}
+        report = {'results': {'vga': {'a': {'ms': 13.0}, 'b': {'ms': 0.03}, 'new': {'ms': 5.0}}}}
+        # 'b' chậm gấp 3 nhưng chênh lệch dưới ngưỡng nhiễu
+        self.assertEqual(compare(report, baseline, tolerance=0.25), [('vga', 'a', 10.0, 13.0)])
+        self.assertEqual(compare(report, baseline, tolerance=0.5), [])
+
+    def test_main_fails_on_regression(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'baseline.json')
+            args = ['-r', 'qvga', '-n', '2', '--warmup', '0', '--stage', 'create_day_thermal']
+            self.assertEqual(main(args + ['--save-baseline', path]), 0)
+
+            with open(path) as f:
+                baseline = json.load(f)
+            baseline['results']['qvga']['create_day_thermal']['ms'] = 1e-6
+            with open(path, 'w') as f:
+                json.dump(baseline, f)
+            self.assertEqual(main(args + ['--baseline', path, '--tolerance', '0']), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
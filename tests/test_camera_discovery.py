@@ -0,0 +1,215 @@
+"""
+Tests cho camera discovery và reconnect
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+# Add thermal_scanner to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'thermal_scanner'))
+
+from camera_discovery import CameraCache, discover_camera, probe_cameras
+from camera_handler import ThermalCameraHandler
+from frame_source import SyntheticSource
+
+
+class FakeCamera(SyntheticSource):
+    """Camera giả: chỉ một số index mở được, có thể mở chậm"""
+
+    is_live = True
+
+    def __init__(self, index, backend=None, available=(), delay=0.0):
+        super().__init__(32, 24)
+        self.index = index
+        self.backend = backend
+        self.available = available
+        self.delay = delay
+        self.released = threading.Event()
+
+    def open(self):
+        time.sleep(self.delay)
+        return self.index in self.available and super().open()
+
+    def release(self):
+        super().release()
+        self.released.set()
+
+
+class FlakyCamera(SyntheticSource):
+    """Camera live mất kết nối sau vài frame, mở lại được sau vài lần thử"""
+
+    is_live = True
+
+    def __init__(self, fail_after=5, failed_opens=2):
+        super().__init__(32, 24)
+        self.fail_after = fail_after
+        self.failed_opens = failed_opens
+        self.opens = 0
+
+    def open(self):
+        self.opens += 1
+        # Lần mở đầu tiên luôn thành công, sau đó lỗi failed_opens lần
+        if 1 < self.opens <= 1 + self.failed_opens:
+            return False
+        return super().open()
+
+    def read(self, image=None):
+        if self.opens == 1 and self.frame_index >= self.fail_after:
+            return False, None
+        return super().read(image)
+
+
+class TestProbeCameras(unittest.TestCase):
+    def test_prefers_candidate_order_and_releases_others(self):
+        created = {}
+
+        def factory(index, backend):
+            created[index] = FakeCamera(index, backend, available=(1, 2), delay=0.05 * (3 - index))
+            return created[index]
+
+        start = time.perf_counter()
+        source = probe_cameras([(0, None), (1, None), (2, None)], factory, timeout=2.0)
+        # Song song: tổng thời gian ~ probe chậm nhất, không phải tổng các probe
+        self.assertLess(time.perf_counter() - start, 0.25)
+        self.assertEqual(source.index, 1)
+        self.assertTrue(created[2].released.wait(1.0))
+        self.assertFalse(created[1].released.is_set())
+
+    def test_slow_probe_times_out(self):
+        def factory(index, backend):
+            return FakeCamera(index, backend, available=(0, 1), delay=1.0 if index == 0 else 0.0)
+
+        start = time.perf_counter()
+        source = probe_cameras([(0, None), (1, None)], factory, timeout=0.2)
+        self.assertLess(time.perf_counter() - start, 0.6)
+        self.assertEqual(source.index, 1)
+
+    def test_backends_of_same_index_are_probed_sequentially(self):
+        lock = threading.Lock()
+        active = {}
+        overlaps = []
+        opened = []
+
+        class TrackingCamera(FakeCamera):
+            def open(self):
+                with lock:
+                    active[self.index] = active.get(self.index, 0) + 1
+                    if active[self.index] > 1:
+                        overlaps.append(self.index)
+                try:
+                    result = super().open()
+                finally:
+                    with lock:
+                        active[self.index] -= 1
+                opened.append((self.index, self.backend))
+                return result
+
+        def factory(index, backend):
+            # Backend mặc định của index 0 lỗi, backend 'dshow' mở được
+            available = (0,) if backend == 'dshow' else ()
+            return TrackingCamera(index, backend, available=available, delay=0.05)
+
+        source = probe_cameras([(0, None), (1, None), (0, 'dshow')], factory, timeout=2.0)
+        self.assertEqual((source.index, source.backend), (0, 'dshow'))
+        self.assertEqual(overlaps, [])
+        self.assertEqual([probe for probe in opened if probe[0] == 0], [(0, None), (0, 'dshow')])
+
+    def test_later_backends_skipped_once_index_opens(self):
+        probed = []
+
+        def factory(index, backend):
+            probed.append((index, backend))
+            return FakeCamera(index, backend, available=(0,))
+
+        source = probe_cameras([(0, None), (0, 'dshow')], factory, timeout=2.0)
+        self.assertEqual((source.index, source.backend), (0, None))
+        self.assertEqual(probed, [(0, None)])
+
+
+class TestDiscoverCamera(unittest.TestCase):
+    def test_cache_is_tried_first(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = CameraCache(os.path.join(tmp, 'camera.json'))
+            probed = []
+
+            def factory(index, backend):
+                probed.append(index)
+                return FakeCamera(index, backend, available=(2,))
+
+            candidates = [(0, None), (1, None), (2, None)]
+            self.assertEqual(discover_camera(cache=cache, candidates=candidates, factory=factory).index, 2)
+            self.assertEqual(cache.load(), (2, None))
+
+            probed.clear()
+            self.assertEqual(discover_camera(cache=cache, candidates=candidates, factory=factory).index, 2)
+            self.assertEqual(probed, [2])
+
+
+class TestReconnect(unittest.TestCase):
+    def test_capture_loop_reconnects_with_backoff(self):
+        camera = FlakyCamera()
+        handler = ThermalCameraHandler(frame_source=camera)
+        handler.max_read_failures = 2
+        handler.reconnect_delay = 0.01
+        handler.set_target_fps(100)
+        self.assertTrue(handler.start_capture())
+        try:
+            deadline = time.time() + 5.0
+            while time.time() < deadline and (handler.reconnects < 1 or camera.frame_index < 10):
+                time.sleep(0.02)
+            self.assertEqual(handler.reconnects, 1)
+            self.assertEqual(camera.opens, 4)
+            self.assertTrue(handler.is_running)
+            self.assertFalse(handler.reconnecting)
+            self.assertGreaterEqual(camera.frame_index, 10)
+        finally:
+            handler.stop_capture()
+
+    def test_source_reopened_after_stop_is_released(self):
+        handler = ThermalCameraHandler(frame_source=None)
+
+        class StoppingCamera(FakeCamera):
+            def open(self):
+                # stop_capture chạy trong lúc source đang được mở lại
+                handler.is_running = False
+                return super().open()
+
+        camera = StoppingCamera(0, available=(0,))
+        handler.frame_source = camera
+        handler.is_running = True
+        self.assertIsNone(handler._reconnect(camera))
+        self.assertIsNone(handler.source)
+        self.assertFalse(camera.is_opened())
+        self.assertEqual(handler.reconnects, 0)
+
+
+class TestCameraIndex(unittest.TestCase):
+    def discover_cache(self, handler):
+        calls = []
+
+        def fake_discover(*args, **kwargs):
+            calls.append(kwargs)
+            return None
+
+        with mock.patch('camera_handler.discover_camera', fake_discover):
+            handler.initialize_camera()
+        return calls[0]
+
+    def test_cache_used_without_explicit_index(self):
+        handler = ThermalCameraHandler()
+        self.assertIs(self.discover_cache(handler)['cache'], handler.camera_cache)
+
+    def test_explicit_index_skips_cache(self):
+        handler = ThermalCameraHandler(camera_index=1)
+        kwargs = self.discover_cache(handler)
+        self.assertIsNone(kwargs['cache'])
+        self.assertEqual(kwargs['candidates'][0], (1, None))
+
+
+if __name__ == '__main__':
+    unittest.main()
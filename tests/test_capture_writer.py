@@ -0,0 +1,94 @@
+"""
+Tests cho background capture writer
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+import cv2
+import numpy as np
+
+# Add thermal_scanner to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'thermal_scanner'))
+
+from camera_handler import ThermalCameraHandler
+from capture_writer import CaptureQueueFull, CaptureWriter
+from frame_source import SyntheticSource
+
+
+class TestCaptureWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.frame = np.random.default_rng(0).integers(0, 255, (24, 32, 3), dtype=np.uint8)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_same_second_names_do_not_collide(self):
+        writer = CaptureWriter(self.tmp.name, encoder='png')
+        futures = [writer.submit(self.frame) for _ in range(5)]
+        paths = [future.result(5) for future in futures]
+        writer.close()
+        self.assertEqual(len(set(paths)), 5)
+        for path in paths:
+            np.testing.assert_array_equal(cv2.imread(path), self.frame)
+
+    def test_npy_encoder_is_lossless(self):
+        writer = CaptureWriter(self.tmp.name, encoder='npy')
+        path = writer.submit(self.frame).result(5)
+        writer.close()
+        self.assertTrue(path.endswith('.npy'))
+        np.testing.assert_array_equal(np.load(path), self.frame)
+
+    def test_callback_receives_path(self):
+        results = []
+        writer = CaptureWriter(self.tmp.name)
+        writer.submit(self.frame, callback=results.append).result(5)
+        writer.close()
+        self.assertEqual(len(results), 1)
+        self.assertTrue(results[0].endswith('.jpg'))
+
+    def test_close_without_wait_does_not_block_when_queue_is_full(self):
+        writer = CaptureWriter(self.tmp.name, encoder='npy', max_queue=2)
+        started, release = threading.Event(), threading.Event()
+        write = writer._write
+
+        def slow_write(frame, directory):
+            started.set()
+            release.wait(5)
+            return write(frame, directory)
+
+        writer._write = slow_write
+        futures = [writer.submit(self.frame)]
+        self.assertTrue(started.wait(5))
+        futures += [writer.submit(self.frame) for _ in range(2)]
+
+        start = time.perf_counter()
+        writer.close(wait=False)
+        self.assertLess(time.perf_counter() - start, 0.5)
+        release.set()
+        writer._thread.join(5)
+        self.assertFalse(writer._thread.is_alive())
+        # Capture cũ nhất trong queue bị bỏ để sentinel vào được
+        self.assertTrue(futures[0].result(5).endswith('.npy'))
+        self.assertIsInstance(futures[1].exception(5), CaptureQueueFull)
+        self.assertTrue(futures[2].result(5).endswith('.npy'))
+
+    def test_handler_burst_capture(self):
+        handler = ThermalCameraHandler(frame_source=SyntheticSource(32, 24, num_frames=10))
+        handler.set_capture_encoder('png')
+        futures = handler.capture_burst(4, save_directory=self.tmp.name)
+        handler.start_capture()
+        handler.wait(timeout=10)
+        handler.stop_capture()
+        paths = [future.result(5) for future in futures]
+        self.assertEqual(len(set(paths)), 4)
+        self.assertTrue(all(os.path.exists(path) for path in paths))
+
+
+if __name__ == "__main__":
+    unittest.main()
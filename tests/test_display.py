@@ -0,0 +1,28 @@
+"""
+Tests cho display presenter (phần không cần Tk display)
+"""
+
+import os
+import sys
+import unittest
+
+# Add thermal_scanner to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'thermal_scanner'))
+
+from display import compute_display_size
+
+
+class TestComputeDisplaySize(unittest.TestCase):
+    def test_default_before_layout(self):
+        self.assertEqual(compute_display_size(1, 1), (1000, 750))
+
+    def test_keeps_aspect_ratio(self):
+        self.assertEqual(compute_display_size(1600, 900), (1190, 890))
+        self.assertEqual(compute_display_size(1200, 1200), (1190, 890))
+
+    def test_minimum_size(self):
+        self.assertEqual(compute_display_size(300, 200), (640, 480))
+
+
+if __name__ == "__main__":
+    unittest.main()
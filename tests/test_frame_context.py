@@ -0,0 +1,41 @@
+"""
+Tests cho per-frame context (gray/normalized/stats dùng chung)
+"""
+
+import os
+import sys
+import unittest
+
+import cv2
+import numpy as np
+
+# Add thermal_scanner to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'thermal_scanner'))
+
+from frame_context import FrameContext, normalize_minmax
+
+
+class TestFrameContext(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.frame = rng.integers(20, 220, size=(48, 64, 3), dtype=np.uint8)
+
+    def test_intermediates_computed_once(self):
+        ctx = FrameContext(self.frame)
+        self.assertIs(ctx.gray, ctx.gray)
+        self.assertIs(ctx.normalized, ctx.normalized)
+        np.testing.assert_array_equal(ctx.gray, cv2.cvtColor(self.frame, cv2.COLOR_BGR2GRAY))
+
+    def test_normalized_matches_opencv_minmax(self):
+        ctx = FrameContext(self.frame)
+        expected = cv2.normalize(ctx.gray, None, 0, 255, cv2.NORM_MINMAX)
+        np.testing.assert_array_equal(ctx.normalized, expected)
+        self.assertAlmostEqual(ctx.brightness, float(ctx.gray.mean()), places=3)
+
+    def test_flat_image_normalizes_to_zero(self):
+        flat = np.full((8, 8), 7, dtype=np.uint8)
+        np.testing.assert_array_equal(normalize_minmax(flat), cv2.normalize(flat, None, 0, 255, cv2.NORM_MINMAX))
+
+
+if __name__ == "__main__":
+    unittest.main()
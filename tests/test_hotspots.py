@@ -0,0 +1,81 @@
+"""
+Tests cho hot spot detection và tracking
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+# Add thermal_scanner to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'thermal_scanner'))
+
+from camera_handler import ThermalCameraHandler
+from hotspots import HotSpotTracker, bbox_iou, detect_hotspots
+
+
+def intensity_map(spots, width=320, height=240):
+    """Intensity nền 50 với các khối (x, y, size, value)"""
+    intensity = np.full((height, width), 50, dtype=np.uint8)
+    for x, y, size, value in spots:
+        intensity[y:y + size, x:x + size] = value
+    return intensity
+
+
+class TestDetectHotspots(unittest.TestCase):
+    def test_top_k_sorted_by_peak(self):
+        intensity = intensity_map([(10, 10, 20, 220), (100, 100, 30, 250), (200, 50, 10, 210),
+                                   (250, 200, 2, 255)])
+        blobs = detect_hotspots(intensity, threshold=200, top_k=2, min_area=16)
+        self.assertEqual([blob['bbox'] for blob in blobs], [(100, 100, 30, 30), (10, 10, 20, 20)])
+        self.assertEqual(blobs[0]['peak'], 250)
+        self.assertEqual(blobs[0]['area'], 900)
+        self.assertAlmostEqual(blobs[1]['mean'], 220)
+
+    def test_iou(self):
+        self.assertAlmostEqual(bbox_iou((0, 0, 10, 10), (5, 0, 10, 10)), 50 / 150)
+        self.assertEqual(bbox_iou((0, 0, 10, 10), (20, 20, 5, 5)), 0.0)
+
+
+class TestHotSpotTracker(unittest.TestCase):
+    def test_track_id_follows_moving_spot(self):
+        tracker = HotSpotTracker(top_k=2, max_missed=1, scale=1.0)
+        events = []
+        tracker.add_listener(events.extend)
+
+        tracker.update(intensity_map([(100, 100, 30, 250)]))
+        tracker.update(intensity_map([(104, 102, 30, 250)]))
+        self.assertEqual([(e['type'], e['track_id']) for e in events], [('appeared', 1), ('updated', 1)])
+        self.assertEqual(tracker.get_hotspots()[0]['bbox'], (104, 102, 30, 30))
+
+        events.clear()
+        tracker.update(intensity_map([]))
+        tracker.update(intensity_map([]))
+        self.assertEqual([(e['type'], e['track_id']) for e in events], [('lost', 1)])
+        self.assertEqual(tracker.get_hotspots(), [])
+
+    def test_handler_reports_frame_coordinates(self):
+        handler = ThermalCameraHandler()
+        handler.motion_overlay = False
+        handler.enable_hotspots(top_k=1)
+        frame = np.repeat(intensity_map([(200, 120, 40, 255)])[:, :, None], 3, axis=2)
+
+        handler._process_frame(frame)
+        full = handler.get_hotspots()[0]['bbox']
+        self.assertEqual(full, (200, 120, 40, 40))
+
+        # ROI + processing scale: tọa độ vẫn theo frame gốc
+        handler.disable_hotspots()
+        handler.enable_hotspots(top_k=1)
+        handler.set_roi((100, 60, 200, 160))
+        handler.set_processing_scale(0.5)
+        handler._process_frame(frame)
+        x, y, w, h = handler.get_hotspots()[0]['bbox']
+        self.assertLessEqual(abs(x - 200), 4)
+        self.assertLessEqual(abs(y - 120), 4)
+        self.assertLessEqual(abs(w - 40), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
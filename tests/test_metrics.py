@@ -0,0 +1,93 @@
+"""
+Tests cho hot-path metrics
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+# Add thermal_scanner to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'thermal_scanner'))
+
+from camera_handler import ThermalCameraHandler
+from frame_source import SyntheticSource
+from metrics import HotPathMetrics, MetricsExporter, RollingHistogram
+
+
+class TestRollingHistogram(unittest.TestCase):
+    def test_percentiles_follow_window(self):
+        histogram = RollingHistogram(window=100)
+        for i in range(100):
+            histogram.record(1.0 if i < 90 else 50.0)
+        snapshot = histogram.snapshot()
+        self.assertAlmostEqual(snapshot['p50'], 1.0, delta=0.15)
+        self.assertAlmostEqual(snapshot['p95'], 50.0, delta=6.0)
+        self.assertEqual(snapshot['max'], 50.0)
+
+        # 100 mẫu mới đẩy hết mẫu cũ ra khỏi cửa sổ
+        for _ in range(100):
+            histogram.record(5.0)
+        snapshot = histogram.snapshot()
+        self.assertAlmostEqual(snapshot['p99'], 5.0, delta=0.6)
+        self.assertAlmostEqual(snapshot['mean'], 5.0)
+        self.assertEqual(snapshot['total'], 200)
+
+
+class TestHotPathMetrics(unittest.TestCase):
+    def test_fps_and_status(self):
+        metrics = HotPathMetrics()
+        for i in range(11):
+            metrics.tick(i * 0.1)
+        metrics.record('read', 0.002)
+        self.assertAlmostEqual(metrics.fps(), 10.0)
+        self.assertRegex(metrics.format_status(), r'^FPS 10\.0 \| read 2\.\d ms')
+
+    def test_exporter_writes_periodic_snapshots(self):
+        metrics = HotPathMetrics()
+        metrics.record('read', 0.004)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'out', 'metrics.jsonl')
+            exporter = MetricsExporter(metrics, path, interval=0.02, extra=lambda: {'camera': 'test'})
+            exporter.start()
+            deadline = time.time() + 5.0
+            while exporter.exported < 2 and time.time() < deadline:
+                time.sleep(0.01)
+            exporter.stop()
+
+            with open(path) as f:
+                snapshots = [json.loads(line) for line in f]
+        # Các snapshot định kỳ + snapshot cuối khi stop
+        self.assertGreaterEqual(len(snapshots), 3)
+        self.assertEqual(len(snapshots), exporter.exported)
+        for snapshot in snapshots:
+            self.assertEqual(snapshot['camera'], 'test')
+            self.assertEqual(snapshot['stages']['read']['total'], 1)
+            self.assertAlmostEqual(snapshot['stages']['read']['last'], 4.0)
+        self.assertLessEqual(snapshots[0]['time'], snapshots[-1]['time'])
+
+    def test_handler_records_stages_and_exports(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'metrics.jsonl')
+            handler = ThermalCameraHandler(frame_source=SyntheticSource(64, 48, num_frames=8))
+            handler.start_metrics_export(path, interval=60)
+            self.assertTrue(handler.start_capture(lambda frame: None))
+            handler.wait(timeout=10)
+            handler.stop_capture()
+
+            stages = handler.metrics.snapshot()['stages']
+            # read tính cả lần đọc cuối báo hết frame
+            self.assertGreaterEqual(stages['read']['total'], 8)
+            for name in ('detect', 'colorize', 'copy', 'callback'):
+                self.assertEqual(stages[name]['total'], 8, name)
+
+            with open(path) as f:
+                snapshot = json.loads(f.readlines()[-1])
+            self.assertIn('pipeline', snapshot)
+            self.assertEqual(snapshot['stages']['colorize']['total'], 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+"""
+Tests cho motion energy layer
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+
+# Add thermal_scanner to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'thermal_scanner'))
+
+from camera_handler import ThermalCameraHandler
+from motion import MotionEnergyLayer
+
+
+def scene(x, width=160, height=120):
+    """Nền tối với một khối sáng ở cột x"""
+    gray = np.full((height, width), 40, dtype=np.uint8)
+    gray[40:80, x:x + 20] = 200
+    return gray
+
+
+class TestMotionEnergyLayer(unittest.TestCase):
+    def test_static_scene_adds_nothing(self):
+        layer = MotionEnergyLayer()
+        intensity = scene(50)
+        out = np.empty_like(intensity)
+        for _ in range(5):
+            result = layer.apply(scene(50), intensity, out)
+        self.assertIs(result, out)
+        np.testing.assert_array_equal(result, intensity)
+
+    def test_moving_object_heats_up_and_decays(self):
+        layer = MotionEnergyLayer()
+        intensity = np.full((120, 160), 100, dtype=np.uint8)
+        out = np.empty_like(intensity)
+        layer.apply(scene(20), intensity, out)
+        layer.apply(scene(100), intensity, out)
+        self.assertGreater(out[60, 110], 100)
+        self.assertEqual(out[5, 5], 100)
+
+        moving = layer.get_energy()
+        background = layer._background
+        for _ in range(10):
+            layer.apply(scene(100), intensity, out)
+        # Cập nhật in-place: không cấp phát lại buffers
+        self.assertIs(layer._background, background)
+        self.assertLess(layer.get_energy(), moving)
+
+    def test_handler_overlay_toggle(self):
+        handler = ThermalCameraHandler()
+        frame = np.repeat(scene(20)[:, :, None], 3, axis=2)
+        moved = np.repeat(scene(100)[:, :, None], 3, axis=2)
+        handler._create_day_thermal(frame)
+        with_motion = handler._create_day_thermal(moved).copy()
+
+        handler.set_motion_overlay(False)
+        without_motion = handler._create_day_thermal(moved)
+        self.assertFalse(np.array_equal(with_motion, without_motion))
+
+
+if __name__ == '__main__':
+    unittest.main()
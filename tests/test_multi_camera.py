@@ -0,0 +1,149 @@
+"""
+Tests cho multi-camera manager
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+import numpy as np
+
+# Add thermal_scanner to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'thermal_scanner'))
+
+from frame_source import SyntheticSource
+from multi_camera import MultiCameraManager, compose_tiles, parse_args
+
+
+class FlakyCamera(SyntheticSource):
+    """Camera live mất kết nối sau vài frame, mở lại được sau vài lần thử"""
+
+    is_live = True
+
+    def __init__(self, fail_after=5, failed_opens=2):
+        super().__init__(32, 24)
+        self.fail_after = fail_after
+        self.failed_opens = failed_opens
+        self.opens = 0
+
+    def open(self):
+        self.opens += 1
+        # Lần mở đầu tiên luôn thành công, sau đó lỗi failed_opens lần
+        if 1 < self.opens <= 1 + self.failed_opens:
+            return False
+        return super().open()
+
+    def read(self, image=None):
+        if self.opens == 1 and self.frame_index >= self.fail_after:
+            return False, None
+        return super().read(image)
+
+
+class TestComposeTiles(unittest.TestCase):
+    def test_grid_layout(self):
+        red = np.zeros((48, 64, 3), dtype=np.uint8)
+        red[..., 2] = 255
+        tiles = compose_tiles([red, None, red], tile_size=(32, 24))
+        self.assertEqual(tiles.shape, (48, 64, 3))
+        self.assertTrue((tiles[:24, :32, 2] == 255).all())
+        self.assertTrue((tiles[:24, 32:] == 0).all())
+        self.assertTrue((tiles[24:, :32, 2] == 255).all())
+
+
+class TestMultiCameraManager(unittest.TestCase):
+    def test_streams_share_worker_pool(self):
+        sources = [SyntheticSource(64, 48, num_frames=12, seed=i) for i in range(3)]
+        manager = MultiCameraManager(sources, workers=2, realtime=False)
+
+        active = {}
+        overlap = []
+        lock = threading.Lock()
+
+        def on_frame(stream_id, thermal):
+            with lock:
+                # Một stream không bao giờ được hai worker xử lý cùng lúc
+                if active.get(stream_id):
+                    overlap.append(stream_id)
+                active[stream_id] = True
+            self.assertEqual(thermal.shape, (48, 64, 3))
+            with lock:
+                active[stream_id] = False
+
+        self.assertEqual(manager.start(on_frame), 3)
+        self.assertTrue(manager.wait(timeout=10))
+        manager.stop()
+
+        self.assertEqual(overlap, [])
+        stats = manager.get_stats()
+        for stream_id in range(3):
+            self.assertEqual(stats[stream_id]['read'], 12)
+            self.assertGreater(stats[stream_id]['presented'], 0)
+            self.assertEqual(stats[stream_id]['presented'] + stats[stream_id]['dropped'], 12)
+            self.assertIsNotNone(manager.get_frame(stream_id))
+
+        self.assertEqual(manager.get_tiled_frame((32, 24)).shape, (48, 64, 3))
+
+    def test_unopenable_source_is_skipped(self):
+        with tempfile.TemporaryDirectory() as empty_dir:
+            # Thư mục không có ảnh -> source không mở được
+            manager = MultiCameraManager([SyntheticSource(32, 24, num_frames=2), empty_dir], realtime=False)
+            self.assertEqual(manager.start(), 1)
+            manager.wait(timeout=5)
+            manager.stop()
+        self.assertIsNone(manager.get_frame(1))
+        self.assertIsNotNone(manager.get_frame(0))
+
+    def test_callback_error_keeps_published_slot(self):
+        def on_frame(stream_id, thermal):
+            raise RuntimeError("callback failed")
+
+        manager = MultiCameraManager([SyntheticSource(32, 24, num_frames=5)], realtime=False)
+        manager.start(on_frame)
+        self.assertTrue(manager.wait(timeout=5))
+        manager.stop()
+
+        stream = manager.streams[0]
+        # Chỉ slot đã publish còn bận, không bị trả về pool hai lần
+        self.assertGreater(stream.presented, 0)
+        self.assertEqual(stream.frame_pool.in_use(), 1)
+        self.assertTrue(stream.get_frame_handle().slot.busy)
+
+    def test_live_camera_reconnects(self):
+        camera = FlakyCamera()
+        manager = MultiCameraManager([camera], fps=100)
+        stream = manager.streams[0]
+        stream.max_read_failures = 2
+        stream.reconnect_delay = 0.01
+        self.assertEqual(manager.start(), 1)
+        try:
+            deadline = time.time() + 5.0
+            while time.time() < deadline and (stream.reconnects < 1 or camera.frame_index < 10):
+                time.sleep(0.02)
+            self.assertEqual(stream.reconnects, 1)
+            self.assertEqual(camera.opens, 4)
+            self.assertTrue(stream.is_running)
+            self.assertGreaterEqual(camera.frame_index, 10)
+        finally:
+            manager.stop()
+
+
+class TestParseArgs(unittest.TestCase):
+    def test_view_accepts_tile_or_index(self):
+        self.assertEqual(parse_args(['synthetic']).view, 'tile')
+        self.assertEqual(parse_args(['synthetic', 'synthetic', '--view', '1']).view, 1)
+
+    def test_invalid_view_is_a_clean_error(self):
+        for view in ('grid', '-1', '2'):
+            with contextlib.redirect_stderr(io.StringIO()) as stderr, self.assertRaises(SystemExit) as cm:
+                parse_args(['synthetic', 'synthetic', '--view', view])
+            self.assertEqual(cm.exception.code, 2)
+            self.assertIn('--view', stderr.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
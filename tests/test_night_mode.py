@@ -0,0 +1,147 @@
+"""
+Tests cho night mode processor
+"""
+
+import os
+import sys
+import unittest
+
+import cv2
+import numpy as np
+
+# Add thermal_scanner to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'thermal_scanner'))
+
+from night_mode import ENHANCEMENT_BACKENDS, LightLevelEstimator, NightModeProcessor, TemporalDenoiser
+
+
+def make_dark_frame(seed=0, height=48, width=64):
+    """Frame tối có noise"""
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 40, size=(height, width, 3), dtype=np.uint8)
+
+
+class TestEnhancementBackends(unittest.TestCase):
+    def test_every_backend_returns_bgr_frame(self):
+        frame = make_dark_frame()
+        for backend in ENHANCEMENT_BACKENDS:
+            processor = NightModeProcessor(enhancement_backend=backend)
+            enhanced = processor.enhance_low_light_image(frame)
+            self.assertEqual(enhanced.shape, frame.shape, backend)
+            self.assertIn(backend, processor.get_backend_costs())
+
+    def test_auto_picks_strongest_backend_within_budget(self):
+        processor = NightModeProcessor(frame_budget=0.02)
+        frame = make_dark_frame()
+        processor.enhance_low_light_image(frame)
+        # Giả lập chi phí đã đo: budget enhancement = 10 ms
+        processor.backend_costs.update({'nlm': 50.0, 'temporal': 12.0, 'bilateral': 8.0, 'clahe': 2.0})
+        processor.enhance_low_light_image(frame)
+        self.assertEqual(processor.active_backend, 'bilateral')
+
+    def test_shape_change_reuses_costs_without_recalibrating(self):
+        processor = NightModeProcessor()
+        calls = []
+        calibrate = processor.calibrate
+        processor.calibrate = lambda gray: calls.append(gray.shape) or calibrate(gray)
+
+        processor.enhance_low_light_image(make_dark_frame(height=96, width=128))
+        full_costs = processor.get_backend_costs()
+        processor.enhance_low_light_image(make_dark_frame(height=48, width=64))
+        processor.enhance_low_light_image(make_dark_frame(height=96, width=128))
+        self.assertEqual(calls, [(96, 128)])
+        # Kích thước mới được ước lượng theo số pixel
+        self.assertLess(processor._shape_costs[(48, 64)]['nlm'], full_costs['nlm'])
+
+    def test_calibrate_skips_nlm_over_budget(self):
+        processor = NightModeProcessor(frame_budget=1e-6)
+        processor._denoise_nlm = lambda gray: self.fail("NLM should not be timed")
+        processor._backends['nlm'] = processor._denoise_nlm
+        costs = processor.calibrate(make_dark_frame()[:, :, 0])
+        self.assertEqual(costs['nlm'], costs['bilateral'])
+
+    def test_invalid_backend_rejected(self):
+        processor = NightModeProcessor(enhancement_backend='clahe')
+        self.assertFalse(processor.set_enhancement_backend('unknown'))
+        self.assertEqual(processor.enhancement_backend, 'clahe')
+
+
+class TestTemporalDenoiser(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        texture = cv2.GaussianBlur(rng.uniform(0, 255, (120, 160)).astype(np.float32), (0, 0), 2)
+        ramp = np.tile(np.linspace(40, 200, 160, dtype=np.float32), (120, 1))
+        self.clean = (0.5 * ramp + 0.5 * texture).astype(np.uint8)
+        self.frames = [np.clip(self.clean + rng.normal(0, 10, self.clean.shape), 0, 255).astype(np.uint8)
+                       for _ in range(30)]
+
+    def rms_error(self, image):
+        return np.sqrt(np.mean((image.astype(np.float64) - self.clean) ** 2))
+
+    def test_beats_per_frame_nlm_on_static_scene(self):
+        denoiser = TemporalDenoiser()
+        for frame in self.frames:
+            output = denoiser.process(frame)
+        nlm = cv2.fastNlMeansDenoising(self.frames[-1], None, 10, 7, 21)
+        self.assertLess(self.rms_error(output), self.rms_error(nlm))
+
+    def test_resets_on_scene_change(self):
+        denoiser = TemporalDenoiser()
+        for frame in self.frames[:5]:
+            denoiser.process(frame)
+        new_scene = 255 - self.clean
+        output = denoiser.process(new_scene)
+        self.assertEqual(denoiser.scene_changes, 1)
+        np.testing.assert_array_equal(output, new_scene)
+
+    def test_writes_into_caller_buffer(self):
+        denoiser = TemporalDenoiser()
+        out = np.empty_like(self.frames[0])
+        self.assertIs(denoiser.process(self.frames[0], out=out), out)
+        # Kết quả không phải buffer nội bộ - frame sau không ghi đè lên nó
+        first = out.copy()
+        second = denoiser.process(self.frames[1])
+        self.assertIsNot(second, out)
+        np.testing.assert_array_equal(out, first)
+
+    def test_in_place_matches_separate_output(self):
+        separate, in_place = TemporalDenoiser(), TemporalDenoiser()
+        for frame in self.frames[:5]:
+            expected = separate.process(frame)
+            gray = frame.copy()
+            np.testing.assert_array_equal(in_place.process(gray, out=gray), expected)
+
+
+class TestLightLevelEstimator(unittest.TestCase):
+    def flat_frame(self, level):
+        return np.full((48, 64, 3), level, dtype=np.uint8)
+
+    def test_measure_matches_full_frame_mean(self):
+        frame = make_dark_frame(height=480, width=640)
+        estimator = LightLevelEstimator(stride=8)
+        full = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY).mean()
+        self.assertAlmostEqual(estimator.measure(frame), full, delta=1.0)
+
+    def test_hysteresis_prevents_flicker(self):
+        events = []
+        estimator = LightLevelEstimator(threshold=60, hysteresis=10, interval=1)
+        estimator.add_listener(lambda is_low_light, brightness: events.append(is_low_light))
+        # Dao động quanh threshold trong dải hysteresis -> không đổi mode
+        for level in [62, 58, 61, 57, 63, 59]:
+            self.assertFalse(estimator.update(self.flat_frame(level)))
+        self.assertTrue(estimator.update(self.flat_frame(50)))
+        for level in [58, 62, 64]:
+            self.assertTrue(estimator.update(self.flat_frame(level)))
+        self.assertFalse(estimator.update(self.flat_frame(70)))
+        self.assertEqual(events, [True, False])
+
+    def test_interval_skips_reevaluation(self):
+        estimator = LightLevelEstimator(threshold=60, interval=5)
+        self.assertTrue(estimator.update(self.flat_frame(10)))
+        for _ in range(4):
+            self.assertTrue(estimator.update(self.flat_frame(200)))
+        self.assertFalse(estimator.update(self.flat_frame(200)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+"""
+Tests cho các normalization strategies
+"""
+
+import os
+import sys
+import unittest
+
+import cv2
+import numpy as np
+
+# Add thermal_scanner to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'thermal_scanner'))
+
+from camera_handler import ThermalCameraHandler
+from normalization import IntensityNormalizer
+
+
+def gradient(width=256, height=64, low=60, high=160):
+    """Ảnh gradient ngang từ low tới high"""
+    row = np.linspace(low, high, width).astype(np.uint8)
+    return np.tile(row, (height, 1))
+
+
+class TestIntensityNormalizer(unittest.TestCase):
+    def test_frame_matches_norm_minmax(self):
+        gray = gradient()
+        expected = cv2.normalize(gray, None, 0, 255, cv2.NORM_MINMAX)
+        np.testing.assert_array_equal(IntensityNormalizer('frame').normalize(gray), expected)
+
+    def test_fixed_range_saturates(self):
+        normalizer = IntensityNormalizer('fixed', fixed_range=(100, 150))
+        result = normalizer.normalize(np.array([[50, 100, 125, 150, 200]], dtype=np.uint8))
+        np.testing.assert_array_equal(result, [[0, 0, 128, 255, 255]])
+
+    def test_percentile_is_stable_when_bright_object_enters(self):
+        scene = gradient()
+        bright = scene.copy()
+        bright[:8, :8] = 255
+
+        per_frame = IntensityNormalizer('frame')
+        rolling = IntensityNormalizer('percentile', window=10, sample_step=1)
+        for _ in range(10):
+            rolling.normalize(scene)
+        before = rolling.normalize(scene).copy()
+        after = rolling.normalize(bright)
+
+        # Per-frame min/max bị kéo bởi vật sáng nhỏ, percentile gần như không đổi
+        pumped = np.abs(per_frame.normalize(bright)[32].astype(int) - per_frame.normalize(scene)[32])
+        stable = np.abs(after[32].astype(int) - before[32])
+        self.assertGreater(pumped.max(), 20)
+        self.assertLessEqual(stable.max(), 2)
+        self.assertLessEqual(rolling.range[1], 160)
+
+    def test_window_forgets_old_frames(self):
+        normalizer = IntensityNormalizer('percentile', window=3, sample_step=1, update_interval=1)
+        for _ in range(3):
+            normalizer.normalize(gradient(low=0, high=100))
+        for _ in range(3):
+            normalizer.normalize(gradient(low=150, high=250))
+        self.assertGreaterEqual(normalizer.range[0], 150)
+
+    def test_histogram_updates_every_interval(self):
+        normalizer = IntensityNormalizer('percentile', window=3, sample_step=1, update_interval=3)
+        normalizer.normalize(gradient(low=0, high=100))
+        first = normalizer.range
+        # Hai frame kế tiếp dùng lại khoảng đã tính, frame thứ ba mới cập nhật histogram
+        for _ in range(2):
+            normalizer.normalize(gradient(low=150, high=250))
+            self.assertEqual(normalizer.range, first)
+        normalizer.normalize(gradient(low=150, high=250))
+        self.assertNotEqual(normalizer.range, first)
+
+    def test_invalid_strategy(self):
+        with self.assertRaises(ValueError):
+            IntensityNormalizer('median')
+        handler = ThermalCameraHandler()
+        self.assertFalse(handler.set_normalization('median'))
+        self.assertFalse(handler.set_normalization('percentile', low_percentile=90, high_percentile=10))
+        self.assertTrue(handler.set_normalization('percentile', window=5))
+        self.assertEqual(handler.day_normalizer.strategy, 'percentile')
+
+
+if __name__ == '__main__':
+    unittest.main()
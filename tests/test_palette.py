@@ -0,0 +1,144 @@
+"""
+Golden-image tests cho palette LUT
+So sánh LUT vectorized với implementation per-pixel cũ (bit-exact)
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+import cv2
+import numpy as np
+
+# Add thermal_scanner to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'thermal_scanner'))
+
+from camera_handler import ThermalCameraHandler
+from palette import PaletteRegistry, build_day_lut, build_night_lut, apply_lut
+
+
+def legacy_day_thermal(normalized):
+    """Implementation per-pixel gốc của _create_day_thermal"""
+    thermal_map = np.zeros(normalized.shape + (3,), dtype=np.uint8)
+    for i in range(normalized.shape[0]):
+        for j in range(normalized.shape[1]):
+            intensity = normalized[i, j]
+            if intensity < 60:
+                thermal_map[i, j] = [intensity//2, 0, 0]
+            elif intensity < 120:
+                thermal_map[i, j] = [0, 0, intensity]
+            elif intensity < 180:
+                thermal_map[i, j] = [0, intensity//3, intensity]
+            elif intensity < 220:
+                thermal_map[i, j] = [0, intensity//2, intensity]
+            else:
+                thermal_map[i, j] = [intensity//3, intensity//2, intensity]
+    return thermal_map
+
+
+def legacy_night_thermal(normalized):
+    """Implementation per-pixel gốc của _create_night_thermal"""
+    thermal_map = np.zeros(normalized.shape + (3,), dtype=np.uint8)
+    for i in range(normalized.shape[0]):
+        for j in range(normalized.shape[1]):
+            intensity = normalized[i, j]
+            if intensity < 50:
+                thermal_map[i, j] = [intensity, 0, 100]
+            elif intensity < 100:
+                thermal_map[i, j] = [intensity, intensity//2, 150]
+            elif intensity < 150:
+                thermal_map[i, j] = [intensity, intensity//3, 200]
+            elif intensity < 200:
+                thermal_map[i, j] = [50, intensity//4, intensity]
+            else:
+                thermal_map[i, j] = [100, intensity//2, intensity]
+    return thermal_map
+
+
+def make_frame(height=60, width=80, seed=0):
+    """Tạo frame BGR deterministic có đủ mọi mức intensity"""
+    rng = np.random.default_rng(seed)
+    frame = rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+    # Hàng đầu tiên là gradient đầy đủ để chắc chắn normalize ra 0-255
+    frame[0, :, :] = np.linspace(0, 255, width, dtype=np.uint8)[:, None]
+    return frame
+
+
+class TestPaletteLut(unittest.TestCase):
+    def test_lut_covers_all_intensities(self):
+        ramp = np.arange(256, dtype=np.uint8).reshape(16, 16)
+        np.testing.assert_array_equal(apply_lut(ramp, build_day_lut()), legacy_day_thermal(ramp))
+        np.testing.assert_array_equal(apply_lut(ramp, build_night_lut()), legacy_night_thermal(ramp))
+
+    def test_apply_lut_in_place(self):
+        ramp = np.arange(256, dtype=np.uint8).reshape(16, 16)
+        out = np.empty((16, 16, 3), dtype=np.uint8)
+        result = apply_lut(ramp, build_day_lut(), out=out)
+        self.assertIs(result, out)
+        np.testing.assert_array_equal(out, legacy_day_thermal(ramp))
+
+
+class TestThermalGoldenImage(unittest.TestCase):
+    def setUp(self):
+        self.handler = ThermalCameraHandler()
+        self.frame = make_frame()
+
+    def test_day_thermal_matches_legacy(self):
+        gray = cv2.cvtColor(self.frame, cv2.COLOR_BGR2GRAY)
+        normalized = cv2.normalize(gray, None, 0, 255, cv2.NORM_MINMAX)
+        expected = legacy_day_thermal(normalized)
+        np.testing.assert_array_equal(self.handler._create_day_thermal(self.frame), expected)
+
+    def test_night_thermal_matches_legacy(self):
+        # Backend không có trạng thái để hai lần enhance cho cùng kết quả
+        self.handler.night_processor.set_enhancement_backend('nlm')
+        dark = (self.frame // 5).astype(np.uint8)
+        enhanced = self.handler.night_processor.enhance_low_light_image(dark)
+        gray = cv2.cvtColor(enhanced, cv2.COLOR_BGR2GRAY)
+        normalized = cv2.normalize(gray, None, 0, 255, cv2.NORM_MINMAX)
+        expected = legacy_night_thermal(normalized)
+        np.testing.assert_array_equal(self.handler._create_night_thermal(dark), expected)
+
+
+class TestPaletteRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = PaletteRegistry()
+
+    def test_lut_is_cached(self):
+        lut = self.registry.get_lut('inferno')
+        self.assertIs(self.registry.get_lut('inferno'), lut)
+        self.assertEqual(lut.shape, (256, 3))
+        self.assertFalse(lut.flags.writeable)
+
+    def test_opencv_constant_lookup(self):
+        expected = cv2.applyColorMap(np.arange(256, dtype=np.uint8).reshape(256, 1), cv2.COLORMAP_JET)
+        np.testing.assert_array_equal(self.registry.get_lut(cv2.COLORMAP_JET), expected.reshape(256, 3))
+
+    def test_load_json_gradient(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'ice.json')
+            with open(path, 'w') as f:
+                json.dump({'stops': [[0, [0, 0, 0]], [255, [255, 128, 0]]]}, f)
+            self.assertEqual(self.registry.load_file(path), 'ice')
+        lut = self.registry.get_lut('ice')
+        self.assertEqual(tuple(lut[0]), (0, 0, 0))
+        self.assertEqual(tuple(lut[255]), (255, 128, 0))
+
+    def test_load_invalid_file(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'bad.npy')
+            np.save(path, np.zeros((10, 3)))
+            self.assertIsNone(self.registry.load_file(path))
+        self.assertNotIn('bad', self.registry)
+
+    def test_handler_switches_palette(self):
+        handler = ThermalCameraHandler()
+        self.assertTrue(handler.set_palette('hot', mode='day'))
+        self.assertIs(handler.day_lut, handler.palettes.get_lut('hot'))
+        self.assertFalse(handler.set_palette('does_not_exist'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+"""
+Tests cho multi-stage frame pipeline
+"""
+
+import os
+import sys
+import time
+import unittest
+
+# Add thermal_scanner to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'thermal_scanner'))
+
+from camera_handler import ThermalCameraHandler
+from frame_pool import FrameHandle, FrameRingBuffer
+from frame_source import SyntheticSource
+from pipeline import DropOldestQueue, FrameMailbox, FramePipeline
+
+
+class TestDropOldestQueue(unittest.TestCase):
+    def test_drops_oldest_when_full(self):
+        queue = DropOldestQueue(maxsize=2)
+        for i in range(5):
+            queue.put(i)
+        self.assertEqual(queue.dropped, 3)
+        self.assertEqual([queue.get(0), queue.get(0)], [3, 4])
+        self.assertIsNone(queue.get(timeout=0.01))
+
+    def test_close_wakes_consumer(self):
+        queue = DropOldestQueue(maxsize=2)
+        queue.put('a')
+        queue.close()
+        self.assertEqual(queue.get(), 'a')
+        self.assertIsNone(queue.get())
+
+
+class TestFramePipeline(unittest.TestCase):
+    def test_offline_keeps_every_frame_in_order(self):
+        presented = []
+
+        def process(frame):
+            # Frame chẵn xử lý chậm hơn để workers trả kết quả lệch thứ tự
+            time.sleep(0.004 if frame % 2 == 0 else 0.001)
+            return frame * 10
+
+        pipeline = FramePipeline(process, lambda packet: presented.append(packet.thermal),
+                                 workers=3, queue_size=2, drop_oldest=False)
+        pipeline.start()
+        for i in range(30):
+            pipeline.submit(i)
+        pipeline.finish(timeout=5)
+
+        self.assertEqual(presented, [i * 10 for i in range(30)])
+        self.assertEqual(pipeline.get_stats()['dropped'], 0)
+
+    def test_live_latency_bounded_when_processing_is_slow(self):
+        presented = []
+
+        def process(frame):
+            time.sleep(0.02)
+            return frame
+
+        pipeline = FramePipeline(process, lambda packet: presented.append(packet.thermal),
+                                 workers=1, queue_size=1, drop_oldest=True)
+        pipeline.start()
+        # Camera nhanh hơn processing ~4 lần
+        for i in range(40):
+            pipeline.submit(i)
+            time.sleep(0.005)
+        pipeline.finish(timeout=5)
+
+        stats = pipeline.get_stats()
+        self.assertGreater(stats['dropped'], 0)
+        self.assertEqual(presented, sorted(presented))
+        # Tối đa: 1 frame đang xử lý + 1 frame chờ mỗi queue
+        self.assertLess(stats['end_to_end']['max_ms'], 100)
+
+
+class TestFrameMailbox(unittest.TestCase):
+    def test_keeps_only_latest(self):
+        mailbox = FrameMailbox()
+        for i in range(3):
+            mailbox.post(i)
+        self.assertEqual(mailbox.take(), 2)
+        self.assertIsNone(mailbox.take())
+        self.assertEqual(mailbox.get_stats(), {'posted': 3, 'dropped': 2, 'taken': 1})
+
+    def test_handler_posts_handles(self):
+        handler = ThermalCameraHandler(frame_source=SyntheticSource(64, 48, num_frames=5))
+        handler.start_capture()
+        handler.wait(timeout=10)
+        handler.stop_capture()
+        handle = handler.frame_mailbox.take()
+        self.assertEqual(handle.seq, 4)
+        self.assertEqual(handler.frame_mailbox.get_stats()['posted'], 5)
+
+
+class TestFrameRingBuffer(unittest.TestCase):
+    def test_reuses_buffers_without_allocation(self):
+        handler = ThermalCameraHandler(frame_source=SyntheticSource(64, 48, num_frames=50))
+        buffers = set()
+        handler.start_capture(lambda thermal: buffers.add(thermal.ctypes.data))
+        handler.wait(timeout=10)
+        handler.stop_capture()
+        # Mọi thermal frame được ghi vào buffer của pool
+        self.assertLessEqual(len(buffers), handler.frame_pool.size)
+        self.assertIsNotNone(handler.get_current_frame())
+
+    def test_handle_invalidated_when_slot_reused(self):
+        pool = FrameRingBuffer(2)
+        slot = pool.acquire()
+        handle = FrameHandle(slot)
+        self.assertTrue(handle.is_valid())
+        pool.release(slot)
+        pool.acquire()
+        self.assertIs(pool.acquire(), slot)
+        self.assertFalse(handle.is_valid())
+
+
+if __name__ == "__main__":
+    unittest.main()
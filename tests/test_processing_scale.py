@@ -0,0 +1,80 @@
+"""
+Tests cho processing scale và ROI mode
+"""
+
+import os
+import sys
+import unittest
+
+import cv2
+import numpy as np
+
+# Add thermal_scanner to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'thermal_scanner'))
+
+from camera_handler import ThermalCameraHandler
+from frame_source import SyntheticSource
+
+
+def synthetic_frame(width=320, height=240):
+    source = SyntheticSource(width, height)
+    source.open()
+    return source.read()[1]
+
+
+class TestProcessingScale(unittest.TestCase):
+    def setUp(self):
+        self.handler = ThermalCameraHandler()
+        self.frame = synthetic_frame()
+
+    def test_scaled_output_matches_full_resolution(self):
+        full = self.handler._process_frame(self.frame)
+        for scale in ('half', 'quarter'):
+            self.assertTrue(self.handler.set_processing_scale(scale))
+            scaled = self.handler._process_frame(self.frame)
+            self.assertEqual(scaled.shape, full.shape)
+            # Ảnh thermal gần như không đổi khi xử lý ở độ phân giải thấp
+            self.assertLess(np.abs(scaled.astype(int) - full).mean(), 6.0, scale)
+
+    def test_invalid_scale_is_rejected(self):
+        self.assertFalse(self.handler.set_processing_scale('tiny'))
+        self.assertFalse(self.handler.set_processing_scale(1.5))
+        self.assertEqual(self.handler.processing_scale, 1.0)
+
+    def test_roi_is_processed_and_upscaled(self):
+        self.assertTrue(self.handler.set_roi((80, 60, 160, 120)))
+        out = np.empty_like(self.frame)
+        result = self.handler._process_frame(self.frame, out)
+        self.assertIs(result, out)
+
+        crop = np.ascontiguousarray(self.frame[60:180, 80:240])
+        expected = cv2.resize(ThermalCameraHandler()._process_frame(crop), (320, 240),
+                              interpolation=cv2.INTER_LINEAR)
+        np.testing.assert_array_equal(result, expected)
+
+    def test_error_fallback_is_written_into_out(self):
+        def fail(*args):
+            raise RuntimeError("boom")
+        self.handler._create_day_thermal = fail
+        self.handler._create_night_thermal = fail
+        out = np.zeros_like(self.frame)
+        result = self.handler._process_frame(self.frame, out)
+        # Không trả về frame gốc (buffer camera), output nằm trong slot buffer
+        self.assertIs(result, out)
+        np.testing.assert_array_equal(out, self.frame)
+
+    def test_roi_is_clipped_to_frame(self):
+        self.handler.set_roi((300, 200, 500, 500))
+        self.assertEqual(self.handler._process_frame(self.frame).shape, (240, 320, 3))
+        self.assertEqual(ThermalCameraHandler._clip_roi((300, 200, 500, 500), 320, 240), (300, 200, 20, 40))
+
+    def test_capture_resolution_presets(self):
+        self.assertTrue(self.handler.set_capture_resolution('hd'))
+        self.assertEqual(self.handler.capture_resolution, (1280, 720))
+        self.assertTrue(self.handler.set_capture_resolution(1920, 1080))
+        self.assertFalse(self.handler.set_capture_resolution('8k'))
+        self.assertEqual(self.handler.capture_resolution, (1920, 1080))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+"""
+Tests cho adaptive frame-rate controller
+"""
+
+import os
+import sys
+import time
+import unittest
+
+import numpy as np
+
+# Add thermal_scanner to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'thermal_scanner'))
+
+from camera_handler import ThermalCameraHandler
+from frame_source import SyntheticSource
+from rate_control import QUALITY_LEVELS, FrameRateController
+
+
+class TestFrameRateController(unittest.TestCase):
+    def test_wait_holds_target_rate(self):
+        rate = FrameRateController(target_fps=50)
+        start = time.perf_counter()
+        for _ in range(11):
+            rate.wait()
+        elapsed = time.perf_counter() - start
+        # 10 chu kỳ x 20 ms
+        self.assertGreaterEqual(elapsed, 0.19)
+        self.assertLess(elapsed, 0.4)
+
+    def test_late_frame_does_not_burst(self):
+        rate = FrameRateController(target_fps=100)
+        rate.wait()
+        time.sleep(0.05)
+        rate.wait()
+        self.assertEqual(rate.missed_deadlines, 1)
+        # Slot kế tiếp cách đúng một chu kỳ, không chạy dồn 5 frame
+        start = time.perf_counter()
+        rate.wait()
+        self.assertGreater(time.perf_counter() - start, 0.005)
+
+    def test_degrades_recovers_and_reports(self):
+        levels = []
+        rate = FrameRateController(target_fps=10, degrade_after=0.5, recover_after=1.0)
+        rate.add_listener(lambda level, settings: levels.append(level))
+
+        # Quá tải kéo dài -> giảm dần tới mức thấp nhất rồi báo không đạt target
+        for _ in range(5 * len(QUALITY_LEVELS)):
+            rate.update(0.5)
+        self.assertEqual(levels, [1, 2, 3])
+        self.assertFalse(rate.get_stats()['target_met'])
+
+        # Tải thấp -> khôi phục từng mức
+        for _ in range(10):
+            rate.update(0.01)
+        self.assertEqual(rate.level, 2)
+        self.assertTrue(rate.target_met)
+
+    def test_handler_applies_quality_level(self):
+        handler = ThermalCameraHandler()
+        handler.rate_controller.set_level(3)
+        self.assertEqual(handler.rate_scale, 0.5)
+        self.assertEqual(handler.frame_skip, 2)
+
+        source = SyntheticSource(64, 48)
+        source.open()
+        _, frame = source.read()
+        thermal = handler._process_frame(frame)
+        self.assertEqual(thermal.shape, (48, 64, 3))
+        self.assertEqual(thermal.dtype, np.uint8)
+
+        handler.rate_controller.set_level(0)
+        self.assertEqual(handler.rate_scale, 1.0)
+        self.assertEqual(handler.frame_skip, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
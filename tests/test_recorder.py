@@ -0,0 +1,105 @@
+"""
+Tests cho thermal video recorder
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+import cv2
+import numpy as np
+
+# Add thermal_scanner to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'thermal_scanner'))
+
+from camera_handler import ThermalCameraHandler
+from frame_source import SyntheticSource
+from recorder import ThermalRecorder
+
+
+def count_frames(path):
+    cap = cv2.VideoCapture(path)
+    count = 0
+    while cap.read()[0]:
+        count += 1
+    cap.release()
+    return count
+
+
+class TestThermalRecorder(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.frame = np.zeros((48, 64, 3), dtype=np.uint8)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_pre_trigger_frames_are_kept(self):
+        recorder = ThermalRecorder(self.tmp.name, fps=10, pre_trigger_seconds=0.5)
+        # 20 frame trước khi record, chỉ 5 frame cuối (0.5s) được giữ
+        for i in range(20):
+            recorder.push(self.frame + i, timestamp=i / 10)
+        recorder.start()
+        for i in range(20, 23):
+            recorder.push(self.frame + i, timestamp=i / 10)
+        recorder.close()
+
+        self.assertEqual(recorder.written, 8)
+        self.assertEqual(count_frames(recorder.segments[0]), 8)
+
+    def test_segment_rotation_by_time(self):
+        recorder = ThermalRecorder(self.tmp.name, fps=10, segment_seconds=1.0, max_queue=30)
+        recorder.start()
+        for i in range(25):
+            recorder.push(self.frame, timestamp=i / 10)
+        recorder.close()
+        self.assertEqual(len(recorder.segments), 3)
+
+    def test_push_never_blocks_when_encoder_is_behind(self):
+        recorder = ThermalRecorder(self.tmp.name, fps=10, max_queue=2)
+        recorder.start()
+        start = time.perf_counter()
+        for i in range(200):
+            recorder.push(self.frame, timestamp=i / 10)
+        elapsed = time.perf_counter() - start
+        recorder.close()
+        self.assertLess(elapsed, 1.0)
+        self.assertEqual(recorder.written + recorder.dropped, 200)
+
+    def test_stop_does_not_block_when_queue_is_full(self):
+        recorder = ThermalRecorder(self.tmp.name, fps=10, max_queue=2)
+        release = threading.Event()
+        write = recorder._write
+        # Encoder bị kẹt ở frame đầu tiên, queue đầy phía sau
+        recorder._write = lambda frame, timestamp: release.wait(5) and write(frame, timestamp)
+        recorder.start()
+        for i in range(5):
+            recorder.push(self.frame, timestamp=i / 10)
+
+        start = time.perf_counter()
+        recorder.stop()
+        self.assertLess(time.perf_counter() - start, 0.5)
+        # push() không bị block sau stop
+        recorder.push(self.frame)
+        release.set()
+        recorder.close()
+        self.assertFalse(recorder._thread.is_alive())
+        self.assertEqual(recorder.written + recorder.dropped, 5)
+
+    def test_handler_stop_capture_closes_recorder(self):
+        handler = ThermalCameraHandler(frame_source=SyntheticSource(32, 24, num_frames=5))
+        recorder = handler.configure_recorder(self.tmp.name, pre_trigger_seconds=0)
+        handler.start_recording()
+        handler.start_capture()
+        handler.wait(timeout=10)
+        handler.stop_capture()
+        self.assertIsNone(handler.recorder)
+        self.assertFalse(recorder._thread.is_alive())
+        self.assertGreater(recorder.written, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+"""
+Tests cho MJPEG streaming server
+"""
+
+import http.client
+import os
+import socket
+import sys
+import time
+import unittest
+
+import cv2
+import numpy as np
+
+# Add thermal_scanner to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'thermal_scanner'))
+
+from camera_handler import ThermalCameraHandler
+from frame_source import SyntheticSource
+from streaming import BOUNDARY, MjpegStreamer
+
+
+def read_part(response):
+    """Đọc một JPEG từ multipart stream"""
+    line = response.fp.readline()
+    while line.strip() != f"--{BOUNDARY}".encode():
+        line = response.fp.readline()
+    length = None
+    while True:
+        header = response.fp.readline().strip()
+        if not header:
+            break
+        name, value = header.decode().split(':', 1)
+        if name.lower() == 'content-length':
+            length = int(value)
+    return response.fp.read(length)
+
+
+class TestMjpegStreamer(unittest.TestCase):
+    def setUp(self):
+        self.streamer = MjpegStreamer(port=0, client_timeout=1.0)
+        self.assertTrue(self.streamer.start())
+        self.frame = np.zeros((48, 64, 3), dtype=np.uint8)
+
+    def tearDown(self):
+        self.streamer.stop()
+
+    def request(self, path):
+        connection = http.client.HTTPConnection('127.0.0.1', self.streamer.port, timeout=5)
+        connection.request('GET', path)
+        return connection.getresponse()
+
+    def test_snapshot(self):
+        self.assertEqual(self.request('/snapshot').status, 503)
+        self.frame[:] = 200
+        self.streamer.publish(self.frame)
+        response = self.request('/snapshot')
+        self.assertEqual(response.status, 200)
+        image = cv2.imdecode(np.frombuffer(response.read(), np.uint8), cv2.IMREAD_COLOR)
+        self.assertEqual(image.shape, (48, 64, 3))
+        self.assertAlmostEqual(float(image.mean()), 200, delta=3)
+        self.assertEqual(self.request('/missing').status, 404)
+
+    def test_clients_share_one_encode_per_frame(self):
+        clients = [self.request('/stream') for _ in range(3)]
+        for response in clients:
+            self.assertTrue(response.getheader('Content-Type').startswith('multipart/x-mixed-replace'))
+        deadline = time.time() + 5
+        while self.streamer.clients < 3 and time.time() < deadline:
+            time.sleep(0.01)
+
+        for value in (50, 150):
+            self.frame[:] = value
+            self.streamer.publish(self.frame)
+            parts = [read_part(response) for response in clients]
+            self.assertEqual(len(set(parts)), 1)
+        self.assertEqual(self.streamer.encoded, 2)
+
+    def test_stalled_client_does_not_block_publish(self):
+        # Client mở stream nhưng không bao giờ đọc
+        stalled = socket.create_connection(('127.0.0.1', self.streamer.port))
+        stalled.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        stalled.sendall(b"GET /stream HTTP/1.1\r\nHost: localhost\r\n\r\n")
+
+        frame = np.random.default_rng(0).integers(0, 256, (240, 320, 3), dtype=np.uint8)
+        start = time.perf_counter()
+        for _ in range(200):
+            self.streamer.publish(frame)
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+        # Client vẫn đọc bình thường trong lúc client kia bị treo
+        response = self.request('/snapshot')
+        self.assertEqual(response.status, 200)
+        stalled.close()
+
+    def test_attach_to_camera_handler(self):
+        handler = ThermalCameraHandler(frame_source=SyntheticSource(64, 48, num_frames=5))
+        self.streamer.attach(handler)
+        self.assertTrue(handler.start_capture())
+        handler.wait(timeout=10)
+        handler.stop_capture()
+        self.assertEqual(self.streamer.published, 5)
+        self.assertEqual(self.request('/snapshot').status, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
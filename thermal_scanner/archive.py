@@ -0,0 +1,324 @@
+"""
+Archive module
+Lưu intensity frames (uint8/uint16) + metadata vào một file append-only, đọc lại bằng memory-map
+"""
+
+import os
+import struct
+import threading
+
+import numpy as np
+from frame_source import FrameSource
+from palette import apply_lut
+from utils.logger import logger
+
+
+ARCHIVE_EXTENSION = '.tca'
+MAGIC = b'TCAMARCH'
+VERSION = 1
+# magic, version, dtype code, kind code, width, height
+HEADER_FORMAT = '<8sHBBII'
+HEADER_SIZE = 64
+
+DTYPE_CODES = {1: np.uint8, 2: np.uint16}
+KIND_CODES = {1: 'gray', 2: 'normalized'}
+
+# Metadata cố định cho mỗi frame (cũng là index của archive)
+METADATA_DTYPE = np.dtype([
+    ('seq', '<u8'),
+    ('timestamp', '<f8'),
+    ('brightness', '<f4'),
+    ('min', '<f4'),
+    ('max', '<f4'),
+    ('is_low_light', 'u1'),
+    ('_pad', 'u1', (3,)),
+])
+
+
+def _code_of(mapping, value):
+    """Tìm code từ giá trị trong bảng mã"""
+    for code, item in mapping.items():
+        if item == value:
+            return code
+    raise ValueError(f"Unsupported value: {value}")
+
+
+def record_dtype(width, height, dtype):
+    """
+    Dtype của một record: metadata + pixels
+
+    Args:
+        width (int): Độ rộng frame
+        height (int): Độ cao frame
+        dtype: np.uint8 hoặc np.uint16
+
+    Returns:
+        numpy.dtype: Structured dtype của record
+    """
+    return np.dtype([
+        ('meta', METADATA_DTYPE),
+        ('pixels', np.dtype(dtype).newbyteorder('<'), (height, width)),
+    ])
+
+
+class ArchiveWriter:
+    """Ghi intensity frames vào archive (append-only, thread-safe)"""
+
+    def __init__(self, path, width, height, dtype=np.uint8, kind='gray'):
+        """
+        Mở archive để ghi (tạo mới hoặc append vào archive cùng định dạng)
+
+        Args:
+            path (str): Đường dẫn file archive
+            width (int): Độ rộng frame
+            height (int): Độ cao frame
+            dtype: np.uint8 hoặc np.uint16
+            kind (str): 'gray' (intensity gốc) hoặc 'normalized'
+
+        Raises:
+            ValueError: Nếu archive có sẵn khác định dạng
+        """
+        self.path = path
+        self.width = width
+        self.height = height
+        self.dtype = np.dtype(dtype)
+        self.kind = kind
+        self.record_dtype = record_dtype(width, height, self.dtype)
+        self.count = 0
+        self._lock = threading.Lock()
+        self._record = np.zeros(1, dtype=self.record_dtype)
+
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            header = read_header(path)
+            if (header['width'], header['height'], header['dtype'], header['kind']) != \
+                    (width, height, self.dtype, kind):
+                raise ValueError(f"Archive format mismatch: {path}")
+            self.count = header['count']
+            # Bỏ record ghi dở (nếu crash giữa chừng)
+            with open(path, 'r+b') as f:
+                f.truncate(HEADER_SIZE + self.count * self.record_dtype.itemsize)
+            self._file = open(path, 'ab')
+        else:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(path, 'wb')
+            header = struct.pack(HEADER_FORMAT, MAGIC, VERSION, _code_of(DTYPE_CODES, self.dtype.type),
+                                 _code_of(KIND_CODES, kind), width, height)
+            self._file.write(header.ljust(HEADER_SIZE, b'\0'))
+
+        logger.info(f"Archive opened for writing: {path} ({self.count} frames)")
+
+    def append(self, intensity, seq=None, timestamp=0.0, brightness=0.0, min_value=0.0,
+               max_value=0.0, is_low_light=False):
+        """
+        Ghi một frame
+
+        Args:
+            intensity (numpy.ndarray): Intensity frame (H, W)
+            seq (int): Số thứ tự frame (default: index trong archive)
+            timestamp (float): Thời điểm frame
+            brightness (float): Độ sáng trung bình
+            min_value (float): Intensity nhỏ nhất
+            max_value (float): Intensity lớn nhất
+            is_low_light (bool): Frame ở night mode
+
+        Returns:
+            int: Index của frame trong archive, hoặc None nếu archive đã đóng
+        """
+        if intensity.shape != (self.height, self.width):
+            raise ValueError(f"Frame shape {intensity.shape} does not match archive "
+                             f"({self.height}, {self.width})")
+
+        with self._lock:
+            # Worker có thể ghi nốt frame sau khi archive bị đóng từ thread khác
+            if self._file.closed:
+                return None
+            if seq is None:
+                seq = self.count
+            record = self._record[0]
+            record['meta'] = (seq, timestamp, brightness, min_value, max_value, is_low_light, (0, 0, 0))
+            record['pixels'] = intensity
+            self._file.write(self._record.tobytes())
+            index = self.count
+            self.count += 1
+            return index
+
+    def flush(self):
+        """Flush dữ liệu xuống file"""
+        with self._lock:
+            self._file.flush()
+
+    def close(self):
+        """Đóng archive"""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+        logger.info(f"Archive closed: {self.path} ({self.count} frames)")
+
+
+def read_header(path):
+    """
+    Đọc header của archive
+
+    Args:
+        path (str): Đường dẫn archive
+
+    Returns:
+        dict: {'width', 'height', 'dtype', 'kind', 'count'}
+
+    Raises:
+        ValueError: Nếu không phải archive hợp lệ
+    """
+    with open(path, 'rb') as f:
+        raw = f.read(HEADER_SIZE)
+    if len(raw) < struct.calcsize(HEADER_FORMAT):
+        raise ValueError(f"Not a thermal archive: {path}")
+
+    magic, version, dtype_code, kind_code, width, height = struct.unpack_from(HEADER_FORMAT, raw)
+    if magic != MAGIC:
+        raise ValueError(f"Not a thermal archive: {path}")
+    if version != VERSION:
+        raise ValueError(f"Unsupported archive version: {version}")
+
+    dtype = np.dtype(DTYPE_CODES[dtype_code])
+    item_size = record_dtype(width, height, dtype).itemsize
+    count = (os.path.getsize(path) - HEADER_SIZE) // item_size
+    return {'width': width, 'height': height, 'dtype': dtype, 'kind': KIND_CODES[kind_code], 'count': count}
+
+
+class FrameArchive:
+    """Đọc archive bằng memory-map: truy cập ngẫu nhiên, không copy"""
+
+    def __init__(self, path):
+        """
+        Mở archive để đọc
+
+        Args:
+            path (str): Đường dẫn archive
+        """
+        self.path = path
+        header = read_header(path)
+        self.width = header['width']
+        self.height = header['height']
+        self.dtype = header['dtype']
+        self.kind = header['kind']
+        self.count = header['count']
+        self.record_dtype = record_dtype(self.width, self.height, self.dtype)
+
+        if self.count:
+            self.records = np.memmap(path, dtype=self.record_dtype, mode='r',
+                                     offset=HEADER_SIZE, shape=(self.count,))
+        else:
+            self.records = np.zeros(0, dtype=self.record_dtype)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        """
+        Intensity frame tại index (view trên memory-map, không copy)
+
+        Args:
+            index (int): Index frame
+
+        Returns:
+            numpy.ndarray: Frame (H, W) read-only
+        """
+        return self.records['pixels'][index]
+
+    @property
+    def metadata(self):
+        """Bảng metadata của mọi frame (structured view, không copy)"""
+        return self.records['meta']
+
+    def find(self, timestamp):
+        """
+        Tìm frame đầu tiên có timestamp >= giá trị cho trước
+
+        Args:
+            timestamp (float): Thời điểm cần tìm
+
+        Returns:
+            int: Index frame (có thể bằng len(archive) nếu không có)
+        """
+        return int(np.searchsorted(self.metadata['timestamp'], timestamp))
+
+    def render(self, index, lut, out=None):
+        """
+        Áp dụng lại palette lên frame đã lưu
+
+        Args:
+            index (int): Index frame
+            lut (numpy.ndarray): LUT (256, 3)
+            out (numpy.ndarray): Buffer output (optional)
+
+        Returns:
+            numpy.ndarray: Frame BGR
+        """
+        frame = self[index]
+        if frame.dtype != np.uint8:
+            # uint16 -> 8 bit cho LUT 256 màu
+            frame = (frame >> 8).astype(np.uint8)
+        return apply_lut(frame, lut, out)
+
+    def close(self):
+        """Giải phóng memory-map"""
+        mmap = getattr(self.records, '_mmap', None)
+        self.records = None
+        if mmap is not None:
+            mmap.close()
+
+
+class ArchiveSource(FrameSource):
+    """Phát lại archive như một frame source (intensity grayscale) qua thermal pipeline"""
+
+    def __init__(self, path, loop=False):
+        """
+        Args:
+            path (str): Đường dẫn archive
+            loop (bool): Phát lại từ đầu khi hết
+        """
+        self.path = path
+        self.loop = loop
+        self.archive = None
+        self.position = 0
+
+    def open(self):
+        try:
+            self.archive = FrameArchive(self.path)
+        except (OSError, ValueError) as e:
+            logger.error(f"Cannot open archive {self.path}: {e}")
+            return False
+        self.position = 0
+        return len(self.archive) > 0
+
+    def read(self, image=None):
+        if self.archive is None:
+            return False, None
+        if self.position >= len(self.archive):
+            if not self.loop:
+                self.release()
+                return False, None
+            self.position = 0
+
+        frame = self.archive[self.position]
+        self.position += 1
+        if frame.dtype != np.uint8:
+            frame = frame >> 8
+        # Slot của pipeline được ghi lại mỗi frame -> copy ra khỏi memory-map
+        if image is None or image.shape != frame.shape:
+            image = np.empty(frame.shape, dtype=np.uint8)
+        np.copyto(image, frame, casting='unsafe')
+        return True, image
+
+    def is_opened(self):
+        return self.archive is not None
+
+    def release(self):
+        if self.archive is not None:
+            self.archive.close()
+            self.archive = None
+
+    def describe(self):
+        return f"archive {self.path}"
@@ -0,0 +1,352 @@
+"""
+Benchmark module
+Đo thời gian từng stage xử lý frame ở nhiều độ phân giải, so sánh với baseline JSON
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+
+import cv2
+import numpy as np
+
+# Add current directory to path để import modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from camera_handler import PROCESSING_SCALES, ThermalCameraHandler
+from display import DisplayPresenter
+from frame_source import SyntheticSource
+from hotspots import HotSpotTracker
+from night_mode import ENHANCEMENT_BACKENDS, NightModeProcessor
+from normalization import NORMALIZATION_STRATEGIES, IntensityNormalizer
+from utils.logger import logger
+
+
+RESOLUTIONS = {
+    'qvga': (320, 240),
+    'vga': (640, 480),
+    'hd': (1280, 720),
+}
+
+DEFAULT_TOLERANCE = 0.25
+# Chênh lệch nhỏ hơn mức này là nhiễu đo, không tính là regression
+MIN_REGRESSION_MS = 0.05
+
+
+def synthetic_frame(width, height, brightness=1.0, index=3):
+    """
+    Tạo frame synthetic deterministic
+
+    Args:
+        width (int): Độ rộng
+        height (int): Độ cao
+        brightness (float): Hệ số độ sáng (thấp = ban đêm)
+        index (int): Vị trí của vật thể nóng
+
+    Returns:
+        numpy.ndarray: Frame BGR
+    """
+    source = SyntheticSource(width, height, brightness=brightness)
+    source.open()
+    source.frame_index = index
+    _, frame = source.read()
+    return frame
+
+
+def build_stages(handler, day_frame, night_frame, display_size=(1000, 750)):
+    """
+    Tạo các stage cần đo
+
+    Args:
+        handler (ThermalCameraHandler): Handler dùng để xử lý
+        day_frame (numpy.ndarray): Frame ban ngày
+        night_frame (numpy.ndarray): Frame thiếu sáng
+        display_size (tuple): Kích thước hiển thị cho stage display_convert
+
+    Returns:
+        dict: Tên stage -> callable không tham số
+    """
+    processor = handler.night_processor
+    # interval=1: đo độ sáng mỗi lần gọi thay vì trả kết quả cache giữa các lần đo
+    detector = NightModeProcessor(interval=1)
+    out = np.empty_like(day_frame)
+    presenter = DisplayPresenter(None)
+    presenter.display_size = display_size
+    day_gray = cv2.cvtColor(day_frame, cv2.COLOR_BGR2GRAY)
+    # Frame kế tiếp (vật thể nóng đã di chuyển) để motion layer có chuyển động thật
+    height, width = day_frame.shape[:2]
+    moved_gray = cv2.cvtColor(synthetic_frame(width, height, index=4), cv2.COLOR_BGR2GRAY)
+    intensity = np.empty_like(day_gray)
+    normalized = cv2.normalize(day_gray, None, 0, 255, cv2.NORM_MINMAX)
+    tracker = HotSpotTracker()
+
+    stages = {
+        'process_frame': lambda: handler._process_frame(day_frame, out),
+        'create_day_thermal': lambda: handler._create_day_thermal(day_frame, out),
+        'create_night_thermal': lambda: handler._create_night_thermal(night_frame, out),
+        'detect_low_light': lambda: detector.detect_low_light(day_frame),
+        'motion_overlay': _motion_stage(handler.motion_layer, (day_gray, moved_gray), intensity),
+        'hotspots': lambda: tracker.update(normalized),
+        # Tương đương _update_frame cũ: BGR->RGB, resize, PIL image
+        'display_convert': lambda: presenter.prepare(out),
+    }
+
+    # Xử lý ở độ phân giải thấp hơn, upscale kết quả
+    for name, scale in PROCESSING_SCALES.items():
+        if scale < 1.0:
+            scaled = ThermalCameraHandler()
+            scaled.set_processing_scale(scale)
+            stages[f'process_frame:{name}'] = _bind(scaled._process_frame, day_frame, out)
+
+    for strategy in NORMALIZATION_STRATEGIES:
+        normalizer = IntensityNormalizer(strategy)
+        stages[f'normalize:{strategy}'] = _bind(normalizer.normalize, day_gray, None, intensity)
+
+    for backend in ENHANCEMENT_BACKENDS:
+        stages[f'enhance_low_light:{backend}'] = _enhance_stage(processor, backend, night_frame)
+
+    return stages
+
+
+def _bind(func, *args):
+    """Stage gọi func với tham số cố định"""
+    return lambda: func(*args)
+
+
+def _motion_stage(layer, grays, out):
+    """Stage motion overlay luân phiên các frame khác nhau"""
+    frames = itertools.cycle(grays)
+
+    def run():
+        gray = next(frames)
+        return layer.apply(gray, gray, out)
+    return run
+
+
+def _enhance_stage(processor, backend, frame):
+    """Stage enhance_low_light_image với backend cố định"""
+    def run():
+        processor.enhancement_backend = backend
+        return processor.enhance_low_light_image(frame)
+    return run
+
+
+def time_stage(func, iterations=30, warmup=3, max_seconds=3.0):
+    """
+    Đo thời gian một stage
+
+    Args:
+        func (function): Stage cần đo
+        iterations (int): Số lần đo
+        warmup (int): Số lần chạy bỏ qua (cache, cấp phát buffer)
+        max_seconds (float): Dừng sớm khi stage chậm (vẫn đo ít nhất 3 lần)
+
+    Returns:
+        dict: {'ms', 'p95_ms', 'fps', 'samples'} (ms là median)
+    """
+    for _ in range(warmup):
+        func()
+
+    samples = []
+    deadline = time.perf_counter() + max_seconds
+    for i in range(iterations):
+        start = time.perf_counter()
+        func()
+        end = time.perf_counter()
+        samples.append(end - start)
+        if i >= 2 and end > deadline:
+            break
+
+    median_ms = float(np.median(samples)) * 1000.0
+    return {
+        'ms': round(median_ms, 4),
+        'p95_ms': round(float(np.percentile(samples, 95)) * 1000.0, 4),
+        'fps': round(1000.0 / median_ms, 1) if median_ms > 0 else float('inf'),
+        'samples': len(samples),
+    }
+
+
+def run_benchmark(resolutions=None, iterations=30, warmup=3, stages=None, max_seconds=3.0):
+    """
+    Chạy benchmark cho mọi stage ở mọi độ phân giải
+
+    Args:
+        resolutions (dict): Tên -> (width, height) (default: RESOLUTIONS)
+        iterations (int): Số lần đo mỗi stage
+        warmup (int): Số lần warmup mỗi stage
+        stages (list): Chỉ chạy các stage này (optional)
+        max_seconds (float): Thời gian đo tối đa mỗi stage
+
+    Returns:
+        dict: {'meta': {...}, 'results': {resolution: {stage: timing}}}
+    """
+    resolutions = resolutions or RESOLUTIONS
+    handler = ThermalCameraHandler()
+    saved_backend = handler.night_processor.enhancement_backend
+    results = {}
+
+    for name, (width, height) in resolutions.items():
+        day_frame = synthetic_frame(width, height, brightness=1.0)
+        night_frame = synthetic_frame(width, height, brightness=0.15)
+        results[name] = {}
+
+        for stage, func in build_stages(handler, day_frame, night_frame).items():
+            if stages and stage not in stages:
+                continue
+            timing = time_stage(func, iterations, warmup, max_seconds)
+            results[name][stage] = timing
+            logger.debug(f"Benchmark {name} {stage}: {timing['ms']:.2f} ms")
+
+        handler.night_processor.enhancement_backend = saved_backend
+
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'opencv': cv2.__version__,
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+            'iterations': iterations,
+            'created': time.strftime("%Y-%m-%d %H:%M:%S"),
+        },
+        'results': results,
+    }
+
+
+def save_baseline(report, path):
+    """Lưu kết quả benchmark làm baseline"""
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    logger.info(f"Benchmark baseline saved: {path}")
+
+
+def load_baseline(path):
+    """
+    Đọc baseline JSON
+
+    Returns:
+        dict: Baseline report
+    """
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(report, baseline, tolerance=DEFAULT_TOLERANCE, min_delta_ms=MIN_REGRESSION_MS):
+    """
+    So sánh với baseline
+
+    Args:
+        report (dict): Kết quả run_benchmark
+        baseline (dict): Baseline report
+        tolerance (float): Tỷ lệ chậm hơn cho phép (0.25 = 25%)
+        min_delta_ms (float): Chênh lệch tuyệt đối tối thiểu để tính regression
+
+    Returns:
+        list: Các regression (resolution, stage, baseline_ms, current_ms)
+    """
+    regressions = []
+    base_results = baseline.get('results', {})
+    for resolution, stages in report['results'].items():
+        for stage, timing in stages.items():
+            base = base_results.get(resolution, {}).get(stage)
+            # Stage mới chưa có baseline -> bỏ qua
+            if base is None:
+                continue
+            limit = max(base['ms'] * (1.0 + tolerance), base['ms'] + min_delta_ms)
+            if timing['ms'] > limit:
+                regressions.append((resolution, stage, base['ms'], timing['ms']))
+    return regressions
+
+
+def format_report(report, baseline=None):
+    """
+    Format kết quả thành bảng text
+
+    Returns:
+        str: Bảng kết quả
+    """
+    base_results = (baseline or {}).get('results', {})
+    lines = [f"{'resolution':<10} {'stage':<28} {'ms/frame':>10} {'p95 ms':>10} {'fps':>9} {'vs base':>9}"]
+    for resolution, stages in report['results'].items():
+        for stage, timing in stages.items():
+            base = base_results.get(resolution, {}).get(stage)
+            delta = f"{(timing['ms'] / base['ms'] - 1) * 100:+.0f}%" if base and base['ms'] else ""
+            lines.append(f"{resolution:<10} {stage:<28} {timing['ms']:>10.2f} {timing['p95_ms']:>10.2f} "
+                         f"{timing['fps']:>9.1f} {delta:>9}")
+    return "\n".join(lines)
+
+
+def _parse_resolution(value):
+    """'640x480' -> ('640x480', (640, 480)) hoặc tên có sẵn trong RESOLUTIONS"""
+    if value in RESOLUTIONS:
+        return value, RESOLUTIONS[value]
+    width, height = (int(v) for v in value.lower().split('x'))
+    return value, (width, height)
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Benchmark thermal frame-processing stages")
+    parser.add_argument('-r', '--resolution', action='append', default=None,
+                        help=f"Resolution name ({', '.join(RESOLUTIONS)}) or WxH; repeatable")
+    parser.add_argument('-n', '--iterations', type=int, default=30, help="Timed iterations per stage")
+    parser.add_argument('--warmup', type=int, default=3, help="Warmup iterations per stage")
+    parser.add_argument('--max-seconds', type=float, default=3.0,
+                        help="Time cap per stage; slow stages stop early (default: 3)")
+    parser.add_argument('--stage', action='append', default=None, help="Only run this stage; repeatable")
+    parser.add_argument('--baseline', default=None, help="Baseline JSON to compare against")
+    parser.add_argument('--save-baseline', default=None, help="Write results as a new baseline JSON")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed slowdown vs baseline (default: 0.25 = 25%%)")
+    parser.add_argument('--json', default=None, help="Write full results to this JSON file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main function"""
+    args = parse_args(argv)
+
+    resolutions = None
+    if args.resolution:
+        try:
+            resolutions = dict(_parse_resolution(value) for value in args.resolution)
+        except ValueError:
+            print(f"Error: Invalid resolution: {args.resolution}")
+            return 2
+
+    baseline = None
+    if args.baseline:
+        try:
+            baseline = load_baseline(args.baseline)
+        except (OSError, ValueError) as e:
+            print(f"Error: Cannot read baseline: {e}")
+            return 2
+
+    report = run_benchmark(resolutions, args.iterations, args.warmup, args.stage, args.max_seconds)
+    print(format_report(report, baseline))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    if args.save_baseline:
+        save_baseline(report, args.save_baseline)
+
+    if baseline is not None:
+        regressions = compare(report, baseline, args.tolerance)
+        for resolution, stage, base_ms, current_ms in regressions:
+            message = (f"Regression: {resolution} {stage} {current_ms:.2f} ms "
+                       f"(baseline {base_ms:.2f} ms, tolerance {args.tolerance:.0%})")
+            logger.error(message)
+            print(message)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,213 @@
+"""
+Camera discovery module
+Probe song song các camera device (backend của cùng device thử tuần tự) có timeout, cache device dùng được lần trước ra đĩa
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+
+import cv2
+from frame_source import CameraSource
+from utils.logger import logger
+
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'thermal_camera', 'last_camera.json')
+
+
+def default_candidates(preferred_index=0):
+    """
+    Các (index, backend) cần probe theo thứ tự ưu tiên
+
+    Args:
+        preferred_index (int): Index thử đầu tiên
+
+    Returns:
+        list: [(index, backend)] - backend None là backend mặc định của OpenCV
+    """
+    candidates = [(preferred_index, None)]
+    candidates += [(index, None) for index in (0, 1, 2) if index != preferred_index]
+    if sys.platform.startswith('win'):
+        # DirectShow chỉ có trên Windows
+        candidates.append((0, cv2.CAP_DSHOW))
+    return candidates
+
+
+class CameraCache:
+    """Lưu device/backend mở được lần trước để lần sau thử nó trước tiên"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        """
+        Args:
+            path (str): File JSON cache
+        """
+        self.path = path
+
+    def load(self):
+        """
+        Returns:
+            tuple: (index, backend) hoặc None nếu chưa có/không đọc được
+        """
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            return int(data['index']), data.get('backend')
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring invalid camera cache {self.path}: {e}")
+            return None
+
+    def save(self, index, backend=None):
+        """
+        Ghi device đang dùng
+
+        Args:
+            index (int): Device index
+            backend (int): OpenCV backend (optional)
+        """
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, 'w') as f:
+                json.dump({'index': index, 'backend': backend, 'saved': time.time()}, f)
+        except OSError as e:
+            logger.warning(f"Cannot write camera cache {self.path}: {e}")
+
+    def clear(self):
+        """Xóa cache"""
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def probe_cameras(candidates, factory, timeout=3.0):
+    """
+    Probe song song các device index, chọn source mở được có độ ưu tiên cao nhất
+
+    Các backend của cùng một index được thử tuần tự trong một thread (driver không
+    cho mở cùng một device đồng thời), chỉ các index khác nhau chạy song song.
+    Probe quá timeout bị bỏ qua (thread vẫn chạy nền và tự đóng source khi xong).
+
+    Args:
+        candidates (list): [(index, backend)] theo thứ tự ưu tiên
+        factory (function): factory(index, backend) -> FrameSource chưa mở
+        timeout (float): Thời gian chờ tối đa cho toàn bộ lần probe (giây)
+
+    Returns:
+        FrameSource: Source đã mở, hoặc None
+    """
+    futures = []
+    groups = {}
+    for index, backend in candidates:
+        future = Future()
+        groups.setdefault(index, []).append((backend, future))
+        futures.append(future)
+
+    for index, probes in groups.items():
+        thread = threading.Thread(target=_run_probe_group, args=(factory, index, probes),
+                                  name=f"camera-probe-{index}", daemon=True)
+        thread.start()
+
+    deadline = time.monotonic() + timeout
+    chosen = None
+    for (index, backend), future in zip(candidates, futures):
+        if chosen is None:
+            try:
+                chosen = future.result(max(0.0, deadline - time.monotonic()))
+            except TimeoutError:
+                logger.warning(f"Camera probe timed out: index {index}, backend {backend}")
+            if chosen is not None:
+                continue
+        # Source không được chọn (kể cả probe chưa xong) được đóng khi probe kết thúc
+        future.add_done_callback(_release_unused)
+    return chosen
+
+
+def discover_camera(width=640, height=480, fps=15, cache=None, candidates=None, timeout=3.0,
+                    factory=None):
+    """
+    Tìm camera: thử device trong cache trước, sau đó probe song song mọi candidate
+
+    Args:
+        width (int): Độ rộng frame mong muốn
+        height (int): Độ cao frame mong muốn
+        fps (int): FPS mong muốn
+        cache (CameraCache): Cache device dùng được lần trước (optional)
+        candidates (list): [(index, backend)] (default: default_candidates())
+        timeout (float): Timeout cho mỗi vòng probe (giây)
+        factory (function): factory(index, backend) -> FrameSource (default: CameraSource)
+
+    Returns:
+        FrameSource: Camera source đã mở, hoặc None
+    """
+    if factory is None:
+        def factory(index, backend):
+            return CameraSource(index, backend=backend, width=width, height=height, fps=fps)
+    candidates = list(candidates if candidates is not None else default_candidates())
+
+    cached = cache.load() if cache is not None else None
+    if cached is not None:
+        source = probe_cameras([cached], factory, timeout)
+        if source is not None:
+            logger.info(f"Opened cached camera: {source.describe()}")
+            return source
+        logger.info(f"Cached camera {cached[0]} unavailable, probing all devices")
+        candidates = [candidate for candidate in candidates if candidate != cached]
+
+    start = time.perf_counter()
+    source = probe_cameras(candidates, factory, timeout)
+    if source is None:
+        return None
+
+    logger.info(f"Camera discovered in {time.perf_counter() - start:.2f}s: {source.describe()}")
+    if cache is not None:
+        cache.save(getattr(source, 'index', 0), getattr(source, 'backend', None))
+    return source
+
+
+def _run_probe(future, factory, index, backend):
+    """Mở một candidate trong probe thread, kết quả là source đã mở hoặc None"""
+    source = None
+    try:
+        source = factory(index, backend)
+        if source.open():
+            future.set_result(source)
+            return
+    except Exception as e:
+        logger.debug(f"Camera probe failed for index {index}: {e}")
+    if source is not None:
+        source.release()
+    future.set_result(None)
+
+
+def _run_probe_group(factory, index, probes):
+    """
+    Thử lần lượt các backend của một index, dừng ở backend đầu tiên mở được
+
+    Args:
+        factory (function): factory(index, backend) -> FrameSource chưa mở
+        index (int): Device index
+        probes (list): [(backend, future)] theo thứ tự ưu tiên
+    """
+    opened = False
+    for backend, future in probes:
+        if opened:
+            # Device đã mở bằng backend ưu tiên hơn
+            future.set_result(None)
+            continue
+        _run_probe(future, factory, index, backend)
+        opened = future.result() is not None
+
+
+def _release_unused(future):
+    """Đóng source mở được nhưng không được chọn"""
+    source = future.result()
+    if source is not None:
+        logger.debug(f"Releasing unused {source.describe()}")
+        source.release()
@@ -7,91 +7,198 @@ import cv2
 import numpy as np
 import threading
 import time
-from datetime import datetime
-import os
+from collections import deque
+from concurrent.futures import Future
+from archive import ArchiveWriter
+from camera_discovery import CameraCache, default_candidates, discover_camera
+from capture_writer import ENCODERS, CaptureWriter
+from frame_context import FrameContext
+from frame_pool import FrameHandle, FrameRingBuffer
+from hotspots import HotSpotTracker
+from metrics import HotPathMetrics, MetricsExporter
+from motion import MotionEnergyLayer
 from night_mode import NightModeProcessor
+from normalization import NORMALIZATION_STRATEGIES, IntensityNormalizer
+from palette import palette_registry, apply_lut
+from pipeline import FrameMailbox, FramePipeline
+from rate_control import FrameRateController
+from recorder import ThermalRecorder
 from utils.logger import logger
 
 
+# Tỷ lệ độ phân giải khi xử lý thermal (kết quả được upscale lại)
+PROCESSING_SCALES = {
+    'full': 1.0,
+    'half': 0.5,
+    'quarter': 0.25,
+}
+
+# Độ phân giải capture thường gặp của webcam
+CAPTURE_RESOLUTIONS = {
+    'vga': (640, 480),
+    'hd': (1280, 720),
+    'fullhd': (1920, 1080),
+}
+
+
 class ThermalCameraHandler:
     """Class xử lý camera và thermal effects"""
     
-    def __init__(self, camera_index=0):
+    def __init__(self, camera_index=None, frame_source=None):
         """
         Khởi tạo camera handler
         
         Args:
-            camera_index (int): Index của camera (default: 0)
+            camera_index (int): Index của camera (default: None - thử camera trong cache, rồi index 0)
+            frame_source (FrameSource): Nguồn frame thay cho camera (optional)
         """
-        self.camera_index = camera_index
-        self.cap = None
+        # Index được chỉ định rõ thì không dùng camera trong cache
+        self.requested_index = camera_index
+        self.camera_index = camera_index if camera_index is not None else 0
+        self.frame_source = frame_source
+        self.source = None
         self.is_running = False
         self.is_capturing = False
-        self.current_frame = None
-        self.thermal_frame = None
+        # Frame mới nhất đã hiển thị (handle có version, không copy)
+        self._published = None
+        # UI lấy frame mới nhất từ mailbox trên Tk thread
+        self.frame_mailbox = FrameMailbox()
+        
+        # Capture ghi ở background
+        self.capture_writer = None
+        self.capture_encoder = 'jpeg'
+        self.jpeg_quality = 95
+        self.png_compression = 3
+        self._burst_requests = deque()
+        
+        # Video recording (encoder thread riêng)
+        self.recorder = None
+        
+        # Timing từng stage trên hot path (rolling histograms)
+        self.metrics = HotPathMetrics()
+        self.metrics_exporter = None
+        
+        # Raw intensity archive (mở khi có frame đầu tiên)
+        self.archive = None
+        self.archive_path = None
+        self.archive_kind = 'gray'
+        self.frame_pool = None
         self.frame_callback = None
+        # Consumer phụ (vd: MJPEG server) nhận FrameHandle, không được block
+        self.frame_listeners = []
         
         # Night mode processor
         self.night_processor = NightModeProcessor()
         
+        # Thermal palettes - LUT 256 màu được compile một lần và cache
+        self.palettes = palette_registry
+        self.day_palette = 'thermal_day'
+        self.night_palette = 'thermal_night'
+        self.day_lut = self.palettes.get_lut(self.day_palette)
+        self.night_lut = self.palettes.get_lut(self.night_palette)
+        
+        # Normalize trước palette (day/night có phân bố khác nhau -> state riêng)
+        self.normalization = 'frame'
+        self.day_normalizer = IntensityNormalizer()
+        self.night_normalizer = IntensityNormalizer()
+        
+        # Nhiệt chuyển động cộng vào intensity trước khi map palette
+        self.motion_layer = MotionEnergyLayer()
+        self.motion_overlay = True
+        
+        # Hot spot detection/tracking (bật bằng enable_hotspots)
+        self.hotspot_tracker = None
+        
         # Threading
         self.capture_thread = None
         self.thread_lock = threading.Lock()
+        self._scratch_buffers = threading.local()
+        
+        # Pipeline: capture thread -> processing workers -> presenter
+        self.pipeline = None
+        self.processing_workers = 1
+        self.queue_size = 2
         
         # Frame rate control - giảm FPS để ổn định hơn
         self.fps = 15
         self.frame_delay = 1.0 / self.fps
+        self.night_processor.set_frame_budget(self.frame_delay)
+        
+        # Deadline scheduler; khi quá tải thì giảm enhancement/độ phân giải/bỏ frame
+        self.rate_controller = FrameRateController(self.fps)
+        self.rate_controller.add_listener(self._apply_quality_level)
+        self.rate_scale = 1.0
+        self.frame_skip = 1
+        
+        # Processing resolution / ROI (thermal tính trên buffer nhỏ hơn)
+        self.processing_scale = 1.0
+        self.roi = None
+        self.capture_resolution = CAPTURE_RESOLUTIONS['vga']
+        self._enhancement_budget_scale = 1.0
+        # Nguồn offline mặc định chạy full speed, bật để phát lại theo FPS
+        self.realtime = False
         
-        logger.info(f"Thermal camera handler initialized for camera {camera_index}")
+        # Camera discovery + reconnect khi camera mất kết nối (vd: USB glitch)
+        self.camera_cache = CameraCache()
+        self.probe_timeout = 3.0
+        self.max_read_failures = 5
+        self.reconnect_delay = 0.5
+        self.reconnect_max_delay = 8.0
+        self.reconnecting = False
+        self.reconnects = 0
+        self._stop_event = threading.Event()
+        
+        if frame_source is not None:
+            logger.info(f"Thermal camera handler initialized for {frame_source.describe()}")
+        else:
+            logger.info(f"Thermal camera handler initialized for camera {self.camera_index}")
     
     def initialize_camera(self):
         """
         Khởi tạo camera với fallback cho nhiều camera index
+        (hoặc mở frame source nếu đã được cấu hình)
         
         Returns:
             bool: True nếu khởi tạo thành công
         """
-        # Thử các camera index khác nhau
-        camera_indices = [0, 1, 2, -1]  # -1 cho DirectShow trên Windows
+        if self.frame_source is not None:
+            return self._open_source(self.frame_source)
         
-        for idx in camera_indices:
-            try:
-                logger.info(f"Trying camera index: {idx}")
-                
-                # Thử với DirectShow backend trên Windows
-                if idx == -1:
-                    self.cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
-                else:
-                    self.cap = cv2.VideoCapture(idx)
-                
-                # Đợi một chút để camera khởi tạo
-                time.sleep(0.5)
-                
-                if self.cap.isOpened():
-                    # Test đọc frame
-                    ret, frame = self.cap.read()
-                    if ret and frame is not None:
-                        # Set camera properties
-                        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-                        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
-                        self.cap.set(cv2.CAP_PROP_FPS, 15)  # Giảm FPS để ổn định hơn
-                        
-                        self.camera_index = idx if idx != -1 else 0
-                        logger.info(f"Camera initialized successfully with index: {self.camera_index}")
-                        return True
-                
-                # Nếu không thành công, release và thử tiếp
-                if self.cap:
-                    self.cap.release()
-                    self.cap = None
-                    
-            except Exception as e:
-                logger.warning(f"Failed to initialize camera {idx}: {e}")
-                if self.cap:
-                    self.cap.release()
-                    self.cap = None
+        # Device trong cache thử trước (khi không chỉ định index), sau đó probe song song
+        # (có timeout) các index/backend
+        width, height = self.capture_resolution
+        cache = self.camera_cache if self.requested_index is None else None
+        source = discover_camera(width, height, self.fps, cache=cache,
+                                 candidates=default_candidates(self.camera_index),
+                                 timeout=self.probe_timeout)
+        if source is None:
+            logger.error("Cannot initialize any camera")
+            return False
+        
+        self.source = source
+        self.camera_index = source.index
+        logger.info(f"Camera initialized successfully with index: {self.camera_index}")
+        return True
+    
+    def _open_source(self, source):
+        """
+        Mở frame source và gán làm nguồn hiện tại
         
-        logger.error("Cannot initialize any camera")
+        Args:
+            source (FrameSource): Nguồn frame
+            
+        Returns:
+            bool: True nếu mở thành công
+        """
+        try:
+            if source.open():
+                self.source = source
+                logger.info(f"Frame source opened: {source.describe()}")
+                return True
+        except Exception as e:
+            logger.warning(f"Failed to open {source.describe()}: {e}")
+        
+        source.release()
         return False
     
     def start_capture(self, frame_callback=None):
@@ -99,7 +206,8 @@ class ThermalCameraHandler:
         Bắt đầu capture video
         
         Args:
-            frame_callback (function): Callback function để xử lý frame
+            frame_callback (function): Callback function để xử lý frame, gọi từ
+                presenter thread (UI nên đọc frame_mailbox thay vì dùng callback)
             
         Returns:
             bool: True nếu start thành công
@@ -115,6 +223,22 @@ class ThermalCameraHandler:
         self.frame_callback = frame_callback
         self.is_running = True
         self.is_capturing = True
+        self._stop_event.clear()
+        
+        # Processing workers + presenter; nguồn live bỏ frame cũ khi xử lý chậm,
+        # nguồn offline dùng back-pressure để không mất frame
+        self.pipeline = FramePipeline(
+            self._process_frame,
+            self._present_frame,
+            workers=self.processing_workers,
+            queue_size=self.queue_size,
+            drop_oldest=self.source.is_live,
+            release_fn=self._release_packet
+        )
+        # Đủ slot cho mọi frame có thể nằm trong pipeline cùng lúc
+        # (2 queues + workers + reorder buffer + presenter + frame đã publish + capture)
+        self.frame_pool = FrameRingBuffer(2 * self.queue_size + 2 * self.processing_workers + 3)
+        self.pipeline.start()
         
         # Start capture thread
         self.capture_thread = threading.Thread(target=self._capture_loop)
@@ -126,133 +250,704 @@ class ThermalCameraHandler:
     
     def _capture_loop(self):
         """Main capture loop chạy trong thread riêng"""
-        last_frame_time = time.time()
+        source = self.source
+        pipeline = self.pipeline
+        frame_pool = self.frame_pool
+        rate = self.rate_controller
+        throttle = source.is_live or self.realtime
+        frame_count = 0
+        failures = 0
+        rate.reset()
         
-        while self.is_running and self.cap and self.cap.isOpened():
+        while self.is_running:
+            if not source.is_opened():
+                if not source.is_live:
+                    break
+                # Camera mất kết nối: mở lại với backoff, pipeline/UI vẫn chạy
+                source = self._reconnect(source)
+                if source is None:
+                    break
+                failures = 0
+                rate.reset()
+                continue
+            
             try:
-                # Frame rate control
-                current_time = time.time()
-                if current_time - last_frame_time < self.frame_delay:
-                    time.sleep(0.001)  # Small sleep to prevent busy waiting
+                # Frame rate control (chỉ cho nguồn live hoặc chế độ realtime):
+                # ngủ tới đúng deadline của frame kế tiếp
+                if throttle:
+                    rate.wait()
+                
+                # Đọc thẳng vào buffer cấp phát trước
+                slot = frame_pool.acquire(timeout=1.0)
+                if slot is None:
                     continue
                 
-                ret, frame = self.cap.read()
+                read_start = time.perf_counter()
+                ret, frame = source.read(slot.frame)
+                read_end = time.perf_counter()
+                self.metrics.record('read', read_end - read_start)
                 if not ret:
-                    logger.warning("Failed to read frame from camera")
+                    frame_pool.release(slot)
+                    if not source.is_live:
+                        logger.info(f"Frame source exhausted: {source.describe()}")
+                        break
+                    failures += 1
+                    logger.warning(f"Failed to read frame from camera ({failures}/{self.max_read_failures})")
+                    if failures >= self.max_read_failures:
+                        source.release()
                     continue
+                failures = 0
                 
-                # Process frame
-                processed_frame = self._process_frame(frame)
-                
-                # Thread-safe frame update
-                with self.thread_lock:
-                    self.current_frame = frame.copy()
-                    self.thermal_frame = processed_frame.copy()
+                # Quá tải: vẫn đọc để camera không bị trễ, nhưng bỏ qua xử lý
+                frame_count += 1
+                if self.frame_skip > 1 and frame_count % self.frame_skip:
+                    frame_pool.release(slot)
+                    continue
                 
-                # Callback to UI
-                if self.frame_callback and self.is_capturing:
-                    self.frame_callback(processed_frame)
+                # Đẩy sang processing workers - capture không chờ xử lý/hiển thị
+                slot.bind(frame)
+                pipeline.submit(frame, captured_at=read_end, read_seconds=read_end - read_start, slot=slot)
                 
-                last_frame_time = current_time
+                if throttle:
+                    rate.update(pipeline.stats['process'].avg_ms / 1000.0, self.processing_workers)
                 
             except Exception as e:
                 logger.error(f"Error in capture loop: {e}")
                 break
         
+        # Xử lý nốt các frame còn trong pipeline
+        pipeline.finish(timeout=2.0)
         logger.info("Capture loop ended")
     
-    def _process_frame(self, frame):
+    def _reconnect(self, source):
+        """
+        Mở lại camera với exponential backoff cho tới khi thành công hoặc capture bị dừng
+        
+        Args:
+            source (FrameSource): Source vừa mất kết nối
+            
+        Returns:
+            FrameSource: Source đã mở lại, hoặc None nếu capture bị dừng
+        """
+        self.reconnecting = True
+        logger.warning(f"Lost {source.describe()}, reconnecting")
+        delay = self.reconnect_delay
+        attempt = 0
+        try:
+            while self.is_running:
+                attempt += 1
+                source.release()
+                if self.frame_source is not None:
+                    reopened = self._open_source(source)
+                else:
+                    # Camera tự tìm: thử device cũ (trong cache) trước, rồi probe lại
+                    reopened = self.initialize_camera()
+                
+                if reopened and not self.is_running:
+                    # stop_capture chạy trong lúc đang probe: source vừa mở không còn ai đóng
+                    reopened_source = self.source
+                    self.source = None
+                    if reopened_source is not None:
+                        reopened_source.release()
+                    break
+                if reopened:
+                    self.reconnects += 1
+                    logger.info(f"Reconnected to {self.source.describe()} after {attempt} attempt(s)")
+                    return self.source
+                
+                logger.warning(f"Reconnect attempt {attempt} failed, retrying in {delay:.1f}s")
+                if self._stop_event.wait(delay):
+                    break
+                delay = min(delay * 2, self.reconnect_max_delay)
+            return None
+        finally:
+            self.reconnecting = False
+    
+    def _present_frame(self, packet):
+        """
+        Presenter stage: cập nhật frame hiện tại và gọi callback UI
+        
+        Args:
+            packet (FramePacket): Frame đã xử lý
+        """
+        # Publish slot mới, trả slot đã publish trước đó về pool
+        start = time.perf_counter()
+        handle = FrameHandle(packet.slot, packet.seq)
+        with self.thread_lock:
+            previous = self._published
+            self._published = handle
+        
+        if previous is not None and previous.slot is not packet.slot:
+            self._release_slot(previous.slot)
+        
+        if self._burst_requests:
+            self._submit_burst_frame(packet.thermal)
+        
+        recorder = self.recorder
+        if recorder is not None:
+            # captured_at là perf_counter, recorder cần wall-clock (time.time)
+            captured_wall = time.time() - (time.perf_counter() - packet.captured_at)
+            recorder.push(packet.thermal, captured_wall)
+        
+        if self.is_capturing:
+            # Hand-off cho UI (không gọi Tk từ thread này)
+            self.frame_mailbox.post(handle)
+            posted_at = time.perf_counter()
+            self.metrics.record('copy', posted_at - start)
+            self.metrics.tick(posted_at)
+            
+            for listener in self.frame_listeners:
+                listener(handle)
+            
+            # Callback (headless consumers)
+            if self.frame_callback:
+                self.frame_callback(packet.thermal)
+                self.metrics.record('callback', time.perf_counter() - posted_at)
+    
+    def add_frame_listener(self, listener):
+        """
+        Đăng ký consumer nhận FrameHandle của mỗi frame đã xử lý
+        
+        Args:
+            listener (function): listener(handle), gọi từ presenter thread, không được block
+        """
+        if listener not in self.frame_listeners:
+            # Copy-on-write: presenter thread duyệt list mà không cần lock
+            self.frame_listeners = self.frame_listeners + [listener]
+    
+    def remove_frame_listener(self, listener):
+        """Hủy đăng ký frame listener"""
+        self.frame_listeners = [item for item in self.frame_listeners if item != listener]
+    
+    def _release_packet(self, packet):
+        """Trả frame slot của packet bị drop về pool"""
+        self._release_slot(packet.slot)
+    
+    def _release_slot(self, slot):
+        """Trả slot về pool mà nó thuộc về"""
+        frame_pool = self.frame_pool
+        if frame_pool is not None and slot is not None and slot in frame_pool.slots:
+            frame_pool.release(slot)
+    
+    def set_target_fps(self, fps):
+        """
+        Đổi FPS mục tiêu cho nguồn live
+        
+        Args:
+            fps (float): FPS mục tiêu
+        """
+        self.fps = fps
+        self.frame_delay = 1.0 / fps
+        self.rate_controller.set_target_fps(fps)
+        self.night_processor.set_frame_budget(self.frame_delay * self._enhancement_budget_scale)
+        logger.info(f"Target FPS set to: {fps}")
+    
+    def _apply_quality_level(self, level, settings):
+        """
+        Áp dụng mức chất lượng do rate controller chọn
+        
+        Args:
+            level (int): Index mức chất lượng
+            settings (dict): {'enhancement_budget', 'scale', 'skip'}
+        """
+        self._enhancement_budget_scale = settings['enhancement_budget']
+        # Auto backend chọn enhancement rẻ hơn khi budget nhỏ lại
+        self.night_processor.set_frame_budget(self.frame_delay * self._enhancement_budget_scale)
+        self.rate_scale = settings['scale']
+        self.frame_skip = settings['skip']
+    
+    def set_processing_scale(self, scale):
+        """
+        Đặt độ phân giải xử lý thermal
+        
+        Args:
+            scale (str | float): 'full', 'half', 'quarter' hoặc tỷ lệ trong (0, 1]
+            
+        Returns:
+            bool: True nếu hợp lệ
+        """
+        value = PROCESSING_SCALES.get(scale, scale)
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            value = 0.0
+        if not 0.0 < value <= 1.0:
+            logger.warning(f"Invalid processing scale: {scale}. "
+                           f"Must be one of {list(PROCESSING_SCALES)} or a ratio in (0, 1]")
+            return False
+        
+        self.processing_scale = value
+        logger.info(f"Processing scale set to: {value}")
+        return True
+    
+    def set_roi(self, roi):
+        """
+        Chỉ xử lý một vùng của frame; kết quả được upscale lên toàn khung hình
+        
+        Args:
+            roi (tuple): (x, y, width, height) theo pixel của frame capture, None để tắt
+        """
+        if roi is not None:
+            if len(roi) != 4 or roi[2] <= 0 or roi[3] <= 0:
+                logger.warning(f"Invalid ROI: {roi}")
+                return False
+            roi = tuple(int(v) for v in roi)
+        self.roi = roi
+        logger.info(f"ROI set to: {roi}" if roi else "ROI disabled")
+        return True
+    
+    def set_capture_resolution(self, width, height=None):
+        """
+        Đặt độ phân giải capture mong muốn (áp dụng khi mở camera lần sau)
+        
+        Args:
+            width (int | str): Độ rộng hoặc tên preset ('vga', 'hd', 'fullhd')
+            height (int): Độ cao (khi width là số)
+            
+        Returns:
+            bool: True nếu hợp lệ
+        """
+        if height is None:
+            if width not in CAPTURE_RESOLUTIONS:
+                logger.warning(f"Unknown capture resolution: {width}. "
+                               f"Must be one of {list(CAPTURE_RESOLUTIONS)}")
+                return False
+            width, height = CAPTURE_RESOLUTIONS[width]
+        
+        self.capture_resolution = (int(width), int(height))
+        logger.info(f"Capture resolution requested: {width}x{height}")
+        return True
+    
+    def get_rate_stats(self):
+        """
+        FPS mục tiêu/thực tế, tải xử lý và mức chất lượng hiện tại
+        
+        Returns:
+            dict: Stats của rate controller
+        """
+        return self.rate_controller.get_stats()
+    
+    def start_metrics_export(self, path="logs/metrics.jsonl", interval=5.0):
+        """
+        Xuất snapshot metrics (stage histograms + pipeline stats) định kỳ
+        
+        Args:
+            path (str): File JSON lines (append)
+            interval (float): Chu kỳ xuất (giây)
+            
+        Returns:
+            MetricsExporter: Exporter đang chạy
+        """
+        self.stop_metrics_export()
+        self.metrics_exporter = MetricsExporter(
+            self.metrics, path, interval,
+            extra=lambda: {'pipeline': self.get_pipeline_stats(), 'rate': self.get_rate_stats()}
+        )
+        self.metrics_exporter.start()
+        return self.metrics_exporter
+    
+    def stop_metrics_export(self):
+        """Dừng xuất metrics (ghi snapshot cuối)"""
+        exporter = self.metrics_exporter
+        self.metrics_exporter = None
+        if exporter is not None:
+            exporter.stop()
+    
+    def get_pipeline_stats(self):
+        """
+        Latency từng stage (capture/process/present/end_to_end) và số frame bị drop
+        
+        Returns:
+            dict: Pipeline stats hoặc None nếu chưa chạy
+        """
+        if self.pipeline is None:
+            return None
+        return self.pipeline.get_stats()
+    
+    def _process_frame(self, frame, out=None):
         """
         Xử lý frame để tạo thermal effect thực tế
         
         Args:
             frame (numpy.ndarray): Frame gốc
+            out (numpy.ndarray): Buffer để ghi thermal frame in-place (optional)
+            
+        Returns:
+            numpy.ndarray: Frame với thermal effect
+        """
+        scale = self.processing_scale * self.rate_scale
+        roi = self.roi
+        if scale >= 1.0 and roi is None:
+            return self._render_thermal(frame, out)
+        
+        height, width = frame.shape[:2]
+        if roi is not None:
+            # ROI là view trên frame gốc (không copy)
+            x, y, roi_width, roi_height = self._clip_roi(roi, width, height)
+            source = frame[y:y + roi_height, x:x + roi_width]
+        else:
+            source = frame
+        
+        # Xử lý ở độ phân giải thấp, chỉ upscale kết quả
+        if scale < 1.0:
+            source_height, source_width = source.shape[:2]
+            size = (max(1, int(source_width * scale)), max(1, int(source_height * scale)))
+            small = self._scratch('scaled_input', (size[1], size[0]) + frame.shape[2:])
+            source = cv2.resize(source, size, dst=small, interpolation=cv2.INTER_AREA)
+        
+        offset = (x, y) if roi is not None else (0, 0)
+        thermal = self._render_thermal(source, self._scratch('scaled_thermal', source.shape[:2] + (3,)),
+                                       offset, min(scale, 1.0))
+        if out is None:
+            out = np.empty((height, width, 3), dtype=np.uint8)
+        return cv2.resize(thermal, (width, height), dst=out, interpolation=cv2.INTER_LINEAR)
+    
+    @staticmethod
+    def _clip_roi(roi, width, height):
+        """
+        Giới hạn ROI trong frame
+        
+        Returns:
+            tuple: (x, y, width, height) hợp lệ (ít nhất 1x1)
+        """
+        x, y, roi_width, roi_height = (int(v) for v in roi)
+        x = min(max(x, 0), width - 1)
+        y = min(max(y, 0), height - 1)
+        roi_width = min(max(roi_width, 1), width - x)
+        roi_height = min(max(roi_height, 1), height - y)
+        return x, y, roi_width, roi_height
+    
+    def _render_thermal(self, frame, out=None, offset=(0, 0), scale=1.0):
+        """
+        Detect day/night và tạo thermal frame ở độ phân giải của frame
+        
+        Args:
+            frame (numpy.ndarray): Frame gốc
+            out (numpy.ndarray): Buffer output (optional)
+            offset (tuple): Góc (x, y) của frame trong frame gốc (ROI), cho tọa độ hot spots
+            scale (float): Tỷ lệ so với frame gốc, cho tọa độ hot spots
             
         Returns:
             numpy.ndarray: Frame với thermal effect
         """
         try:
+            # Grayscale/normalize/stats tính một lần, các stage dùng chung
+            ctx = FrameContext(frame, self._scratch)
+            
             # Detect low light condition
-            is_low_light = self.night_processor.detect_low_light(frame)
+            start = time.perf_counter()
+            is_low_light = self.night_processor.detect_low_light(ctx)
+            self.metrics.record('detect', time.perf_counter() - start)
+            
+            if self.archive_path is not None:
+                self._archive_frame(ctx, is_low_light)
             
             if is_low_light:
                 # Night mode: Thermal scanning với màu lạnh
-                thermal = self._create_night_thermal(frame)
+                thermal = self._create_night_thermal(ctx, out)
             else:
                 # Day mode: Thermal scanning với màu nóng
-                thermal = self._create_day_thermal(frame)
+                thermal = self._create_day_thermal(ctx, out)
+            
+            tracker = self.hotspot_tracker
+            if tracker is not None and ctx.intensity is not None:
+                start = time.perf_counter()
+                tracker.update(ctx.intensity, offset, scale)
+                self.metrics.record('hotspots', time.perf_counter() - start)
             
             return thermal
             
         except Exception as e:
             logger.error(f"Error processing frame: {e}")
-            return frame
+            return self._fallback_frame(frame, out)
+    
+    @staticmethod
+    def _fallback_frame(frame, out=None):
+        """
+        Frame thay thế khi xử lý lỗi: ghi frame gốc vào buffer output
+        (không trả về frame gốc - đó có thể là buffer camera sẽ bị ghi đè)
+        
+        Args:
+            frame (numpy.ndarray): Frame gốc
+            out (numpy.ndarray): Buffer output (optional)
+            
+        Returns:
+            numpy.ndarray: Frame BGR 3 kênh (out nếu có)
+        """
+        if out is None:
+            out = np.empty(frame.shape[:2] + (3,), dtype=np.uint8)
+        if frame.ndim == 2:
+            return cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR, dst=out)
+        if frame.shape == out.shape and frame.dtype == out.dtype:
+            np.copyto(out, frame)
+        else:
+            out.fill(0)
+        return out
     
-    def _create_night_thermal(self, frame):
+    def _create_night_thermal(self, frame, out=None):
         """
         Tạo thermal effect cho ban đêm (màu lạnh - xanh/tím)
+        
+        Args:
+            frame (numpy.ndarray | FrameContext): Frame gốc hoặc frame context
+            out (numpy.ndarray): Buffer output (optional)
         """
-        # Enhance cho điều kiện ánh sáng thấp
-        enhanced = self.night_processor.enhance_low_light_image(frame)
+        ctx = FrameContext.of(frame, self._scratch)
         
-        # Convert sang grayscale
-        gray = cv2.cvtColor(enhanced, cv2.COLOR_BGR2GRAY)
+        # Enhance cho điều kiện ánh sáng thấp (tăng sáng trên BGR như bản gốc, rồi khử nhiễu grayscale)
+        start = time.perf_counter()
+        bright = self._scratch('enhanced_bgr', ctx.frame.shape)
+        try:
+            enhanced = self.night_processor.enhance_gray(ctx.frame, out=ctx.buffer('enhanced'), bright=bright)
+        except Exception as e:
+            logger.error(f"Error in image enhancement: {e}")
+            enhanced = ctx.gray
+        enhanced_at = time.perf_counter()
+        self.metrics.record('enhance', enhanced_at - start)
+        
+        # Normalize gray values
+        normalized = self.night_normalizer.normalize(enhanced, out=ctx.buffer('normalized'))
+        normalized_at = time.perf_counter()
+        normalized = self._apply_motion(ctx, normalized)
+        ctx.intensity = normalized
         
-        # Tạo thermal map dựa trên độ sáng
         # Vùng sáng = nóng (màu trắng/vàng), vùng tối = lạnh (màu xanh/tím)
-        thermal_map = np.zeros_like(frame, dtype=np.uint8)
+        colorize_start = time.perf_counter()
+        thermal = apply_lut(normalized, self.night_lut, out)
+        self.metrics.record('colorize', normalized_at - enhanced_at + time.perf_counter() - colorize_start)
+        return thermal
+    
+    def _create_day_thermal(self, frame, out=None):
+        """
+        Tạo thermal effect cho ban ngày (màu nóng - đỏ/vàng)
         
-        # Normalize gray values
-        normalized = cv2.normalize(gray, None, 0, 255, cv2.NORM_MINMAX)
+        Args:
+            frame (numpy.ndarray | FrameContext): Frame gốc hoặc frame context
+            out (numpy.ndarray): Buffer output (optional)
+        """
+        ctx = FrameContext.of(frame, self._scratch)
         
-        # Tạo gradient màu từ lạnh đến nóng
-        for i in range(frame.shape[0]):
-            for j in range(frame.shape[1]):
-                intensity = normalized[i, j]
-                
-                if intensity < 50:  # Rất lạnh - xanh đậm
-                    thermal_map[i, j] = [intensity, 0, 100]
-                elif intensity < 100:  # Lạnh - xanh nhạt
-                    thermal_map[i, j] = [intensity, intensity//2, 150]
-                elif intensity < 150:  # Ấm - tím
-                    thermal_map[i, j] = [intensity, intensity//3, 200]
-                elif intensity < 200:  # Nóng - đỏ
-                    thermal_map[i, j] = [50, intensity//4, intensity]
-                else:  # Rất nóng - trắng/vàng
-                    thermal_map[i, j] = [100, intensity//2, intensity]
+        normalizer = self.day_normalizer
+        if normalizer.strategy == 'frame':
+            # Min/max đã có từ brightness stats của detect
+            intensity = ctx.normalized
+        else:
+            intensity = normalizer.normalize(ctx.gray, out=ctx.buffer('intensity'))
+        intensity = self._apply_motion(ctx, intensity)
+        ctx.intensity = intensity
         
-        return thermal_map
+        # Gradient màu từ lạnh đến nóng (phong cách ban ngày)
+        start = time.perf_counter()
+        thermal = apply_lut(intensity, self.day_lut, out)
+        self.metrics.record('colorize', time.perf_counter() - start)
+        return thermal
     
-    def _create_day_thermal(self, frame):
+    def _apply_motion(self, ctx, intensity):
         """
-        Tạo thermal effect cho ban ngày (màu nóng - đỏ/vàng)
+        Cộng năng lượng chuyển động (từ grayscale gốc) vào intensity
+        
+        Args:
+            ctx (FrameContext): Frame context
+            intensity (numpy.ndarray): Intensity uint8 trước khi map palette
+            
+        Returns:
+            numpy.ndarray: Intensity đã cộng nhiệt chuyển động (hoặc giữ nguyên nếu tắt)
+        """
+        if not self.motion_overlay:
+            return intensity
+        start = time.perf_counter()
+        result = self.motion_layer.apply(ctx.gray, intensity, out=ctx.buffer('motion'))
+        self.metrics.record('motion', time.perf_counter() - start)
+        return result
+    
+    def set_motion_overlay(self, enabled=True, weight=None):
         """
-        # Convert sang grayscale
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        Bật/tắt nhiệt chuyển động
         
-        # Tạo thermal map dựa trên độ sáng và chuyển động
-        thermal_map = np.zeros_like(frame, dtype=np.uint8)
+        Args:
+            enabled (bool): True để cộng năng lượng chuyển động vào thermal
+            weight (float): Mức cộng năng lượng (optional, giữ nguyên nếu None)
+        """
+        if weight is not None:
+            self.motion_layer.weight = max(0.0, float(weight))
+        if enabled and not self.motion_overlay:
+            # Background cũ không còn đúng sau khi tắt một thời gian
+            self.motion_layer.reset()
+        self.motion_overlay = enabled
+        logger.info(f"Motion overlay {'enabled' if enabled else 'disabled'} "
+                    f"(weight {self.motion_layer.weight:.2f})")
+    
+    def enable_hotspots(self, top_k=3, threshold=200, min_area=16, iou_threshold=0.3):
+        """
+        Bật detect + track top-K vùng nóng trên intensity của mỗi frame
         
-        # Normalize gray values
-        normalized = cv2.normalize(gray, None, 0, 255, cv2.NORM_MINMAX)
+        Args:
+            top_k (int): Số vùng nóng mỗi frame
+            threshold (int): Ngưỡng intensity (0-255) của vùng nóng
+            min_area (int): Diện tích tối thiểu (pixel) của vùng nóng
+            iou_threshold (float): IoU tối thiểu để ghép vùng nóng giữa hai frame
+            
+        Returns:
+            HotSpotTracker: Tracker (đăng ký listener qua add_hotspot_listener)
+        """
+        tracker = self.hotspot_tracker
+        if tracker is None:
+            tracker = HotSpotTracker(top_k, threshold, min_area, iou_threshold)
+        else:
+            tracker.top_k = top_k
+            tracker.threshold = threshold
+            tracker.min_area = min_area
+            tracker.iou_threshold = iou_threshold
+        self.hotspot_tracker = tracker
+        logger.info(f"Hot spot tracking enabled (top {top_k}, threshold {threshold})")
+        return tracker
+    
+    def disable_hotspots(self):
+        """Tắt hot spot tracking (bỏ tracks và listeners)"""
+        if self.hotspot_tracker is not None:
+            self.hotspot_tracker.reset()
+            self.hotspot_tracker = None
+            logger.info("Hot spot tracking disabled")
+    
+    def add_hotspot_listener(self, listener):
+        """
+        Đăng ký callback nhận hot spot events (bật tracking nếu chưa bật)
         
-        # Tạo gradient màu từ lạnh đến nóng (phong cách ban ngày)
-        for i in range(frame.shape[0]):
-            for j in range(frame.shape[1]):
-                intensity = normalized[i, j]
-                
-                if intensity < 60:  # Lạnh - xanh đen
-                    thermal_map[i, j] = [intensity//2, 0, 0]
-                elif intensity < 120:  # Ấm - đỏ đậm
-                    thermal_map[i, j] = [0, 0, intensity]
-                elif intensity < 180:  # Nóng - đỏ cam
-                    thermal_map[i, j] = [0, intensity//3, intensity]
-                elif intensity < 220:  # Rất nóng - vàng
-                    thermal_map[i, j] = [0, intensity//2, intensity]
-                else:  # Cực nóng - trắng
-                    thermal_map[i, j] = [intensity//3, intensity//2, intensity]
-        
-        return thermal_map
+        Args:
+            listener (function): listener(events), gọi từ processing worker, không được block.
+                Mỗi event: {'type', 'track_id', 'frame', 'timestamp', 'bbox', 'centroid',
+                'area', 'peak', 'mean', 'age'}
+        """
+        tracker = self.hotspot_tracker or self.enable_hotspots()
+        tracker.add_listener(listener)
+    
+    def remove_hotspot_listener(self, listener):
+        """Hủy đăng ký hot spot listener"""
+        if self.hotspot_tracker is not None:
+            self.hotspot_tracker.remove_listener(listener)
+    
+    def get_hotspots(self):
+        """
+        Returns:
+            list: Vùng nóng đang được track ở frame gần nhất (rỗng nếu chưa bật)
+        """
+        if self.hotspot_tracker is None:
+            return []
+        return self.hotspot_tracker.get_hotspots()
+    
+    def _scratch(self, name, shape, dtype=np.uint8):
+        """
+        Scratch buffer riêng cho từng worker thread, cấp phát lại chỉ khi đổi kích thước
+        
+        Args:
+            name (str): Tên buffer
+            shape (tuple): Shape cần dùng
+            dtype: Kiểu dữ liệu
+            
+        Returns:
+            numpy.ndarray: Buffer (nội dung không xác định)
+        """
+        buffers = self._scratch_buffers.__dict__
+        buffer = buffers.get(name)
+        if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+            buffer = np.empty(shape, dtype=dtype)
+            buffers[name] = buffer
+        return buffer
+    
+    def set_palette(self, name, mode='day'):
+        """
+        Đổi palette khi đang chạy (không tốn chi phí per-frame)
+        
+        Args:
+            name (str | int): Tên palette trong registry hoặc OpenCV colormap constant
+            mode (str): 'day' hoặc 'night'
+            
+        Returns:
+            bool: True nếu đổi thành công
+        """
+        if mode not in ('day', 'night'):
+            logger.warning(f"Invalid palette mode: {mode}. Must be 'day' or 'night'")
+            return False
+        
+        try:
+            lut = self.palettes.get_lut(name)
+        except KeyError as e:
+            logger.warning(f"Cannot set palette: {e}")
+            return False
+        
+        # Gán reference - capture thread thấy LUT mới ở frame kế tiếp
+        if mode == 'day':
+            self.day_palette = name
+            self.day_lut = lut
+        else:
+            self.night_palette = name
+            self.night_lut = lut
+        
+        logger.info(f"{mode.capitalize()} palette set to: {name}")
+        return True
+    
+    def set_normalization(self, strategy, **options):
+        """
+        Đổi cách normalize intensity trước khi map palette
+        
+        Args:
+            strategy (str): 'frame' (min/max từng frame), 'percentile' (cửa sổ trượt) hoặc 'fixed'
+            **options: Tham số của IntensityNormalizer (low_percentile, high_percentile,
+                window, fixed_range, sample_step, update_interval)
+            
+        Returns:
+            bool: True nếu đổi thành công
+        """
+        if strategy not in NORMALIZATION_STRATEGIES:
+            logger.warning(f"Invalid normalization strategy: {strategy}. "
+                           f"Must be one of {', '.join(NORMALIZATION_STRATEGIES)}")
+            return False
+        
+        try:
+            day_normalizer = IntensityNormalizer(strategy, **options)
+            night_normalizer = IntensityNormalizer(strategy, **options)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Invalid normalization options: {e}")
+            return False
+        
+        # Gán reference - worker thấy normalizer mới ở frame kế tiếp
+        self.day_normalizer = day_normalizer
+        self.night_normalizer = night_normalizer
+        self.normalization = strategy
+        logger.info(f"Normalization set to: {strategy}")
+        return True
+    
+    def load_palette(self, path, name=None, mode=None):
+        """
+        Load custom palette từ file (.npy/.json)
+        
+        Args:
+            path (str): Đường dẫn file palette
+            name (str): Tên palette (default: tên file)
+            mode (str): Nếu có ('day'/'night') thì áp dụng palette ngay
+            
+        Returns:
+            str: Tên palette hoặc None nếu lỗi
+        """
+        name = self.palettes.load_file(path, name)
+        if name is not None and mode is not None:
+            self.set_palette(name, mode)
+        return name
+    
+    def wait(self, timeout=None):
+        """
+        Đợi capture loop kết thúc (vd: khi frame source offline đã đọc hết)
+        
+        Args:
+            timeout (float): Thời gian chờ tối đa (giây)
+            
+        Returns:
+            bool: True nếu capture loop đã kết thúc
+        """
+        if self.capture_thread is None:
+            return True
+        self.capture_thread.join(timeout)
+        return not self.capture_thread.is_alive()
     
     def pause_capture(self):
         """Tạm dừng capture (giữ frame cuối cùng)"""
@@ -269,78 +964,311 @@ class ThermalCameraHandler:
         """Dừng capture hoàn toàn"""
         self.is_running = False
         self.is_capturing = False
+        # Đánh thức capture thread nếu đang chờ reconnect
+        self._stop_event.set()
         
         # Wait for thread to finish
+        if self.pipeline:
+            self.pipeline.stop()
         if self.capture_thread and self.capture_thread.is_alive():
             self.capture_thread.join(timeout=2.0)
         
-        # Release camera
-        if self.cap:
-            self.cap.release()
-            self.cap = None
+        self.stop_archive()
+        self.stop_metrics_export()
+        
+        # Recorder ghi nốt các frame đang chờ, capture writer ghi nốt ở background
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+        if self.capture_writer is not None:
+            self.capture_writer.close(wait=False)
+            self.capture_writer = None
+        
+        # Release camera / frame source
+        if self.source:
+            self.source.release()
+            self.source = None
         
         logger.info("Camera capture stopped")
     
-    def capture_image(self, save_directory="captures"):
+    def capture_image(self, save_directory="captures", timeout=10.0):
         """
-        Chụp ảnh hiện tại và lưu file
+        Chụp ảnh hiện tại và lưu file (đợi ghi xong)
         
         Args:
             save_directory (str): Thư mục lưu ảnh
+            timeout (float): Thời gian chờ ghi tối đa (giây)
             
         Returns:
             str: Đường dẫn file đã lưu hoặc None nếu lỗi
         """
+        future = self.capture_image_async(save_directory)
+        if future is None:
+            return None
+        
         try:
-            with self.thread_lock:
-                if self.thermal_frame is None:
-                    logger.warning("No frame available for capture")
-                    return None
-                
-                frame_to_save = self.thermal_frame.copy()
+            return future.result(timeout)
+        except Exception as e:
+            logger.error(f"Error capturing image: {e}")
+            return None
+    
+    def capture_image_async(self, save_directory="captures", callback=None):
+        """
+        Chụp ảnh hiện tại, encode và lưu ở background
+        
+        Args:
+            save_directory (str): Thư mục lưu ảnh
+            callback (function): callback(filepath hoặc None) khi ghi xong (optional)
             
-            # Tạo thư mục nếu chưa có
-            os.makedirs(save_directory, exist_ok=True)
+        Returns:
+            Future: Kết quả là đường dẫn file, hoặc None nếu chưa có frame
+        """
+        frame_to_save = self.get_current_frame()
+        if frame_to_save is None:
+            logger.warning("No frame available for capture")
+            return None
+        
+        return self.get_capture_writer().submit(frame_to_save, save_directory, callback)
+    
+    def capture_burst(self, count, save_directory="captures", callback=None):
+        """
+        Lưu N frame liên tiếp kế tiếp của pipeline (không làm chậm pipeline)
+        
+        Args:
+            count (int): Số frame
+            save_directory (str): Thư mục lưu ảnh
+            callback (function): callback(filepath hoặc None) cho từng frame (optional)
             
-            # Tạo filename với timestamp
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"thermal_capture_{timestamp}.jpg"
-            filepath = os.path.join(save_directory, filename)
+        Returns:
+            list: Danh sách Future, mỗi Future cho một frame
+        """
+        futures = []
+        with self.thread_lock:
+            for _ in range(count):
+                future = Future()
+                self._burst_requests.append((future, save_directory, callback))
+                futures.append(future)
+        logger.info(f"Burst capture requested: {count} frames")
+        return futures
+    
+    def get_capture_writer(self):
+        """
+        Capture writer dùng chung (tạo khi cần)
+        
+        Returns:
+            CaptureWriter: Background writer
+        """
+        if self.capture_writer is None:
+            self.capture_writer = CaptureWriter(
+                encoder=self.capture_encoder,
+                jpeg_quality=self.jpeg_quality,
+                png_compression=self.png_compression
+            )
+        return self.capture_writer
+    
+    def set_capture_encoder(self, encoder, jpeg_quality=None, png_compression=None):
+        """
+        Cấu hình encoder cho capture
+        
+        Args:
+            encoder (str): 'jpeg', 'png' hoặc 'npy'
+            jpeg_quality (int): Chất lượng JPEG (optional)
+            png_compression (int): Mức nén PNG (optional)
             
-            # Lưu ảnh
-            success = cv2.imwrite(filepath, frame_to_save)
+        Returns:
+            bool: True nếu hợp lệ
+        """
+        if encoder not in ENCODERS:
+            logger.warning(f"Invalid capture encoder: {encoder}. Must be one of {list(ENCODERS)}")
+            return False
+        
+        self.capture_encoder = encoder
+        if jpeg_quality is not None:
+            self.jpeg_quality = jpeg_quality
+        if png_compression is not None:
+            self.png_compression = png_compression
+        
+        # Writer mới dùng cấu hình mới, writer cũ ghi nốt các capture đang chờ
+        if self.capture_writer is not None:
+            self.capture_writer.close(wait=False)
+            self.capture_writer = None
+        
+        logger.info(f"Capture encoder set to: {encoder}")
+        return True
+    
+    def configure_recorder(self, directory="recordings", pre_trigger_seconds=5.0,
+                           segment_seconds=None, segment_bytes=None, ext='.avi'):
+        """
+        Tạo recorder và bắt đầu giữ pre-trigger buffer
+        
+        Args:
+            directory (str): Thư mục lưu video
+            pre_trigger_seconds (float): Số giây trước khi record được giữ lại
+            segment_seconds (float): Chia file sau mỗi N giây (optional)
+            segment_bytes (int): Chia file khi vượt N bytes (optional)
+            ext (str): Định dạng video (.avi/.mp4/.mkv)
             
-            if success:
-                logger.info(f"Image captured and saved: {filepath}")
-                return filepath
-            else:
-                logger.error("Failed to save captured image")
-                return None
-                
+        Returns:
+            ThermalRecorder: Recorder đã cấu hình
+        """
+        previous = self.recorder
+        self.recorder = ThermalRecorder(
+            directory=directory,
+            fps=self.fps,
+            ext=ext,
+            pre_trigger_seconds=pre_trigger_seconds,
+            segment_seconds=segment_seconds,
+            segment_bytes=segment_bytes
+        )
+        if previous is not None:
+            previous.close()
+        
+        logger.info(f"Recorder configured: {directory} (pre-trigger {pre_trigger_seconds}s)")
+        return self.recorder
+    
+    def start_recording(self):
+        """
+        Bắt đầu ghi thermal video (kèm pre-trigger buffer)
+        
+        Returns:
+            bool: True nếu bắt đầu thành công
+        """
+        if self.recorder is None:
+            self.configure_recorder()
+        return self.recorder.start()
+    
+    def stop_recording(self):
+        """Dừng ghi video"""
+        if self.recorder is not None:
+            self.recorder.stop()
+    
+    def is_recording(self):
+        """
+        Returns:
+            bool: True nếu đang ghi video
+        """
+        return self.recorder is not None and self.recorder.is_recording
+    
+    def start_archive(self, path, kind='gray'):
+        """
+        Bắt đầu lưu intensity frames + metadata vào archive (.tca)
+        
+        Args:
+            path (str): Đường dẫn file archive (append nếu đã tồn tại)
+            kind (str): 'gray' (intensity gốc, re-apply được enhancement) hoặc 'normalized'
+        """
+        if kind not in ('gray', 'normalized'):
+            raise ValueError(f"Unknown archive kind: {kind}")
+        
+        self.stop_archive()
+        with self.thread_lock:
+            self.archive_kind = kind
+            self.archive_path = path
+        logger.info(f"Archiving {kind} frames to: {path}")
+    
+    def stop_archive(self):
+        """Dừng lưu archive và đóng file"""
+        with self.thread_lock:
+            archive = self.archive
+            self.archive = None
+            self.archive_path = None
+        if archive is not None:
+            archive.close()
+    
+    def _archive_frame(self, ctx, is_low_light):
+        """
+        Ghi intensity của frame vào archive (gọi từ processing worker)
+        
+        Lỗi archive chỉ được log, không làm hỏng frame thermal đang render.
+        """
+        try:
+            self._append_archive(ctx, is_low_light)
         except Exception as e:
-            logger.error(f"Error capturing image: {e}")
-            return None
+            logger.error(f"Error writing archive frame: {e}")
+    
+    def _append_archive(self, ctx, is_low_light):
+        """Mở archive khi có frame đầu tiên và ghi frame"""
+        intensity = ctx.normalized if self.archive_kind == 'normalized' else ctx.gray
+        height, width = intensity.shape
+        
+        with self.thread_lock:
+            if self.archive_path is None:
+                # stop_archive() chạy sau khi worker kiểm tra archive_path
+                return
+            archive = self.archive
+            if archive is not None and (archive.width, archive.height) != (width, height):
+                # Đang xử lý ở độ phân giải thấp hơn (rate control) -> bỏ qua frame
+                return
+            if archive is None:
+                try:
+                    archive = ArchiveWriter(self.archive_path, width, height, kind=self.archive_kind)
+                except (OSError, ValueError) as e:
+                    logger.error(f"Cannot open archive: {e}")
+                    self.archive_path = None
+                    return
+                self.archive = archive
+        
+        # append là no-op nếu stop_archive() vừa đóng file
+        stats = ctx.stats
+        archive.append(intensity, timestamp=time.time(),
+                       brightness=stats['mean'], min_value=stats['min'],
+                       max_value=stats['max'], is_low_light=is_low_light)
+    
+    def _submit_burst_frame(self, thermal):
+        """Đưa frame hiện tại cho một burst request đang chờ"""
+        with self.thread_lock:
+            if not self._burst_requests:
+                return
+            future, save_directory, callback = self._burst_requests.popleft()
+        
+        def forward(result):
+            if result.exception() is not None:
+                future.set_exception(result.exception())
+            else:
+                future.set_result(result.result())
+        
+        # Slot sẽ được tái sử dụng -> writer cần bản copy
+        writer_future = self.get_capture_writer().submit(thermal.copy(), save_directory, callback)
+        writer_future.add_done_callback(forward)
+    
+    def get_frame_handle(self):
+        """
+        Lấy handle tới frame mới nhất (không copy)
+        
+        Dữ liệu của handle hợp lệ tới khi slot được tái sử dụng;
+        kiểm tra handle.is_valid() sau khi đọc xong.
+        
+        Returns:
+            FrameHandle: Handle hoặc None nếu chưa có frame
+        """
+        with self.thread_lock:
+            return self._published
     
     def get_current_frame(self):
         """
-        Lấy frame hiện tại (thread-safe)
+        Lấy bản copy của thermal frame hiện tại (thread-safe)
         
         Returns:
             numpy.ndarray: Frame hiện tại hoặc None
         """
-        with self.thread_lock:
-            if self.thermal_frame is not None:
-                return self.thermal_frame.copy()
-            return None
+        # Slot có thể bị ghi đè trong lúc copy -> thử lại với handle mới nhất
+        for _ in range(3):
+            handle = self.get_frame_handle()
+            if handle is None:
+                return None
+            frame = handle.copy_thermal()
+            if frame is not None:
+                return frame
+        return None
     
     def is_camera_available(self):
         """
-        Kiểm tra camera có sẵn không
+        Kiểm tra camera (frame source) có sẵn không
         
         Returns:
             bool: True nếu camera available
         """
-        return self.cap is not None and self.cap.isOpened()
+        return self.source is not None and self.source.is_opened()
     
     def __del__(self):
         """Destructor - cleanup resources"""
@@ -0,0 +1,183 @@
+"""
+Capture writer module
+Ghi ảnh capture ở background thread với bounded queue và encoder cấu hình được
+"""
+
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from datetime import datetime
+
+import cv2
+import numpy as np
+from utils.logger import logger
+
+
+ENCODERS = {
+    'jpeg': '.jpg',
+    'png': '.png',
+    'npy': '.npy',
+}
+
+
+class CaptureQueueFull(Exception):
+    """Queue của capture writer đã đầy"""
+    pass
+
+
+class CaptureWriter:
+    """Background writer: encode và lưu capture mà không block pipeline/UI"""
+
+    def __init__(self, directory="captures", encoder='jpeg', jpeg_quality=95,
+                 png_compression=3, max_queue=32, prefix="thermal_capture"):
+        """
+        Khởi tạo capture writer
+
+        Args:
+            directory (str): Thư mục lưu mặc định
+            encoder (str): 'jpeg', 'png' hoặc 'npy' (raw numpy array)
+            jpeg_quality (int): Chất lượng JPEG (0-100)
+            png_compression (int): Mức nén PNG (0-9)
+            max_queue (int): Số capture tối đa đang chờ ghi
+            prefix (str): Tiền tố tên file
+        """
+        if encoder not in ENCODERS:
+            raise ValueError(f"Unknown encoder: {encoder}. Must be one of {list(ENCODERS)}")
+
+        self.directory = directory
+        self.encoder = encoder
+        self.jpeg_quality = jpeg_quality
+        self.png_compression = png_compression
+        self.prefix = prefix
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._created_dirs = set()
+        self._last_stamp = None
+        self._stamp_counter = 0
+        self._thread = threading.Thread(target=self._run, name="capture-writer", daemon=True)
+        self._thread.start()
+
+        logger.info(f"Capture writer started (encoder: {encoder})")
+
+    def submit(self, frame, directory=None, callback=None):
+        """
+        Đưa frame vào queue ghi (không block)
+
+        Args:
+            frame (numpy.ndarray): Frame cần lưu (writer giữ reference, không copy)
+            directory (str): Thư mục lưu (default: self.directory)
+            callback (function): callback(filepath hoặc None) sau khi ghi xong (optional)
+
+        Returns:
+            Future: Kết quả là đường dẫn file đã lưu
+        """
+        future = Future()
+        if callback is not None:
+            future.add_done_callback(lambda f: callback(None if f.exception() else f.result()))
+
+        try:
+            self._queue.put_nowait((frame, directory or self.directory, future))
+        except queue.Full:
+            logger.warning("Capture queue full, frame dropped")
+            future.set_exception(CaptureQueueFull("Capture queue is full"))
+        return future
+
+    def pending(self):
+        """
+        Returns:
+            int: Số capture đang chờ ghi
+        """
+        return self._queue.qsize()
+
+    def close(self, wait=True):
+        """
+        Dừng writer
+
+        Args:
+            wait (bool): Đợi ghi xong các capture đang chờ (False: không block,
+                queue đầy thì capture cũ nhất bị bỏ)
+        """
+        if wait:
+            self._queue.put(None)
+            self._thread.join()
+            return
+
+        # Không block: queue đầy thì bỏ capture cũ nhất để sentinel vào được
+        while True:
+            try:
+                self._queue.put_nowait(None)
+                return
+            except queue.Full:
+                pass
+            try:
+                oldest = self._queue.get_nowait()
+            except queue.Empty:
+                continue
+            if oldest is None:
+                # close() trước đó chưa được xử lý: sentinel mới thay thế
+                continue
+            future = oldest[2]
+            if future.set_running_or_notify_cancel():
+                future.set_exception(CaptureQueueFull("Capture writer closed before frame was written"))
+
+    def _run(self):
+        """Worker thread: encode và ghi file tuần tự"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            frame, directory, future = item
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                filepath = self._write(frame, directory)
+                logger.info(f"Image captured and saved: {filepath}")
+                future.set_result(filepath)
+            except Exception as e:
+                logger.error(f"Error capturing image: {e}")
+                future.set_exception(e)
+
+    def _write(self, frame, directory):
+        """Encode frame và ghi vào file mới"""
+        # Tạo thư mục nếu chưa có (chỉ kiểm tra lần đầu)
+        if directory not in self._created_dirs:
+            os.makedirs(directory, exist_ok=True)
+            self._created_dirs.add(directory)
+
+        filepath = self._unique_path(directory)
+
+        if self.encoder == 'npy':
+            np.save(filepath, frame)
+            return filepath
+
+        if self.encoder == 'jpeg':
+            params = [cv2.IMWRITE_JPEG_QUALITY, int(self.jpeg_quality)]
+        else:
+            params = [cv2.IMWRITE_PNG_COMPRESSION, int(self.png_compression)]
+
+        if not cv2.imwrite(filepath, frame, params):
+            raise IOError(f"Failed to save captured image: {filepath}")
+        return filepath
+
+    def _unique_path(self, directory):
+        """
+        Tạo filename theo timestamp, thêm số thứ tự khi trùng trong cùng một giây
+
+        Returns:
+            str: Đường dẫn file chưa tồn tại
+        """
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        if timestamp != self._last_stamp:
+            self._last_stamp = timestamp
+            self._stamp_counter = 0
+
+        ext = ENCODERS[self.encoder]
+        while True:
+            suffix = f"_{self._stamp_counter:03d}" if self._stamp_counter else ""
+            filepath = os.path.join(directory, f"{self.prefix}_{timestamp}{suffix}{ext}")
+            self._stamp_counter += 1
+            if not os.path.exists(filepath):
+                return filepath
@@ -0,0 +1,138 @@
+"""
+Display presenter module
+Hiển thị frame lên Tk label: cache kích thước, resize bằng cv2, tái sử dụng PhotoImage
+"""
+
+import cv2
+import numpy as np
+from PIL import Image, ImageTk
+from utils.logger import logger
+
+
+def compute_display_size(widget_width, widget_height, aspect_ratio=4/3,
+                         min_size=(640, 480), default_size=(1000, 750)):
+    """
+    Tính kích thước hiển thị fit trong widget, giữ tỷ lệ khung hình
+
+    Args:
+        widget_width (int): Độ rộng widget
+        widget_height (int): Độ cao widget
+        aspect_ratio (float): Tỷ lệ khung hình
+        min_size (tuple): Kích thước tối thiểu (width, height)
+        default_size (tuple): Kích thước khi widget chưa được layout
+
+    Returns:
+        tuple: (width, height)
+    """
+    # Nếu chưa có kích thước thì dùng mặc định lớn
+    if widget_width <= 1 or widget_height <= 1:
+        return default_size
+
+    if widget_width / widget_height > aspect_ratio:
+        display_width = int(widget_height * aspect_ratio)
+        display_height = widget_height
+    else:
+        display_width = widget_width
+        display_height = int(widget_width / aspect_ratio)
+
+    return (max(display_width - 10, min_size[0]), max(display_height - 10, min_size[1]))
+
+
+class DisplayPresenter:
+    """Đưa frame BGR lên Tk label với chi phí per-frame thấp"""
+
+    def __init__(self, label, aspect_ratio=4/3, min_size=(640, 480), default_size=(1000, 750)):
+        """
+        Khởi tạo display presenter
+
+        Args:
+            label (tk.Label): Label hiển thị video (None: chỉ convert, dùng cho benchmark)
+            aspect_ratio (float): Tỷ lệ khung hình
+            min_size (tuple): Kích thước hiển thị tối thiểu
+            default_size (tuple): Kích thước khi label chưa được layout
+        """
+        self.label = label
+        self.aspect_ratio = aspect_ratio
+        self.min_size = min_size
+        self.default_size = default_size
+        self.display_size = default_size
+        self._widget_size = None
+
+        self._photo = None
+        self._rgb = None
+        self._resized = None
+
+        # Chỉ tính lại kích thước khi widget đổi size
+        if self.label is not None:
+            self.label.bind('<Configure>', self._on_resize, add='+')
+
+    def _on_resize(self, event):
+        """Cập nhật kích thước hiển thị khi label resize"""
+        self._widget_size = (event.width, event.height)
+        self._update_display_size()
+
+    def _update_display_size(self):
+        """Tính lại kích thước hiển thị từ kích thước widget và tỷ lệ khung hình"""
+        if self._widget_size is None:
+            return
+        size = compute_display_size(self._widget_size[0], self._widget_size[1], self.aspect_ratio,
+                                    self.min_size, self.default_size)
+        if size != self.display_size:
+            logger.debug(f"Display size changed: {size[0]}x{size[1]}")
+            self.display_size = size
+
+    def render(self, frame):
+        """
+        Hiển thị frame BGR (phải gọi từ Tk main thread)
+
+        Args:
+            frame (numpy.ndarray): Frame BGR
+        """
+        image = self.prepare(frame)
+        width, height = image.size
+
+        if self._photo is None or (self._photo.width(), self._photo.height()) != (width, height):
+            # Chỉ tạo PhotoImage mới khi đổi kích thước
+            self._photo = ImageTk.PhotoImage(image)
+            self.label.configure(image=self._photo, text="")
+            self.label.image = self._photo  # Keep reference
+        else:
+            self._photo.paste(image)
+
+    def prepare(self, frame):
+        """
+        Convert frame BGR sang PIL image RGB ở kích thước hiển thị
+
+        Args:
+            frame (numpy.ndarray): Frame BGR
+
+        Returns:
+            PIL.Image.Image: Ảnh sẵn sàng đưa lên PhotoImage
+        """
+        # Giữ đúng tỷ lệ khi capture đổi độ phân giải (vd: HD 16:9)
+        aspect_ratio = frame.shape[1] / frame.shape[0]
+        if abs(aspect_ratio - self.aspect_ratio) > 0.01:
+            self.aspect_ratio = aspect_ratio
+            self._update_display_size()
+        width, height = self.display_size
+
+        # BGR -> RGB ở độ phân giải gốc (nhỏ hơn), rồi mới resize
+        rgb = self._buffer('_rgb', frame.shape)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb)
+
+        if rgb.shape[1] != width or rgb.shape[0] != height:
+            downscale = width < rgb.shape[1] or height < rgb.shape[0]
+            interpolation = cv2.INTER_AREA if downscale else cv2.INTER_LINEAR
+            resized = self._buffer('_resized', (height, width, 3))
+            cv2.resize(rgb, (width, height), dst=resized, interpolation=interpolation)
+            rgb = resized
+
+        return Image.fromarray(rgb)
+
+    def _buffer(self, name, shape):
+        """Buffer uint8 tái sử dụng, cấp phát lại khi đổi kích thước"""
+        buffer = getattr(self, name)
+        if buffer is None or buffer.shape != tuple(shape):
+            buffer = np.empty(shape, dtype=np.uint8)
+            setattr(self, name, buffer)
+        return buffer
@@ -0,0 +1,140 @@
+"""
+Frame context module
+Tính các sản phẩm trung gian của một frame (grayscale, normalized, brightness stats) đúng một lần
+"""
+
+import cv2
+import numpy as np
+
+
+class FrameContext:
+    """Context per-frame: các stage đọc chung gray/normalized/stats thay vì tự convert"""
+
+    __slots__ = ('frame', '_scratch', '_gray', '_normalized', '_stats', 'intensity')
+
+    def __init__(self, frame, scratch=None):
+        """
+        Khởi tạo frame context
+
+        Args:
+            frame (numpy.ndarray): Frame BGR gốc
+            scratch (function): scratch(name, shape) -> buffer để tái sử dụng (optional)
+        """
+        self.frame = frame
+        self._scratch = scratch
+        self._gray = None
+        self._normalized = None
+        self._stats = None
+        # Intensity cuối cùng được map palette (do stage colorize gán)
+        self.intensity = None
+
+    @classmethod
+    def of(cls, frame, scratch=None):
+        """
+        Trả về context cho frame (giữ nguyên nếu đã là context)
+
+        Args:
+            frame (numpy.ndarray | FrameContext): Frame hoặc context
+            scratch (function): Hàm cấp scratch buffer (optional)
+
+        Returns:
+            FrameContext: Context của frame
+        """
+        if isinstance(frame, cls):
+            return frame
+        return cls(frame, scratch)
+
+    @property
+    def shape(self):
+        """Shape (H, W) của frame"""
+        return self.frame.shape[:2]
+
+    def buffer(self, name):
+        """
+        Buffer uint8 (H, W) cho stage trung gian
+
+        Args:
+            name (str): Tên buffer
+
+        Returns:
+            numpy.ndarray: Buffer (nội dung không xác định)
+        """
+        if self._scratch is not None:
+            return self._scratch(name, self.shape)
+        return np.empty(self.shape, dtype=np.uint8)
+
+    @property
+    def gray(self):
+        """Frame grayscale (BGR -> GRAY chỉ một lần)"""
+        if self._gray is None:
+            if self.frame.ndim == 2:
+                self._gray = self.frame
+            else:
+                self._gray = cv2.cvtColor(self.frame, cv2.COLOR_BGR2GRAY, dst=self.buffer('gray'))
+        return self._gray
+
+    @property
+    def stats(self):
+        """
+        Brightness stats của frame grayscale
+
+        Returns:
+            dict: {'mean', 'min', 'max'}
+        """
+        if self._stats is None:
+            self._stats = brightness_stats(self.gray)
+        return self._stats
+
+    @property
+    def brightness(self):
+        """Độ sáng trung bình (0-255)"""
+        return self.stats['mean']
+
+    @property
+    def normalized(self):
+        """Intensity đã normalize về 0-255 (min/max lấy từ stats)"""
+        if self._normalized is None:
+            stats = self.stats
+            self._normalized = normalize_minmax(self.gray, stats['min'], stats['max'],
+                                                out=self.buffer('normalized'))
+        return self._normalized
+
+
+def brightness_stats(gray):
+    """
+    Tính mean/min/max của ảnh grayscale
+
+    Args:
+        gray (numpy.ndarray): Ảnh grayscale
+
+    Returns:
+        dict: {'mean', 'min', 'max'}
+    """
+    min_value, max_value, _, _ = cv2.minMaxLoc(gray)
+    return {
+        'mean': cv2.mean(gray)[0],
+        'min': min_value,
+        'max': max_value,
+    }
+
+
+def normalize_minmax(gray, min_value=None, max_value=None, out=None):
+    """
+    Normalize về 0-255 giống cv2.normalize(..., cv2.NORM_MINMAX), dùng lại min/max đã có
+
+    Args:
+        gray (numpy.ndarray): Ảnh grayscale uint8
+        min_value (float): Min đã tính (optional)
+        max_value (float): Max đã tính (optional)
+        out (numpy.ndarray): Buffer output (optional)
+
+    Returns:
+        numpy.ndarray: Ảnh đã normalize
+    """
+    if min_value is None or max_value is None:
+        min_value, max_value, _, _ = cv2.minMaxLoc(gray)
+
+    value_range = max_value - min_value
+    scale = 255.0 / value_range if value_range > np.finfo(np.float64).eps else 0.0
+    shift = -min_value * scale
+    return cv2.convertScaleAbs(gray, dst=out, alpha=scale, beta=shift)
@@ -0,0 +1,149 @@
+"""
+Frame pool module
+Ring buffer các frame buffer cấp phát trước, tái sử dụng giữa các frame
+"""
+
+import threading
+
+import numpy as np
+from utils.logger import logger
+
+
+class FrameSlot:
+    """Một slot trong ring buffer: frame gốc + thermal frame"""
+
+    __slots__ = ('index', 'frame', 'thermal', 'version', 'busy')
+
+    def __init__(self, index):
+        self.index = index
+        self.frame = None
+        self.thermal = None
+        self.version = 0
+        self.busy = False
+
+    def bind(self, frame):
+        """
+        Gắn frame vừa đọc vào slot, cấp phát thermal buffer nếu cần
+
+        Args:
+            frame (numpy.ndarray): Frame đọc từ source (thường chính là self.frame)
+        """
+        self.frame = frame
+        shape = frame.shape[:2] + (3,)
+        if self.thermal is None or self.thermal.shape != shape:
+            # Chỉ xảy ra ở frame đầu tiên hoặc khi đổi độ phân giải
+            self.thermal = np.empty(shape, dtype=np.uint8)
+
+
+class FrameHandle:
+    """Handle có version tới một slot - đọc không cần copy"""
+
+    __slots__ = ('slot', 'version', 'seq')
+
+    def __init__(self, slot, seq=None):
+        self.slot = slot
+        self.version = slot.version
+        self.seq = seq
+
+    @property
+    def frame(self):
+        """Frame gốc (view, không copy)"""
+        return self.slot.frame
+
+    @property
+    def thermal(self):
+        """Thermal frame (view, không copy)"""
+        return self.slot.thermal
+
+    def is_valid(self):
+        """
+        Kiểm tra slot chưa bị ghi đè bởi frame mới
+
+        Returns:
+            bool: True nếu dữ liệu vẫn thuộc frame của handle
+        """
+        return self.slot.version == self.version
+
+    def copy_thermal(self):
+        """
+        Copy thermal frame (kiểm tra version sau khi copy)
+
+        Returns:
+            numpy.ndarray: Bản copy hoặc None nếu slot đã bị tái sử dụng
+        """
+        data = self.slot.thermal.copy()
+        return data if self.is_valid() else None
+
+    def copy_frame(self):
+        """
+        Copy frame gốc (kiểm tra version sau khi copy)
+
+        Returns:
+            numpy.ndarray: Bản copy hoặc None nếu slot đã bị tái sử dụng
+        """
+        data = self.slot.frame.copy()
+        return data if self.is_valid() else None
+
+
+class FrameRingBuffer:
+    """Pool cố định các frame slot, cấp phát vòng tròn"""
+
+    def __init__(self, size):
+        """
+        Khởi tạo ring buffer
+
+        Args:
+            size (int): Số slot (>= số frame có thể đồng thời nằm trong pipeline)
+        """
+        self.size = max(2, size)
+        self.slots = [FrameSlot(i) for i in range(self.size)]
+        self.exhausted = 0
+        self._cursor = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, timeout=None):
+        """
+        Lấy slot rảnh tiếp theo (slot vừa release được dùng lại muộn nhất)
+
+        Args:
+            timeout (float): Thời gian chờ tối đa khi mọi slot đều bận
+
+        Returns:
+            FrameSlot: Slot đã đánh dấu busy, hoặc None nếu timeout
+        """
+        with self._cond:
+            while True:
+                for offset in range(self.size):
+                    slot = self.slots[(self._cursor + offset) % self.size]
+                    if not slot.busy:
+                        slot.busy = True
+                        # Đổi version để các handle cũ biết slot đã bị ghi đè
+                        slot.version += 1
+                        self._cursor = (slot.index + 1) % self.size
+                        return slot
+
+                self.exhausted += 1
+                if not self._cond.wait(timeout):
+                    logger.debug("Frame pool exhausted")
+                    return None
+
+    def release(self, slot):
+        """
+        Trả slot về pool
+
+        Args:
+            slot (FrameSlot): Slot cần trả
+        """
+        if slot is None:
+            return
+        with self._cond:
+            slot.busy = False
+            self._cond.notify()
+
+    def in_use(self):
+        """
+        Returns:
+            int: Số slot đang bận
+        """
+        with self._cond:
+            return sum(1 for slot in self.slots if slot.busy)
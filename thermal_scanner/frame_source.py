@@ -0,0 +1,393 @@
+"""
+Frame source module
+Các nguồn frame cho thermal pipeline: camera, video file, thư mục ảnh và synthetic
+"""
+
+import os
+import time
+
+import cv2
+import numpy as np
+from utils.logger import logger
+
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff')
+
+
+class FrameSource:
+    """Base class cho mọi nguồn frame (interface giống cv2.VideoCapture)"""
+
+    # Nguồn live (camera) cần throttle theo FPS, nguồn offline chạy full speed
+    is_live = False
+
+    def open(self):
+        """
+        Mở nguồn frame
+
+        Returns:
+            bool: True nếu mở thành công
+        """
+        raise NotImplementedError
+
+    def read(self, image=None):
+        """
+        Đọc frame tiếp theo
+
+        Args:
+            image (numpy.ndarray): Buffer để ghi frame vào (optional)
+
+        Returns:
+            tuple: (ret, frame) giống cv2.VideoCapture.read()
+        """
+        raise NotImplementedError
+
+    def is_opened(self):
+        """
+        Kiểm tra nguồn đang mở
+
+        Returns:
+            bool: True nếu còn đọc được
+        """
+        raise NotImplementedError
+
+    def release(self):
+        """Giải phóng tài nguyên"""
+        pass
+
+    def describe(self):
+        """
+        Mô tả ngắn gọn nguồn frame (dùng cho log)
+
+        Returns:
+            str: Mô tả nguồn
+        """
+        return self.__class__.__name__
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+        return False
+
+
+class CameraSource(FrameSource):
+    """Nguồn frame từ camera (cv2.VideoCapture trên device index)"""
+
+    is_live = True
+
+    def __init__(self, index=0, backend=None, width=640, height=480, fps=15, warmup_timeout=1.0):
+        """
+        Khởi tạo camera source
+
+        Args:
+            index (int): Device index
+            backend (int): OpenCV backend (vd: cv2.CAP_DSHOW) (optional)
+            width (int): Độ rộng frame mong muốn
+            height (int): Độ cao frame mong muốn
+            fps (int): FPS mong muốn
+            warmup_timeout (float): Thời gian tối đa chờ frame đầu tiên (giây)
+        """
+        self.index = index
+        self.backend = backend
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.warmup_timeout = warmup_timeout
+        self.cap = None
+
+    def open(self):
+        """Mở camera và test đọc một frame"""
+        if self.backend is None:
+            self.cap = cv2.VideoCapture(self.index)
+        else:
+            self.cap = cv2.VideoCapture(self.index, self.backend)
+
+        if self.cap.isOpened():
+            if self.width * self.height > 640 * 480:
+                # Phần lớn webcam chỉ đạt HD ở FPS cao với MJPG
+                self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+            self.cap.set(cv2.CAP_PROP_FPS, self.fps)
+
+            # Test đọc frame - một số camera cần vài lần read trước frame đầu tiên
+            deadline = time.monotonic() + self.warmup_timeout
+            ret, frame = self.cap.read()
+            while not ret and time.monotonic() < deadline:
+                time.sleep(0.05)
+                ret, frame = self.cap.read()
+            if ret and frame is not None:
+                # Driver có thể chọn độ phân giải gần nhất -> ghi lại kích thước thực tế
+                height, width = frame.shape[:2]
+                if (width, height) != (self.width, self.height):
+                    logger.info(f"Camera {self.index}: requested {self.width}x{self.height}, "
+                                f"got {width}x{height}")
+                self.width, self.height = width, height
+                return True
+
+        self.release()
+        return False
+
+    def read(self, image=None):
+        if self.cap is None:
+            return False, None
+        return self.cap.read(image)
+
+    def is_opened(self):
+        return self.cap is not None and self.cap.isOpened()
+
+    def release(self):
+        if self.cap:
+            self.cap.release()
+            self.cap = None
+
+    def describe(self):
+        backend = "" if self.backend is None else f" (backend {self.backend})"
+        return f"camera {self.index}{backend}"
+
+
+class VideoFileSource(FrameSource):
+    """Nguồn frame từ video file"""
+
+    def __init__(self, path, loop=False):
+        """
+        Khởi tạo video file source
+
+        Args:
+            path (str): Đường dẫn video
+            loop (bool): Phát lại từ đầu khi hết video
+        """
+        self.path = path
+        self.loop = loop
+        self.cap = None
+
+    def open(self):
+        self.cap = cv2.VideoCapture(self.path)
+        if not self.cap.isOpened():
+            logger.error(f"Cannot open video file: {self.path}")
+            self.release()
+            return False
+        return True
+
+    def read(self, image=None):
+        if self.cap is None:
+            return False, None
+
+        ret, frame = self.cap.read(image)
+        if not ret and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read(image)
+
+        if not ret:
+            # Hết video -> đóng nguồn để capture loop kết thúc
+            self.release()
+        return ret, frame
+
+    def is_opened(self):
+        return self.cap is not None and self.cap.isOpened()
+
+    def release(self):
+        if self.cap:
+            self.cap.release()
+            self.cap = None
+
+    def get_fps(self):
+        """
+        FPS gốc của video
+
+        Returns:
+            float: FPS hoặc 0 nếu không xác định
+        """
+        if self.cap is None:
+            return 0.0
+        return self.cap.get(cv2.CAP_PROP_FPS)
+
+    def describe(self):
+        return f"video {self.path}"
+
+
+class ImageDirectorySource(FrameSource):
+    """Nguồn frame từ thư mục ảnh (sắp xếp theo tên file)"""
+
+    def __init__(self, directory, loop=False):
+        """
+        Khởi tạo image directory source
+
+        Args:
+            directory (str): Thư mục chứa ảnh
+            loop (bool): Đọc lại từ đầu khi hết ảnh
+        """
+        self.directory = directory
+        self.loop = loop
+        self.files = []
+        self.position = 0
+        self._opened = False
+
+    def open(self):
+        if not os.path.isdir(self.directory):
+            logger.error(f"Image directory not found: {self.directory}")
+            return False
+
+        self.files = sorted(
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        self.position = 0
+        self._opened = bool(self.files)
+
+        if not self._opened:
+            logger.error(f"No images found in: {self.directory}")
+        return self._opened
+
+    def read(self, image=None):
+        while self._opened:
+            if self.position >= len(self.files):
+                if not self.loop:
+                    self._opened = False
+                    break
+                self.position = 0
+
+            path = self.files[self.position]
+            self.position += 1
+
+            frame = cv2.imread(path, cv2.IMREAD_COLOR)
+            if frame is None:
+                logger.warning(f"Cannot read image: {path}")
+                continue
+
+            if image is not None and image.shape == frame.shape:
+                np.copyto(image, frame)
+                frame = image
+            return True, frame
+
+        return False, None
+
+    def is_opened(self):
+        return self._opened
+
+    def release(self):
+        self._opened = False
+
+    def describe(self):
+        return f"images {self.directory} ({len(self.files)} files)"
+
+
+class SyntheticSource(FrameSource):
+    """Nguồn frame synthetic deterministic (cho CI và chạy headless)"""
+
+    def __init__(self, width=640, height=480, num_frames=None, brightness=1.0, seed=0):
+        """
+        Khởi tạo synthetic source
+
+        Args:
+            width (int): Độ rộng frame
+            height (int): Độ cao frame
+            num_frames (int): Số frame tạo ra (None = vô hạn)
+            brightness (float): Hệ số độ sáng (< 0.25 để giả lập ban đêm)
+            seed (int): Seed cho noise
+        """
+        self.width = width
+        self.height = height
+        self.num_frames = num_frames
+        self.brightness = brightness
+        self.seed = seed
+        self.frame_index = 0
+        self._opened = False
+        self._base = None
+        self._noise = None
+
+    def open(self):
+        # Nền gradient + noise cố định, tính trước một lần
+        x = np.linspace(0, 1, self.width, dtype=np.float32)
+        y = np.linspace(0, 1, self.height, dtype=np.float32)
+        gradient = 0.6 * x[None, :] + 0.4 * y[:, None]
+
+        rng = np.random.default_rng(self.seed)
+        noise = rng.normal(0, 0.03, size=(self.height, self.width)).astype(np.float32)
+
+        base = np.clip((gradient + noise) * 160 * self.brightness, 0, 255)
+        self._base = cv2.merge([base, base * 0.9, base * 0.8]).astype(np.uint8)
+        self.frame_index = 0
+        self._opened = True
+        return True
+
+    def read(self, image=None):
+        if not self._opened:
+            return False, None
+
+        if self.num_frames is not None and self.frame_index >= self.num_frames:
+            self._opened = False
+            return False, None
+
+        if image is None or image.shape != self._base.shape:
+            image = np.empty_like(self._base)
+        np.copyto(image, self._base)
+
+        # Vật thể "nóng" di chuyển theo quỹ đạo tròn
+        t = self.frame_index * 0.2
+        cx = int(self.width * (0.5 + 0.3 * np.cos(t)))
+        cy = int(self.height * (0.5 + 0.3 * np.sin(t)))
+        radius = max(4, min(self.width, self.height) // 8)
+        level = int(min(255, 255 * self.brightness + 40))
+        cv2.circle(image, (cx, cy), radius, (level, level, level), -1)
+
+        self.frame_index += 1
+        return True, image
+
+    def is_opened(self):
+        return self._opened
+
+    def release(self):
+        self._opened = False
+
+    def describe(self):
+        return f"synthetic {self.width}x{self.height}"
+
+
+def open_frame_source(spec, loop=False):
+    """
+    Tạo frame source từ chuỗi mô tả
+
+    Args:
+        spec (str | int): Device index, đường dẫn video, thư mục ảnh, archive .tca
+            hoặc 'synthetic[:WIDTHxHEIGHT[:FRAMES]]'
+        loop (bool): Lặp lại nguồn offline khi hết
+
+    Returns:
+        FrameSource: Frame source (chưa open)
+
+    Raises:
+        ValueError: Nếu không nhận dạng được spec
+    """
+    if isinstance(spec, int):
+        return CameraSource(spec)
+
+    spec = str(spec)
+
+    if spec.isdigit():
+        return CameraSource(int(spec))
+
+    if spec == 'synthetic' or spec.startswith('synthetic:'):
+        parts = spec.split(':')
+        width, height, num_frames = 640, 480, None
+        if len(parts) > 1 and parts[1]:
+            width, height = (int(v) for v in parts[1].lower().split('x'))
+        if len(parts) > 2 and parts[2]:
+            num_frames = int(parts[2])
+        return SyntheticSource(width, height, num_frames=num_frames)
+
+    if os.path.isdir(spec):
+        return ImageDirectorySource(spec, loop=loop)
+
+    if spec.lower().endswith('.tca'):
+        # Import tại chỗ: archive phụ thuộc frame_source
+        from archive import ArchiveSource
+        return ArchiveSource(spec, loop=loop)
+
+    if os.path.isfile(spec):
+        return VideoFileSource(spec, loop=loop)
+
+    raise ValueError(f"Unknown frame source: {spec}")
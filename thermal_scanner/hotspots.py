@@ -0,0 +1,253 @@
+"""
+Hot spots module
+Tìm top-K vùng nóng trên intensity map (threshold + connected components) và track qua các frame bằng IoU
+"""
+
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from utils.logger import logger
+
+
+# Loại event được phát ra
+HOTSPOT_EVENTS = ('appeared', 'updated', 'lost')
+
+
+def detect_hotspots(intensity, threshold=200, top_k=3, min_area=16, mask=None, labels=None):
+    """
+    Tìm các vùng nóng nhất trên intensity map
+
+    Args:
+        intensity (numpy.ndarray): Intensity uint8 (0-255), thường là normalized
+        threshold (int): Pixel >= threshold được coi là nóng
+        top_k (int): Số vùng trả về tối đa (xếp theo peak, rồi mean)
+        min_area (int): Diện tích tối thiểu (pixel) để bỏ noise
+        mask (numpy.ndarray): Buffer uint8 cho ảnh threshold (optional)
+        labels (numpy.ndarray): Buffer int32 cho label map (optional)
+
+    Returns:
+        list: [{'bbox': (x, y, w, h), 'area', 'peak', 'mean', 'centroid': (x, y)}]
+    """
+    # THRESH_BINARY giữ pixel > thresh
+    _, mask = cv2.threshold(intensity, threshold - 1, 255, cv2.THRESH_BINARY, dst=mask)
+    count, labels, stats, centroids = cv2.connectedComponentsWithStats(
+        mask, labels=labels, connectivity=8, ltype=cv2.CV_32S)
+    if count <= 1:
+        return []
+
+    # Label 0 là nền; chỉ tính peak/mean cho vài vùng lớn nhất (trên bbox view, không scan cả frame)
+    areas = stats[1:, cv2.CC_STAT_AREA]
+    candidates = np.flatnonzero(areas >= min_area) + 1
+    if not len(candidates):
+        return []
+    candidates = candidates[np.argsort(areas[candidates - 1])[::-1][:top_k * 4]]
+
+    blobs = []
+    for label in candidates:
+        x, y, w, h, area = (int(v) for v in stats[label])
+        region = intensity[y:y + h, x:x + w]
+        region_mask = (labels[y:y + h, x:x + w] == label).view(np.uint8)
+        _, peak, _, _ = cv2.minMaxLoc(region, region_mask)
+        blobs.append({
+            'bbox': (x, y, w, h),
+            'area': area,
+            'peak': float(peak),
+            'mean': float(cv2.mean(region, region_mask)[0]),
+            'centroid': (float(centroids[label][0]), float(centroids[label][1])),
+        })
+
+    blobs.sort(key=lambda blob: (blob['peak'], blob['mean']), reverse=True)
+    return blobs[:top_k]
+
+
+def bbox_iou(a, b):
+    """
+    Intersection over union của hai bbox (x, y, w, h)
+
+    Returns:
+        float: IoU (0-1)
+    """
+    left = max(a[0], b[0])
+    top = max(a[1], b[1])
+    right = min(a[0] + a[2], b[0] + b[2])
+    bottom = min(a[1] + a[3], b[1] + b[3])
+    if right <= left or bottom <= top:
+        return 0.0
+    intersection = (right - left) * (bottom - top)
+    return intersection / float(a[2] * a[3] + b[2] * b[3] - intersection)
+
+
+class HotSpotTracker:
+    """Detect top-K vùng nóng mỗi frame và gán track id bằng IoU (greedy)"""
+
+    def __init__(self, top_k=3, threshold=200, min_area=16, iou_threshold=0.3, max_missed=5,
+                 scale=0.5):
+        """
+        Khởi tạo hot spot tracker
+
+        Args:
+            top_k (int): Số vùng nóng mỗi frame
+            threshold (int): Ngưỡng intensity (0-255) của vùng nóng
+            min_area (int): Diện tích tối thiểu (pixel, ở độ phân giải xử lý)
+            iou_threshold (float): IoU tối thiểu để coi là cùng một vùng
+            max_missed (int): Số frame liên tiếp không thấy trước khi báo 'lost'
+            scale (float): Tỷ lệ thu nhỏ intensity trước khi tìm connected components
+                (phần đắt nhất; 0.5 rẻ hơn ~4 lần, peak/mean là giá trị trung bình vùng 2x2)
+        """
+        self.top_k = top_k
+        self.threshold = threshold
+        self.min_area = min_area
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.scale = scale
+
+        self.frames = 0
+        self.tracks = {}
+        self._next_id = 1
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._small = None
+        self._mask = None
+        self._labels = None
+
+    def add_listener(self, listener):
+        """
+        Đăng ký callback nhận events
+
+        Args:
+            listener (function): listener(events), gọi từ processing worker, không được block
+        """
+        if listener not in self._listeners:
+            self._listeners = self._listeners + [listener]
+
+    def remove_listener(self, listener):
+        """Hủy đăng ký listener"""
+        self._listeners = [item for item in self._listeners if item != listener]
+
+    def reset(self):
+        """Bỏ mọi track"""
+        with self._lock:
+            self.tracks = {}
+
+    def update(self, intensity, offset=(0, 0), scale=1.0):
+        """
+        Detect vùng nóng trên frame và cập nhật tracks
+
+        Args:
+            intensity (numpy.ndarray): Intensity uint8 (0-255)
+            offset (tuple): Góc (x, y) của intensity trong frame gốc (ROI)
+            scale (float): Tỷ lệ độ phân giải xử lý so với frame gốc
+
+        Returns:
+            list: Events của frame này (có thể rỗng)
+        """
+        with self._lock:
+            if self.scale < 1.0:
+                height, width = intensity.shape[:2]
+                size = (max(1, int(width * self.scale)), max(1, int(height * self.scale)))
+                if self._small is None or self._small.shape != (size[1], size[0]):
+                    self._small = np.empty((size[1], size[0]), dtype=np.uint8)
+                intensity = cv2.resize(intensity, size, dst=self._small, interpolation=cv2.INTER_AREA)
+                scale *= self.scale
+            if self._mask is None or self._mask.shape != intensity.shape:
+                self._mask = np.empty(intensity.shape, dtype=np.uint8)
+                self._labels = np.empty(intensity.shape, dtype=np.int32)
+            min_area = max(1, int(self.min_area * scale * scale))
+            blobs = detect_hotspots(intensity, self.threshold, self.top_k, min_area,
+                                    self._mask, self._labels)
+            for blob in blobs:
+                _to_frame_coordinates(blob, offset, scale)
+            events = self._associate(blobs)
+
+        if events:
+            for listener in self._listeners:
+                try:
+                    listener(events)
+                except Exception as e:
+                    logger.error(f"Error in hot spot listener: {e}")
+        return events
+
+    def get_hotspots(self):
+        """
+        Returns:
+            list: Các track đang thấy ở frame gần nhất
+        """
+        with self._lock:
+            return [dict(track) for track in self.tracks.values() if track['missed'] == 0]
+
+    def _associate(self, blobs):
+        """Ghép blobs với tracks cũ theo IoU giảm dần, tạo/xóa track và trả về events"""
+        self.frames += 1
+        timestamp = time.time()
+        pairs = []
+        for track_id, track in self.tracks.items():
+            for index, blob in enumerate(blobs):
+                iou = bbox_iou(track['bbox'], blob['bbox'])
+                if iou >= self.iou_threshold:
+                    pairs.append((iou, track_id, index))
+        pairs.sort(reverse=True)
+
+        events = []
+        matched_tracks = set()
+        matched_blobs = set()
+        for _, track_id, index in pairs:
+            if track_id in matched_tracks or index in matched_blobs:
+                continue
+            matched_tracks.add(track_id)
+            matched_blobs.add(index)
+            track = self.tracks[track_id]
+            track.update(blobs[index])
+            track['missed'] = 0
+            track['hits'] += 1
+            track['last_seen'] = timestamp
+            events.append(self._event('updated', track, timestamp))
+
+        for index, blob in enumerate(blobs):
+            if index in matched_blobs:
+                continue
+            track = dict(blob, track_id=self._next_id, hits=1, missed=0,
+                         first_seen=timestamp, last_seen=timestamp)
+            self._next_id += 1
+            self.tracks[track['track_id']] = track
+            matched_tracks.add(track['track_id'])
+            events.append(self._event('appeared', track, timestamp))
+
+        for track_id in list(self.tracks):
+            if track_id in matched_tracks:
+                continue
+            track = self.tracks[track_id]
+            track['missed'] += 1
+            if track['missed'] > self.max_missed:
+                del self.tracks[track_id]
+                events.append(self._event('lost', track, timestamp))
+        return events
+
+    def _event(self, kind, track, timestamp):
+        """Event có cấu trúc từ một track"""
+        return {
+            'type': kind,
+            'track_id': track['track_id'],
+            'frame': self.frames,
+            'timestamp': timestamp,
+            'bbox': track['bbox'],
+            'centroid': track['centroid'],
+            'area': track['area'],
+            'peak': track['peak'],
+            'mean': track['mean'],
+            'age': track['hits'],
+        }
+
+
+def _to_frame_coordinates(blob, offset, scale):
+    """Đổi bbox/centroid/area từ độ phân giải xử lý về tọa độ frame gốc"""
+    if scale == 1.0 and offset == (0, 0):
+        return
+    x, y, w, h = blob['bbox']
+    blob['bbox'] = (int(round(x / scale)) + offset[0], int(round(y / scale)) + offset[1],
+                    max(1, int(round(w / scale))), max(1, int(round(h / scale))))
+    cx, cy = blob['centroid']
+    blob['centroid'] = (cx / scale + offset[0], cy / scale + offset[1])
+    blob['area'] = int(round(blob['area'] / (scale * scale)))
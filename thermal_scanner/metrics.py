@@ -0,0 +1,260 @@
+"""
+Metrics module
+Đo thời gian từng stage trên hot path bằng rolling histogram, xuất snapshot định kỳ
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_right
+from collections import deque
+
+import numpy as np
+from utils.logger import logger
+
+
+# Các stage trên hot path (theo thứ tự xử lý)
+HOT_PATH_STAGES = ('read', 'detect', 'enhance', 'motion', 'colorize', 'hotspots', 'copy', 'callback', 'display')
+
+# Bins log-scale từ 10 us tới 10 s (~12% mỗi bin)
+BIN_EDGES_MS = tuple(float(edge) for edge in np.geomspace(0.01, 10000.0, 121))
+
+
+class RollingHistogram:
+    """Histogram của N mẫu gần nhất: record O(log bins), không cấp phát"""
+
+    def __init__(self, window=256, edges=BIN_EDGES_MS):
+        """
+        Args:
+            window (int): Số mẫu gần nhất được giữ
+            edges (tuple): Biên của các bins (ms, tăng dần)
+        """
+        self.window = window
+        self.edges = edges
+        # Bin 0: nhỏ hơn edges[0], bin cuối: lớn hơn edges[-1]
+        self.counts = [0] * (len(edges) + 1)
+        self.total = 0
+
+        self._bins = [0] * window
+        self._values = [0.0] * window
+        self._next = 0
+        self._size = 0
+        self._sum = 0.0
+        self._last = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, value_ms):
+        """
+        Thêm một mẫu
+
+        Args:
+            value_ms (float): Thời gian (ms)
+        """
+        index = bisect_right(self.edges, value_ms)
+        with self._lock:
+            position = self._next
+            if self._size == self.window:
+                # Mẫu cũ nhất rời khỏi cửa sổ
+                self.counts[self._bins[position]] -= 1
+                self._sum -= self._values[position]
+            else:
+                self._size += 1
+
+            self._bins[position] = index
+            self._values[position] = value_ms
+            self.counts[index] += 1
+            self._sum += value_ms
+            self._last = value_ms
+            self._next = (position + 1) % self.window
+            self.total += 1
+
+    def percentile(self, q):
+        """
+        Percentile gần đúng (trung điểm log của bin chứa percentile)
+
+        Args:
+            q (float): Percentile (0-100)
+
+        Returns:
+            float: Giá trị (ms), 0 nếu chưa có mẫu
+        """
+        with self._lock:
+            return self._percentile(q)
+
+    def _percentile(self, q):
+        if not self._size:
+            return 0.0
+        target = max(1, int(np.ceil(self._size * q / 100.0)))
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= target:
+                break
+        if index == 0:
+            return self.edges[0]
+        if index >= len(self.edges):
+            return self.edges[-1]
+        return (self.edges[index - 1] * self.edges[index]) ** 0.5
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: {'count', 'total', 'last', 'mean', 'p50', 'p95', 'p99', 'max'} (ms)
+        """
+        with self._lock:
+            size = self._size
+            return {
+                'count': size,
+                'total': self.total,
+                'last': self._last,
+                'mean': self._sum / size if size else 0.0,
+                'p50': self._percentile(50),
+                'p95': self._percentile(95),
+                'p99': self._percentile(99),
+                'max': max(self._values[:size]) if size else 0.0,
+            }
+
+    def reset(self):
+        """Xóa mọi mẫu"""
+        with self._lock:
+            self.counts = [0] * (len(self.edges) + 1)
+            self.total = 0
+            self._next = 0
+            self._size = 0
+            self._sum = 0.0
+            self._last = 0.0
+
+
+class HotPathMetrics:
+    """Rolling histogram cho từng stage + FPS thực tế"""
+
+    def __init__(self, stages=HOT_PATH_STAGES, window=256):
+        """
+        Args:
+            stages (tuple): Tên các stage
+            window (int): Số mẫu gần nhất cho mỗi stage
+        """
+        self.window = window
+        self.enabled = True
+        self.stages = {name: RollingHistogram(window) for name in stages}
+        self._frame_times = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds):
+        """
+        Ghi thời gian của một stage
+
+        Args:
+            stage (str): Tên stage
+            seconds (float): Thời gian (giây, từ time.perf_counter)
+        """
+        if not self.enabled:
+            return
+        histogram = self.stages.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self.stages.setdefault(stage, RollingHistogram(self.window))
+        histogram.record(seconds * 1000.0)
+
+    def tick(self, timestamp=None):
+        """Đánh dấu một frame đã được đưa ra (dùng để tính FPS)"""
+        if self.enabled:
+            self._frame_times.append(time.perf_counter() if timestamp is None else timestamp)
+
+    def fps(self):
+        """
+        Returns:
+            float: FPS trung bình trên cửa sổ gần nhất
+        """
+        times = list(self._frame_times)
+        if len(times) < 2 or times[-1] <= times[0]:
+            return 0.0
+        return (len(times) - 1) / (times[-1] - times[0])
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: {'time', 'fps', 'stages': {stage: histogram snapshot}}
+        """
+        return {
+            'time': time.time(),
+            'fps': self.fps(),
+            'stages': {name: histogram.snapshot() for name, histogram in list(self.stages.items())},
+        }
+
+    def format_status(self, percentile='p50'):
+        """
+        Status line ngắn gọn cho UI
+
+        Returns:
+            str: Ví dụ 'FPS 14.9 | read 1.2 detect 0.1 ... ms'
+        """
+        snapshot = self.snapshot()
+        parts = [f"{name} {stats[percentile]:.1f}"
+                 for name, stats in snapshot['stages'].items() if stats['count']]
+        return f"FPS {snapshot['fps']:.1f} | " + " ".join(parts) + f" ms ({percentile})"
+
+    def reset(self):
+        """Xóa mọi số liệu"""
+        for histogram in list(self.stages.values()):
+            histogram.reset()
+        self._frame_times.clear()
+
+
+class MetricsExporter:
+    """Ghi snapshot metrics định kỳ ra file JSON lines"""
+
+    def __init__(self, metrics, path, interval=5.0, extra=None):
+        """
+        Args:
+            metrics (HotPathMetrics): Metrics cần xuất
+            path (str): File output (.jsonl, append)
+            interval (float): Chu kỳ xuất (giây)
+            extra (function): Hàm trả dict bổ sung vào mỗi snapshot (optional)
+        """
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self.extra = extra
+        self.exported = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Bắt đầu thread xuất snapshot"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="metrics-exporter", daemon=True)
+        self._thread.start()
+        logger.info(f"Metrics export started: {self.path} (every {self.interval}s)")
+
+    def stop(self):
+        """Dừng và ghi snapshot cuối"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=2.0)
+        self._thread = None
+        self.export()
+
+    def export(self):
+        """Ghi một snapshot ngay lập tức"""
+        snapshot = self.metrics.snapshot()
+        if self.extra is not None:
+            try:
+                snapshot.update(self.extra() or {})
+            except Exception as e:
+                logger.warning(f"Metrics extra failed: {e}")
+        try:
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(snapshot) + "\n")
+            self.exported += 1
+        except OSError as e:
+            logger.error(f"Cannot write metrics snapshot: {e}")
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.export()
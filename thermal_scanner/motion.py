@@ -0,0 +1,141 @@
+"""
+Motion module
+Lớp "nhiệt chuyển động": background model + frame differencing trên grayscale thu nhỏ, cập nhật in-place
+"""
+
+import threading
+
+import cv2
+import numpy as np
+
+
+class MotionEnergyLayer:
+    """Năng lượng chuyển động tích lũy theo thời gian, cộng vào intensity trước khi map palette"""
+
+    def __init__(self, scale=0.25, background_rate=0.05, decay=0.85, threshold=6.0,
+                 gain=2.0, weight=0.5):
+        """
+        Khởi tạo motion energy layer
+
+        Args:
+            scale (float): Tỷ lệ thu nhỏ grayscale trước khi so sánh (rẻ hơn, ít noise hơn)
+            background_rate (float): Tốc độ background model học frame mới (EMA)
+            decay (float): Hệ số giữ lại năng lượng mỗi frame (vệt mờ dần sau vật thể)
+            threshold (float): Chênh lệch (0-255) nhỏ hơn mức này coi là noise
+            gain (float): Hệ số nhân chênh lệch thành năng lượng
+            weight (float): Mức cộng năng lượng vào intensity (0 = tắt)
+        """
+        self.scale = scale
+        self.background_rate = background_rate
+        self.decay = decay
+        self.threshold = threshold
+        self.gain = gain
+        self.weight = weight
+        self.frames = 0
+
+        self._lock = threading.Lock()
+        self._shape = None
+        self._small = None
+        self._current = None
+        self._background = None
+        self._diff = None
+        self._energy = None
+        self._energy_small = None
+        self._energy_full = None
+
+    def reset(self):
+        """Bỏ background và năng lượng - frame kế tiếp bắt đầu lại"""
+        with self._lock:
+            self._shape = None
+
+    def update(self, gray):
+        """
+        Cập nhật background model và năng lượng chuyển động
+
+        Args:
+            gray (numpy.ndarray): Frame grayscale uint8 (độ phân giải đầy đủ)
+
+        Returns:
+            numpy.ndarray: Năng lượng chuyển động float32 (độ phân giải thu nhỏ, 0-255)
+        """
+        with self._lock:
+            if self._shape != gray.shape:
+                self._allocate(gray.shape)
+                cv2.resize(gray, self._small_size, dst=self._small, interpolation=cv2.INTER_AREA)
+                self._background[...] = self._small
+                self._energy.fill(0)
+                self.frames = 1
+                return self._energy
+
+            cv2.resize(gray, self._small_size, dst=self._small, interpolation=cv2.INTER_AREA)
+            np.copyto(self._current, self._small)
+
+            # Chênh lệch so với background, bỏ noise nhỏ
+            cv2.absdiff(self._current, self._background, dst=self._diff)
+            cv2.threshold(self._diff, self.threshold, 0, cv2.THRESH_TOZERO, dst=self._diff)
+
+            # Năng lượng cũ mờ dần, chuyển động mới ghi đè nếu mạnh hơn
+            cv2.multiply(self._energy, self.decay, dst=self._energy)
+            cv2.multiply(self._diff, self.gain, dst=self._diff)
+            cv2.max(self._energy, self._diff, dst=self._energy)
+
+            cv2.accumulateWeighted(self._current, self._background, self.background_rate)
+            self.frames += 1
+            return self._energy
+
+    def apply(self, gray, intensity, out=None):
+        """
+        Cập nhật theo frame và cộng năng lượng chuyển động vào intensity
+
+        Args:
+            gray (numpy.ndarray): Frame grayscale uint8 dùng để phát hiện chuyển động
+            intensity (numpy.ndarray): Intensity uint8 (0-255) sẽ map palette
+            out (numpy.ndarray): Buffer output (có thể là chính intensity)
+
+        Returns:
+            numpy.ndarray: Intensity đã cộng năng lượng (saturate ở 255)
+        """
+        self.update(gray)
+        if out is None:
+            out = np.empty_like(intensity)
+        if self.weight <= 0 or self.frames < 2:
+            if out is not intensity:
+                np.copyto(out, intensity)
+            return out
+
+        with self._lock:
+            height, width = intensity.shape[:2]
+            # Upscale năng lượng dạng uint8 (rẻ hơn float) về kích thước intensity
+            cv2.convertScaleAbs(self._energy, dst=self._energy_small)
+            if self._energy_full is None or self._energy_full.shape != (height, width):
+                self._energy_full = np.empty((height, width), dtype=np.uint8)
+            cv2.resize(self._energy_small, (width, height), dst=self._energy_full,
+                       interpolation=cv2.INTER_LINEAR)
+            return cv2.addWeighted(intensity, 1.0, self._energy_full, self.weight, 0.0, dst=out)
+
+    def get_energy(self):
+        """
+        Returns:
+            float: Năng lượng chuyển động trung bình (0-255), 0 nếu chưa có frame
+        """
+        with self._lock:
+            if self._shape is None:
+                return 0.0
+            return float(cv2.mean(self._energy)[0])
+
+    def _allocate(self, shape):
+        """Cấp phát buffers cho kích thước frame mới (chỉ khi đổi kích thước)"""
+        height, width = shape[:2]
+        small_width = max(1, int(round(width * self.scale)))
+        small_height = max(1, int(round(height * self.scale)))
+        self._small_size = (small_width, small_height)
+        small_shape = (small_height, small_width)
+
+        self._small = np.empty(small_shape, dtype=np.uint8)
+        self._current = np.empty(small_shape, dtype=np.float32)
+        self._background = np.empty(small_shape, dtype=np.float32)
+        self._diff = np.empty(small_shape, dtype=np.float32)
+        self._energy = np.zeros(small_shape, dtype=np.float32)
+        self._energy_small = np.empty(small_shape, dtype=np.uint8)
+        self._energy_full = None
+        self._shape = shape
@@ -0,0 +1,520 @@
+"""
+Multi-camera module
+Nhiều nguồn frame cùng lúc: mỗi camera một capture thread, dùng chung một pool xử lý thermal
+"""
+
+import argparse
+import os
+import queue
+import sys
+import threading
+import time
+
+import cv2
+import numpy as np
+
+# Add current directory to path để import modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from camera_handler import ThermalCameraHandler
+from frame_pool import FrameHandle, FrameRingBuffer
+from frame_source import open_frame_source
+from metrics import HotPathMetrics
+from pipeline import FrameMailbox
+from rate_control import FrameRateController
+from utils.logger import logger
+
+
+def compose_tiles(frames, tile_size=(320, 240), columns=None, out=None):
+    """
+    Ghép nhiều frame thành một lưới
+
+    Args:
+        frames (list): Các frame BGR (None = ô trống)
+        tile_size (tuple): Kích thước mỗi ô (width, height)
+        columns (int): Số cột (default: ~căn bậc hai số frame)
+        out (numpy.ndarray): Buffer output (optional)
+
+    Returns:
+        numpy.ndarray: Ảnh lưới BGR
+    """
+    count = max(1, len(frames))
+    if columns is None:
+        columns = int(np.ceil(np.sqrt(count)))
+    rows = int(np.ceil(count / columns))
+    tile_width, tile_height = tile_size
+
+    shape = (rows * tile_height, columns * tile_width, 3)
+    if out is None or out.shape != shape:
+        out = np.empty(shape, dtype=np.uint8)
+    out.fill(0)
+
+    for i, frame in enumerate(frames):
+        if frame is None:
+            continue
+        row, column = divmod(i, columns)
+        tile = out[row * tile_height:(row + 1) * tile_height, column * tile_width:(column + 1) * tile_width]
+        cv2.resize(frame, tile_size, dst=tile, interpolation=cv2.INTER_AREA)
+    return out
+
+
+class CameraStream:
+    """Một camera trong manager: capture thread, frame pool và processor riêng"""
+
+    def __init__(self, stream_id, source, fps=15.0, realtime=True):
+        """
+        Args:
+            stream_id (int): Index của stream
+            source (FrameSource): Nguồn frame
+            fps (float): FPS mục tiêu (nguồn live hoặc realtime)
+            realtime (bool): Phát nguồn offline theo FPS như camera thật
+        """
+        self.stream_id = stream_id
+        self.source = source
+        self.realtime = realtime
+        self.rate = FrameRateController(fps, adaptive=False)
+        # Trạng thái day/night và temporal denoiser là riêng của từng camera
+        self.processor = ThermalCameraHandler(frame_source=source)
+        self.metrics = HotPathMetrics(stages=('read', 'process', 'latency'))
+        # Slot đang đọc + frame chờ xử lý + đang xử lý + frame đã publish
+        self.frame_pool = FrameRingBuffer(4)
+
+        self.is_running = False
+        self.thread = None
+        self.frames_read = 0
+        self.dropped = 0
+        self.presented = 0
+
+        # Mở lại camera live khi mất kết nối (giống ThermalCameraHandler)
+        self.max_read_failures = 5
+        self.reconnect_delay = 0.5
+        self.reconnect_max_delay = 8.0
+        self.reconnecting = False
+        self.reconnects = 0
+        self._stop_event = threading.Event()
+
+        self._pending = None
+        self._busy = False
+        self._published = None
+        self._lock = threading.Lock()
+
+    def describe(self):
+        return f"camera {self.stream_id} ({self.source.describe()})"
+
+    def get_frame_handle(self):
+        """
+        Returns:
+            FrameHandle: Thermal frame mới nhất (không copy) hoặc None
+        """
+        with self._lock:
+            return self._published
+
+    def get_stats(self):
+        """
+        Returns:
+            dict: {'fps', 'latency_ms', 'process_ms', 'read', 'presented', 'dropped', 'reconnects'}
+        """
+        snapshot = self.metrics.snapshot()
+        return {
+            'source': self.source.describe(),
+            'fps': snapshot['fps'],
+            'latency_ms': snapshot['stages']['latency']['mean'],
+            'latency_p95_ms': snapshot['stages']['latency']['p95'],
+            'process_ms': snapshot['stages']['process']['mean'],
+            'read': self.frames_read,
+            'presented': self.presented,
+            'dropped': self.dropped,
+            'reconnects': self.reconnects,
+        }
+
+
+class MultiCameraManager:
+    """Quản lý N camera, xử lý thermal trên một worker pool dùng chung"""
+
+    def __init__(self, sources, workers=2, fps=15.0, realtime=True):
+        """
+        Khởi tạo manager
+
+        Args:
+            sources (list): FrameSource hoặc spec (int/str cho open_frame_source)
+            workers (int): Số processing workers dùng chung cho mọi camera
+            fps (float): FPS mục tiêu mỗi camera
+            realtime (bool): Phát nguồn offline theo FPS như camera thật
+        """
+        self.streams = []
+        for i, source in enumerate(sources):
+            if not hasattr(source, 'read'):
+                source = open_frame_source(source)
+            self.streams.append(CameraStream(i, source, fps, realtime))
+
+        self.workers = max(1, workers)
+        self.frame_callback = None
+        self.is_running = False
+        # Báo cho UI/headless consumer: stream_id có frame mới
+        self.frame_mailbox = FrameMailbox()
+        # Stream có frame chờ xử lý (mỗi stream tối đa một lần trong queue)
+        self._ready = queue.Queue()
+        self._worker_threads = []
+        self._tiles = None
+
+        logger.info(f"Multi-camera manager initialized with {len(self.streams)} sources")
+
+    def start(self, frame_callback=None):
+        """
+        Mở mọi nguồn và bắt đầu capture
+
+        Args:
+            frame_callback (function): callback(stream_id, thermal) từ worker thread (optional)
+
+        Returns:
+            int: Số camera mở được
+        """
+        if self.is_running:
+            logger.warning("Multi-camera manager is already running")
+            return self.active_count()
+
+        self.frame_callback = frame_callback
+        self.is_running = True
+
+        for _ in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, name="multi-camera-worker", daemon=True)
+            thread.start()
+            self._worker_threads.append(thread)
+
+        opened = 0
+        for stream in self.streams:
+            try:
+                if not stream.source.open():
+                    logger.error(f"Cannot open {stream.describe()}")
+                    stream.source.release()
+                    continue
+            except Exception as e:
+                logger.error(f"Cannot open {stream.describe()}: {e}")
+                continue
+
+            stream.is_running = True
+            stream._stop_event.clear()
+            stream.thread = threading.Thread(target=self._capture_loop, args=(stream,),
+                                             name=f"camera-{stream.stream_id}", daemon=True)
+            stream.thread.start()
+            opened += 1
+
+        logger.info(f"Multi-camera capture started: {opened}/{len(self.streams)} cameras")
+        return opened
+
+    def stop(self):
+        """Dừng mọi camera và workers"""
+        for stream in self.streams:
+            stream.is_running = False
+            # Đánh thức capture thread nếu đang chờ reconnect
+            stream._stop_event.set()
+        for stream in self.streams:
+            if stream.thread is not None:
+                stream.thread.join(timeout=2.0)
+                stream.thread = None
+            stream.source.release()
+
+        self.is_running = False
+        for _ in self._worker_threads:
+            self._ready.put(None)
+        for thread in self._worker_threads:
+            thread.join(timeout=2.0)
+        self._worker_threads = []
+        logger.info("Multi-camera capture stopped")
+
+    def wait(self, timeout=None):
+        """
+        Đợi mọi nguồn offline phát hết
+
+        Returns:
+            bool: True nếu mọi capture thread đã kết thúc
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        for stream in self.streams:
+            if stream.thread is None:
+                continue
+            remaining = None if deadline is None else max(0.0, deadline - time.time())
+            stream.thread.join(remaining)
+            if stream.thread.is_alive():
+                return False
+
+        # Chờ workers xử lý nốt frame cuối
+        while any(stream._busy or stream._pending is not None for stream in self.streams):
+            if deadline is not None and time.time() > deadline:
+                return False
+            time.sleep(0.005)
+        return True
+
+    def active_count(self):
+        """
+        Returns:
+            int: Số camera đang chạy
+        """
+        return sum(1 for stream in self.streams if stream.is_running)
+
+    def get_stats(self):
+        """
+        FPS và latency của từng camera
+
+        Returns:
+            dict: {stream_id: stats}
+        """
+        return {stream.stream_id: stream.get_stats() for stream in self.streams}
+
+    def get_frame(self, stream_id):
+        """
+        Bản copy thermal frame mới nhất của một camera (select mode)
+
+        Returns:
+            numpy.ndarray: Frame hoặc None
+        """
+        for _ in range(3):
+            handle = self.streams[stream_id].get_frame_handle()
+            if handle is None:
+                return None
+            frame = handle.copy_thermal()
+            if frame is not None:
+                return frame
+        return None
+
+    def get_tiled_frame(self, tile_size=(320, 240), columns=None):
+        """
+        Ghép thermal frame mới nhất của mọi camera thành lưới (tile mode)
+
+        Returns:
+            numpy.ndarray: Ảnh lưới BGR
+        """
+        frames = []
+        for stream in self.streams:
+            handle = stream.get_frame_handle()
+            frames.append(handle.thermal if handle is not None else None)
+        # Buffer lưới dùng lại; slot có thể bị ghi đè trong lúc resize -> chỉ ảnh hưởng một ô một frame
+        self._tiles = compose_tiles(frames, tile_size, columns, out=self._tiles)
+        return self._tiles
+
+    def _capture_loop(self, stream):
+        """Capture thread của một camera"""
+        source = stream.source
+        throttle = source.is_live or stream.realtime
+        failures = 0
+        stream.rate.reset()
+
+        while stream.is_running:
+            if not source.is_opened():
+                # Camera mất kết nối: mở lại với backoff, các camera khác vẫn chạy
+                if not source.is_live or not self._reconnect(stream):
+                    break
+                failures = 0
+                stream.rate.reset()
+                continue
+
+            try:
+                if throttle:
+                    stream.rate.wait()
+
+                slot = stream.frame_pool.acquire(timeout=1.0)
+                if slot is None:
+                    continue
+
+                read_start = time.perf_counter()
+                ret, frame = source.read(slot.frame)
+                read_end = time.perf_counter()
+                if not ret:
+                    stream.frame_pool.release(slot)
+                    if not source.is_live:
+                        logger.info(f"Frame source exhausted: {stream.describe()}")
+                        break
+                    failures += 1
+                    logger.warning(f"Failed to read frame from {stream.describe()} "
+                                   f"({failures}/{stream.max_read_failures})")
+                    if failures >= stream.max_read_failures:
+                        source.release()
+                    continue
+                failures = 0
+
+                stream.metrics.record('read', read_end - read_start)
+                slot.bind(frame)
+                stream.frames_read += 1
+                self._post(stream, (slot, stream.frames_read, read_end))
+
+            except Exception as e:
+                logger.error(f"Error in capture loop of {stream.describe()}: {e}")
+                break
+
+        stream.is_running = False
+
+    def _reconnect(self, stream):
+        """
+        Mở lại source của stream với exponential backoff cho tới khi thành công hoặc bị dừng
+
+        Args:
+            stream (CameraStream): Stream vừa mất kết nối
+
+        Returns:
+            bool: True nếu đã mở lại
+        """
+        source = stream.source
+        stream.reconnecting = True
+        logger.warning(f"Lost {stream.describe()}, reconnecting")
+        delay = stream.reconnect_delay
+        attempt = 0
+        try:
+            while stream.is_running:
+                attempt += 1
+                source.release()
+                try:
+                    reopened = source.open()
+                except Exception as e:
+                    logger.warning(f"Failed to reopen {stream.describe()}: {e}")
+                    reopened = False
+
+                if reopened and stream.is_running:
+                    stream.reconnects += 1
+                    logger.info(f"Reconnected to {stream.describe()} after {attempt} attempt(s)")
+                    return True
+
+                logger.warning(f"Reconnect attempt {attempt} failed, retrying in {delay:.1f}s")
+                if stream._stop_event.wait(delay):
+                    break
+                delay = min(delay * 2, stream.reconnect_max_delay)
+            # stop() có thể đã release trước khi open xong -> đóng lại source vừa mở
+            source.release()
+            return False
+        finally:
+            stream.reconnecting = False
+
+    def _post(self, stream, item):
+        """Đặt frame mới nhất cho stream, frame chưa xử lý trước đó bị bỏ"""
+        with stream._lock:
+            previous = stream._pending
+            stream._pending = item
+            schedule = previous is None and not stream._busy
+
+        if previous is not None:
+            stream.dropped += 1
+            stream.frame_pool.release(previous[0])
+        if schedule:
+            self._ready.put(stream)
+
+    def _worker_loop(self):
+        """Worker dùng chung: xử lý frame của stream nào đang chờ"""
+        while True:
+            stream = self._ready.get()
+            if stream is None:
+                break
+
+            with stream._lock:
+                item = stream._pending
+                stream._pending = None
+                stream._busy = item is not None
+            if item is None:
+                continue
+
+            try:
+                # Slot chỉ được trả về pool khi chưa publish (publish là bước cuối của _process)
+                try:
+                    self._process(stream, *item)
+                except Exception as e:
+                    logger.error(f"Error processing frame of {stream.describe()}: {e}")
+                    stream.frame_pool.release(item[0])
+                else:
+                    self._notify(stream, item[0])
+            finally:
+                # Mỗi stream chỉ được một worker xử lý tại một thời điểm (giữ state tuần tự)
+                with stream._lock:
+                    stream._busy = False
+                    reschedule = stream._pending is not None
+                if reschedule:
+                    self._ready.put(stream)
+
+    def _process(self, stream, slot, seq, captured_at):
+        """Xử lý thermal và publish frame của stream"""
+        start = time.perf_counter()
+        stream.processor._process_frame(slot.frame, slot.thermal)
+        end = time.perf_counter()
+        stream.metrics.record('process', end - start)
+        stream.metrics.record('latency', end - captured_at)
+        stream.metrics.tick(end)
+
+        handle = FrameHandle(slot, seq)
+        with stream._lock:
+            previous = stream._published
+            stream._published = handle
+        if previous is not None:
+            stream.frame_pool.release(previous.slot)
+        stream.presented += 1
+
+    def _notify(self, stream, slot):
+        """Báo frame mới cho UI/callback (lỗi của callback không ảnh hưởng slot đã publish)"""
+        self.frame_mailbox.post(stream.stream_id)
+        if self.frame_callback:
+            try:
+                self.frame_callback(stream.stream_id, slot.thermal)
+            except Exception as e:
+                logger.error(f"Error in frame callback of {stream.describe()}: {e}")
+
+
+def _parse_view(value):
+    """'tile' hoặc camera index (int >= 0) cho --view"""
+    if value == 'tile':
+        return value
+    try:
+        index = int(value)
+    except ValueError:
+        index = -1
+    if index < 0:
+        raise argparse.ArgumentTypeError(f"must be 'tile' or a camera index, got {value!r}")
+    return index
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Run several thermal cameras on a shared processing pool")
+    parser.add_argument('sources', nargs='+', help="Camera index, video file, image directory or synthetic[:WxH[:N]]")
+    parser.add_argument('-j', '--workers', type=int, default=2, help="Shared processing workers (default: 2)")
+    parser.add_argument('--fps', type=float, default=15.0, help="Target FPS per camera (default: 15)")
+    parser.add_argument('--duration', type=float, default=10.0, help="Seconds to run (default: 10)")
+    parser.add_argument('--view', type=_parse_view, default='tile',
+                        help="'tile' or a camera index to select (default: tile)")
+    parser.add_argument('--output', default=None, help="Save the final tiled/selected view to this image")
+    args = parser.parse_args(argv)
+    if args.view != 'tile' and args.view >= len(args.sources):
+        parser.error(f"argument --view: camera index {args.view} out of range (0-{len(args.sources) - 1})")
+    return args
+
+
+def main(argv=None):
+    """Headless mode: chạy N camera, in FPS/latency từng camera"""
+    args = parse_args(argv)
+
+    try:
+        manager = MultiCameraManager(args.sources, workers=args.workers, fps=args.fps)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+
+    if not manager.start():
+        print("Error: Cannot open any camera")
+        manager.stop()
+        return 1
+
+    try:
+        manager.wait(timeout=args.duration)
+    except KeyboardInterrupt:
+        pass
+
+    if args.output:
+        view = manager.get_tiled_frame() if args.view == 'tile' else manager.get_frame(args.view)
+        if view is not None:
+            cv2.imwrite(args.output, view)
+    manager.stop()
+
+    for stream_id, stats in manager.get_stats().items():
+        print(f"camera {stream_id}: {stats['fps']:.1f} fps, latency {stats['latency_ms']:.1f} ms "
+              f"(p95 {stats['latency_p95_ms']:.1f}), process {stats['process_ms']:.1f} ms, "
+              f"dropped {stats['dropped']} - {stats['source']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
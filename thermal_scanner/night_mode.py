@@ -3,25 +3,252 @@ Night mode detection và image enhancement module
 Xử lý phát hiện điều kiện ánh sáng thấp và cải thiện chất lượng ảnh
 """
 
+import threading
+import time
+
 import cv2
 import numpy as np
+from frame_context import FrameContext
 from utils.logger import logger
 
 
+# Enhancement backends, sắp xếp từ mạnh nhất đến nhẹ nhất
+# (temporal khử nhiễu tốt hơn bilateral khi cảnh tĩnh, motion gating tránh bóng mờ)
+ENHANCEMENT_BACKENDS = ('nlm', 'temporal', 'bilateral', 'clahe')
+
+
+class LightLevelEstimator:
+    """Ước lượng độ sáng trên ảnh subsample, có hysteresis và sự kiện đổi mode"""
+    
+    # Trọng số BT.601 giống cv2.COLOR_BGR2GRAY (B, G, R)
+    LUMA_WEIGHTS = np.array([0.114, 0.587, 0.299], dtype=np.float32)
+    
+    def __init__(self, threshold=60, hysteresis=10, stride=8, interval=5):
+        """
+        Khởi tạo light level estimator
+        
+        Args:
+            threshold (float): Ngưỡng độ sáng ban đêm (0-255)
+            hysteresis (float): Độ rộng dải hysteresis quanh threshold
+            stride (int): Bước lấy mẫu pixel theo mỗi chiều
+            interval (int): Số frame giữa hai lần đánh giá lại
+        """
+        self.threshold = threshold
+        self.hysteresis = hysteresis
+        self.stride = max(1, stride)
+        self.interval = max(1, interval)
+        self.brightness = None
+        self.is_low_light = False
+        self.switch_count = 0
+        self._frames_until_update = 0
+        self._listeners = []
+    
+    def add_listener(self, callback):
+        """
+        Đăng ký callback khi đổi day/night mode
+        
+        Args:
+            callback (function): callback(is_low_light, brightness)
+        """
+        self._listeners.append(callback)
+    
+    def remove_listener(self, callback):
+        """Hủy đăng ký callback"""
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+    
+    def measure(self, frame):
+        """
+        Đo độ sáng trung bình trên view subsample (không cấp phát ảnh gray)
+        
+        Args:
+            frame (numpy.ndarray): Frame BGR hoặc grayscale
+            
+        Returns:
+            float: Độ sáng trung bình (0-255)
+        """
+        view = frame[::self.stride, ::self.stride]
+        if view.ndim == 2:
+            return float(view.mean())
+        channel_means = view.reshape(-1, view.shape[2]).mean(axis=0, dtype=np.float32)
+        return float(channel_means[:3] @ self.LUMA_WEIGHTS)
+    
+    def update(self, frame):
+        """
+        Cập nhật trạng thái ánh sáng (chỉ đo lại mỗi `interval` frame)
+        
+        Args:
+            frame (numpy.ndarray): Frame BGR
+            
+        Returns:
+            bool: True nếu đang ở điều kiện ánh sáng thấp
+        """
+        self._frames_until_update -= 1
+        if self._frames_until_update > 0 and self.brightness is not None:
+            return self.is_low_light
+        self._frames_until_update = self.interval
+        
+        self.brightness = self.measure(frame)
+        
+        # Hysteresis: chỉ đổi mode khi vượt hẳn ra ngoài dải quanh threshold
+        half_band = self.hysteresis / 2.0
+        if self.is_low_light:
+            is_low_light = self.brightness < self.threshold + half_band
+        else:
+            is_low_light = self.brightness < self.threshold - half_band
+        
+        if is_low_light != self.is_low_light:
+            self.is_low_light = is_low_light
+            self.switch_count += 1
+            self._emit(is_low_light, self.brightness)
+        
+        return self.is_low_light
+    
+    def reset(self):
+        """Buộc đánh giá lại ở frame kế tiếp"""
+        self._frames_until_update = 0
+    
+    def _emit(self, is_low_light, brightness):
+        """Gửi sự kiện đổi mode tới listeners"""
+        mode = "night" if is_low_light else "day"
+        logger.info(f"Light mode switched to {mode}: brightness={brightness:.1f}")
+        for callback in list(self._listeners):
+            try:
+                callback(is_low_light, brightness)
+            except Exception as e:
+                logger.error(f"Error in light mode listener: {e}")
+
+
+class TemporalDenoiser:
+    """Khử nhiễu theo thời gian: EMA in-place có motion gating và reset khi đổi cảnh"""
+    
+    def __init__(self, weight=0.05, motion_threshold=20, scene_change_fraction=0.5):
+        """
+        Khởi tạo temporal denoiser
+        
+        Sau mỗi lần reset, accumulator là trung bình cộng của các frame đã thấy
+        (trọng số 1/n) cho tới khi chạm trọng số EMA tối thiểu.
+        
+        Args:
+            weight (float): Trọng số tối thiểu của frame mới trong EMA (nhỏ = khử nhiễu mạnh hơn)
+            motion_threshold (int): Chênh lệch (0-255) để coi pixel là đang chuyển động
+            scene_change_fraction (float): Tỉ lệ pixel chuyển động để coi là đổi cảnh
+        """
+        self.weight = weight
+        self.motion_threshold = motion_threshold
+        self.scene_change_fraction = scene_change_fraction
+        self.scene_changes = 0
+        self._frames = 0
+        self._acc = None
+        self._output = None
+        self._diff = None
+        self._motion = None
+        # Nhiều processing worker dùng chung accumulator
+        self._lock = threading.Lock()
+    
+    def reset(self):
+        """Bỏ accumulator - frame kế tiếp bắt đầu lại từ đầu"""
+        with self._lock:
+            self._acc = None
+    
+    def process(self, gray, out=None):
+        """
+        Khử nhiễu một frame grayscale
+        
+        Args:
+            gray (numpy.ndarray): Frame grayscale uint8
+            out (numpy.ndarray): Buffer output, có thể là chính gray (optional)
+            
+        Returns:
+            numpy.ndarray: Frame đã khử nhiễu (bản copy của caller, không phải buffer nội bộ)
+        """
+        if out is None:
+            out = np.empty_like(gray)
+        with self._lock:
+            self._update(gray)
+            np.copyto(out, self._output)
+        return out
+    
+    def _update(self, gray):
+        """Cập nhật accumulator và self._output theo frame mới (gọi khi đang giữ lock)"""
+        if self._acc is None or self._acc.shape != gray.shape:
+            self._allocate(gray)
+            return
+        
+        # Pixel lệch nhiều so với kết quả trước = chuyển động
+        # (blur chênh lệch để noise đơn lẻ không bị coi là chuyển động)
+        cv2.absdiff(gray, self._output, dst=self._diff)
+        cv2.blur(self._diff, (5, 5), dst=self._diff)
+        cv2.threshold(self._diff, self.motion_threshold, 255, cv2.THRESH_BINARY, dst=self._motion)
+        moving = cv2.countNonZero(self._motion)
+        
+        if moving > self.scene_change_fraction * gray.size:
+            # Đổi cảnh -> reset accumulator theo frame hiện tại
+            self.scene_changes += 1
+            logger.debug("Temporal denoiser reset on scene change")
+            self._acc[...] = gray
+            self._frames = 1
+        else:
+            self._frames += 1
+            cv2.accumulateWeighted(gray, self._acc, max(self.weight, 1.0 / self._frames))
+            if moving:
+                # Vùng chuyển động lấy frame hiện tại để tránh bóng mờ
+                cv2.accumulateWeighted(gray, self._acc, 1.0, mask=self._motion)
+        
+        cv2.convertScaleAbs(self._acc, dst=self._output)
+    
+    def _allocate(self, gray):
+        """Cấp phát buffers theo kích thước frame"""
+        self._acc = gray.astype(np.float32)
+        self._frames = 1
+        self._output = gray.copy()
+        self._diff = np.empty_like(gray)
+        self._motion = np.empty_like(gray)
+
+
 class NightModeProcessor:
     """Class xử lý night mode detection và image enhancement"""
     
-    def __init__(self, brightness_threshold=60):
+    def __init__(self, brightness_threshold=60, enhancement_backend='auto', frame_budget=1.0 / 15,
+                 hysteresis=10, stride=8, interval=5):
         """
         Khởi tạo night mode processor
         
         Args:
             brightness_threshold (int): Ngưỡng độ sáng để detect night mode (0-255)
+            enhancement_backend (str): 'nlm', 'bilateral', 'temporal', 'clahe' hoặc 'auto'
+            frame_budget (float): Thời gian cho mỗi frame (giây), dùng cho chế độ auto
+            hysteresis (float): Dải hysteresis quanh threshold khi đổi day/night
+            stride (int): Bước subsample khi đo độ sáng
+            interval (int): Số frame giữa hai lần đo độ sáng
         """
         self.brightness_threshold = brightness_threshold
+        self.light_estimator = LightLevelEstimator(brightness_threshold, hysteresis, stride, interval)
         self.alpha = 1.5  # Contrast multiplier
         self.beta = 30    # Brightness offset
         
+        # Enhancement backends
+        self.enhancement_backend = 'auto'
+        self.active_backend = None
+        self.budget_fraction = 0.5  # Phần frame budget dành cho enhancement
+        self.enhancement_budget = frame_budget * self.budget_fraction
+        self.backend_costs = {}     # Chi phí đo được (ms/frame, EMA) cho kích thước frame hiện tại
+        self._cost_shape = None
+        self._shape_costs = {}      # Kích thước frame -> chi phí từng backend
+        self._cost_bounds = {}      # Kích thước frame -> backends chỉ có cận dưới (chưa đo)
+        self._clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+        self.temporal_denoiser = TemporalDenoiser()
+        self._backends = {
+            'nlm': self._denoise_nlm,
+            'bilateral': self._denoise_bilateral,
+            'temporal': self._denoise_temporal,
+            'clahe': self._denoise_clahe,
+        }
+        self.set_enhancement_backend(enhancement_backend)
+        
+        # Vào night mode là một cảnh mới với temporal denoiser
+        self.light_estimator.add_listener(lambda is_low_light, brightness: self.temporal_denoiser.reset())
+        
         logger.info(f"Night mode processor initialized with threshold: {brightness_threshold}")
     
     def detect_low_light(self, frame):
@@ -29,22 +256,18 @@ class NightModeProcessor:
         Phát hiện điều kiện ánh sáng thấp
         
         Args:
-            frame (numpy.ndarray): Frame ảnh input
+            frame (numpy.ndarray | FrameContext): Frame ảnh input
             
         Returns:
             bool: True nếu là điều kiện ánh sáng thấp
         """
         try:
-            # Convert sang grayscale để tính độ sáng trung bình
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            mean_brightness = np.mean(gray)
-            
-            is_low_light = mean_brightness < self.brightness_threshold
+            # Dùng lại grayscale của frame context nếu có
+            if isinstance(frame, FrameContext):
+                frame = frame.gray
             
-            if is_low_light:
-                logger.debug(f"Low light detected: brightness={mean_brightness:.1f}")
-            
-            return is_low_light
+            # Độ sáng trung bình trên ảnh subsample, có hysteresis
+            return self.light_estimator.update(frame)
             
         except Exception as e:
             logger.error(f"Error in low light detection: {e}")
@@ -61,13 +284,8 @@ class NightModeProcessor:
             numpy.ndarray: Frame ảnh đã được cải thiện
         """
         try:
-            # 1. Tăng độ sáng và tương phản
-            enhanced = cv2.convertScaleAbs(frame, alpha=self.alpha, beta=self.beta)
-            
-            # 2. Khử nhiễu
-            # Convert sang grayscale để denoising
-            gray = cv2.cvtColor(enhanced, cv2.COLOR_BGR2GRAY)
-            denoised_gray = cv2.fastNlMeansDenoising(gray, None, 10, 7, 21)
+            # 1. Tăng độ sáng và tương phản, 2. Khử nhiễu (trên grayscale)
+            denoised_gray = self.enhance_gray(frame)
             
             # Convert lại sang BGR
             denoised = cv2.cvtColor(denoised_gray, cv2.COLOR_GRAY2BGR)
@@ -79,9 +297,205 @@ class NightModeProcessor:
             logger.error(f"Error in image enhancement: {e}")
             return frame
     
+    def enhance_gray(self, frame, out=None, bright=None):
+        """
+        Cải thiện frame và trả về grayscale (dùng trong thermal pipeline, không round-trip qua BGR)
+        
+        Giữ thứ tự gốc: tăng sáng trên BGR (saturate theo từng kênh) -> GRAY -> khử nhiễu,
+        nên kết quả giống hệt enhance_low_light_image.
+        
+        Args:
+            frame (numpy.ndarray): Frame BGR (hoặc grayscale)
+            out (numpy.ndarray): Buffer grayscale (optional)
+            bright (numpy.ndarray): Buffer cho bước tăng sáng, cùng shape với frame (optional)
+            
+        Returns:
+            numpy.ndarray: Frame grayscale đã được cải thiện
+        """
+        # 1. Tăng độ sáng và tương phản
+        enhanced = cv2.convertScaleAbs(frame, dst=bright, alpha=self.alpha, beta=self.beta)
+        
+        # 2. Khử nhiễu trên grayscale
+        if enhanced.ndim == 3:
+            gray = cv2.cvtColor(enhanced, cv2.COLOR_BGR2GRAY, dst=out)
+        elif out is not None:
+            np.copyto(out, enhanced)
+            gray = out
+        else:
+            gray = enhanced
+        return self._denoise(gray)
+    
+    def _denoise(self, gray):
+        """Khử nhiễu bằng backend đang chọn và ghi nhận chi phí"""
+        backend = self._select_backend(gray)
+        
+        start = time.perf_counter()
+        denoised = self._backends[backend](gray)
+        self._record_cost(backend, time.perf_counter() - start)
+        
+        return denoised
+    
+    def _denoise_nlm(self, gray):
+        """Non-local means - chất lượng cao nhất, chậm nhất"""
+        return cv2.fastNlMeansDenoising(gray, None, 10, 7, 21)
+    
+    def _denoise_bilateral(self, gray):
+        """Bilateral filter - giữ cạnh, nhanh hơn NLM nhiều lần"""
+        return cv2.bilateralFilter(gray, 5, 40, 5)
+    
+    def _denoise_temporal(self, gray):
+        """Trung bình theo thời gian (EMA có motion gating) giữa các frame liên tiếp"""
+        # Kết quả ghi đè lên gray (buffer của caller, không dùng chung giữa các worker)
+        return self.temporal_denoiser.process(gray, out=gray)
+    
+    def _denoise_clahe(self, gray):
+        """Chỉ cân bằng histogram cục bộ (CLAHE), không khử nhiễu"""
+        return self._clahe.apply(gray)
+    
+    def _select_backend(self, gray):
+        """
+        Chọn backend cho frame hiện tại
+        
+        Args:
+            gray (numpy.ndarray): Frame grayscale
+            
+        Returns:
+            str: Tên backend
+        """
+        if self.enhancement_backend != 'auto':
+            self.active_backend = self.enhancement_backend
+            return self.active_backend
+        
+        # Đổi kích thước frame (vd: rate control đổi processing scale) -> dùng chi phí theo kích thước đó
+        if self._cost_shape != gray.shape:
+            self._use_costs_for(gray)
+        
+        budget_ms = self.enhancement_budget * 1000.0
+        backend = ENHANCEMENT_BACKENDS[-1]
+        for name in ENHANCEMENT_BACKENDS:
+            if self.backend_costs.get(name, float('inf')) <= budget_ms:
+                backend = name
+                break
+        
+        if backend != self.active_backend:
+            logger.info(f"Night enhancement backend: {backend} (budget {budget_ms:.1f} ms)")
+            self.active_backend = backend
+        return backend
+    
+    def _record_cost(self, backend, seconds, smoothing=0.2):
+        """Cập nhật chi phí đo được của backend (EMA, ms)"""
+        ms = seconds * 1000.0
+        previous = self.backend_costs.get(backend)
+        bounds = self._cost_bounds.get(self._cost_shape, set())
+        if previous is None or backend in bounds:
+            # Lần đo thật đầu tiên thay cho cận dưới/ước lượng
+            bounds.discard(backend)
+            self.backend_costs[backend] = ms
+        else:
+            self.backend_costs[backend] = previous + smoothing * (ms - previous)
+    
+    def _use_costs_for(self, gray):
+        """
+        Chọn bảng chi phí cho kích thước frame: dùng lại nếu đã có, ước lượng theo số pixel
+        từ kích thước đã đo (không calibrate trên hot path), chỉ calibrate khi chưa có số liệu nào
+        """
+        shape = gray.shape
+        costs = self._shape_costs.get(shape)
+        if costs is None:
+            if self._cost_shape is None:
+                self.calibrate(gray)
+                return
+            # Chi phí các backend tỷ lệ gần tuyến tính với số pixel
+            ratio = gray.size / float(np.prod(self._cost_shape))
+            costs = {name: ms * ratio for name, ms in self.backend_costs.items()}
+            self._shape_costs[shape] = costs
+            self._cost_bounds[shape] = set(self._cost_bounds.get(self._cost_shape, ()))
+            logger.info(f"Night enhancement costs scaled to {shape[1]}x{shape[0]} (x{ratio:.2f})")
+        self.backend_costs = costs
+        self._cost_shape = shape
+    
+    def calibrate(self, gray):
+        """
+        Đo chi phí từng backend trên một frame mẫu
+        
+        Backend rẻ được đo trước; NLM luôn chậm hơn bilateral nên không đo
+        (chỉ ghi cận dưới) khi bilateral đã vượt budget.
+        
+        Args:
+            gray (numpy.ndarray): Frame grayscale mẫu
+            
+        Returns:
+            dict: Chi phí từng backend (ms/frame)
+        """
+        # Denoiser riêng để calibration không làm bẩn trạng thái temporal
+        backends = dict(self._backends, temporal=TemporalDenoiser().process)
+        budget_ms = self.enhancement_budget * 1000.0
+        costs = {}
+        bounds = set()
+        for name in reversed(ENHANCEMENT_BACKENDS):
+            if name == 'nlm' and costs.get('bilateral', 0.0) > budget_ms:
+                costs[name] = costs['bilateral']
+                bounds.add(name)
+                continue
+            # Temporal: frame đầu chỉ khởi tạo buffer, đo ở frame thứ hai
+            if name == 'temporal':
+                backends[name](gray)
+            start = time.perf_counter()
+            backends[name](gray)
+            costs[name] = (time.perf_counter() - start) * 1000.0
+        
+        self.backend_costs = {name: costs[name] for name in ENHANCEMENT_BACKENDS}
+        self._shape_costs[gray.shape] = self.backend_costs
+        self._cost_bounds[gray.shape] = bounds
+        self._cost_shape = gray.shape
+        
+        costs = ", ".join(f"{name}={'>' if name in bounds else ''}{ms:.1f}ms"
+                          for name, ms in self.backend_costs.items())
+        logger.info(f"Night enhancement costs: {costs}")
+        return dict(self.backend_costs)
+    
+    def set_enhancement_backend(self, backend):
+        """
+        Chọn enhancement backend
+        
+        Args:
+            backend (str): 'nlm', 'bilateral', 'temporal', 'clahe' hoặc 'auto'
+            
+        Returns:
+            bool: True nếu hợp lệ
+        """
+        if backend != 'auto' and backend not in self._backends:
+            logger.warning(f"Invalid enhancement backend: {backend}. "
+                           f"Must be one of {ENHANCEMENT_BACKENDS + ('auto',)}")
+            return False
+        
+        self.enhancement_backend = backend
+        self.temporal_denoiser.reset()
+        logger.info(f"Enhancement backend set to: {backend}")
+        return True
+    
+    def set_frame_budget(self, frame_budget):
+        """
+        Đặt thời gian cho mỗi frame (thường là 1/fps)
+        
+        Args:
+            frame_budget (float): Giây mỗi frame
+        """
+        self.enhancement_budget = frame_budget * self.budget_fraction
+    
+    def get_backend_costs(self):
+        """
+        Chi phí đo được của từng backend
+        
+        Returns:
+            dict: {backend: ms/frame}
+        """
+        return dict(self.backend_costs)
+    
     def get_night_colormap(self):
         """
         Trả về colormap phù hợp cho night mode
+        (dùng được với ThermalCameraHandler.set_palette)
         
         Returns:
             int: OpenCV colormap constant
@@ -91,6 +505,7 @@ class NightModeProcessor:
     def get_day_colormap(self):
         """
         Trả về colormap phù hợp cho day mode
+        (dùng được với ThermalCameraHandler.set_palette)
         
         Returns:
             int: OpenCV colormap constant
@@ -106,10 +521,21 @@ class NightModeProcessor:
         """
         if 0 <= new_threshold <= 255:
             self.brightness_threshold = new_threshold
+            self.light_estimator.threshold = new_threshold
+            self.light_estimator.reset()
             logger.info(f"Brightness threshold adjusted to: {new_threshold}")
         else:
             logger.warning(f"Invalid threshold value: {new_threshold}. Must be 0-255")
     
+    def add_mode_listener(self, callback):
+        """
+        Đăng ký callback khi đổi day/night mode
+        
+        Args:
+            callback (function): callback(is_low_light, brightness)
+        """
+        self.light_estimator.add_listener(callback)
+    
     def adjust_enhancement_params(self, alpha=None, beta=None):
         """
         Điều chỉnh tham số enhancement
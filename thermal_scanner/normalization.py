@@ -0,0 +1,145 @@
+"""
+Normalization module
+Map grayscale về 0-255 trước palette: theo từng frame, theo percentile của cửa sổ trượt, hoặc khoảng cố định
+"""
+
+import threading
+
+import cv2
+import numpy as np
+
+from frame_context import normalize_minmax
+
+
+# frame: min/max của từng frame (giống cv2.NORM_MINMAX, màu "nhảy" khi có vật sáng)
+# percentile: percentile trên histogram của N frame gần nhất (ổn định theo thời gian)
+# fixed: khoảng cố định
+NORMALIZATION_STRATEGIES = ('frame', 'percentile', 'fixed')
+
+
+class IntensityNormalizer:
+    """Normalize intensity theo strategy, giữ histogram cửa sổ trượt cho strategy 'percentile'"""
+
+    def __init__(self, strategy='frame', low_percentile=1.0, high_percentile=99.0, window=30,
+                 fixed_range=(0, 255), sample_step=4, update_interval=4):
+        """
+        Khởi tạo normalizer
+
+        Args:
+            strategy (str): 'frame', 'percentile' hoặc 'fixed'
+            low_percentile (float): Percentile map về 0 (strategy 'percentile')
+            high_percentile (float): Percentile map về 255 (strategy 'percentile')
+            window (int): Số frame gần nhất trong histogram
+            fixed_range (tuple): (low, high) cho strategy 'fixed'
+            sample_step (int): Chỉ lấy 1 pixel mỗi step theo mỗi chiều khi cập nhật histogram
+            update_interval (int): Cập nhật histogram (và khoảng percentile) mỗi N frame;
+                window tính theo số lần cập nhật
+        """
+        if strategy not in NORMALIZATION_STRATEGIES:
+            raise ValueError(f"Invalid normalization strategy: {strategy}. "
+                             f"Must be one of {', '.join(NORMALIZATION_STRATEGIES)}")
+        if not 0 <= low_percentile < high_percentile <= 100:
+            raise ValueError(f"Invalid percentiles: {low_percentile}, {high_percentile}")
+
+        self.strategy = strategy
+        self.low_percentile = low_percentile
+        self.high_percentile = high_percentile
+        self.window = max(1, int(window))
+        self.fixed_range = fixed_range
+        self.sample_step = max(1, int(sample_step))
+        self.update_interval = max(1, int(update_interval))
+        self.range = (float(fixed_range[0]), float(fixed_range[1]))
+
+        self._lock = threading.Lock()
+        # Histogram từng frame trong cửa sổ (ring) và tổng của chúng
+        self._histograms = np.zeros((self.window, 256), dtype=np.float32)
+        self._total = np.zeros(256, dtype=np.float64)
+        self._next = 0
+        self._frames = 0
+        self._frames_until_update = 0
+
+    def reset(self):
+        """Bỏ histogram đã tích lũy"""
+        with self._lock:
+            self._histograms.fill(0)
+            self._total.fill(0)
+            self._next = 0
+            self._frames = 0
+            self._frames_until_update = 0
+
+    def normalize(self, gray, stats=None, out=None):
+        """
+        Normalize một frame grayscale
+
+        Args:
+            gray (numpy.ndarray): Ảnh grayscale uint8
+            stats (dict): Brightness stats đã tính ({'min', 'max'}), dùng cho strategy 'frame' (optional)
+            out (numpy.ndarray): Buffer output (optional)
+
+        Returns:
+            numpy.ndarray: Intensity uint8 0-255 (giá trị ngoài khoảng bị saturate)
+        """
+        if self.strategy == 'frame':
+            if stats is not None:
+                return normalize_minmax(gray, stats['min'], stats['max'], out=out)
+            return normalize_minmax(gray, out=out)
+
+        if self.strategy == 'percentile':
+            low, high = self._update(gray)
+        else:
+            low, high = self.fixed_range
+        return normalize_range(gray, low, high, out=out)
+
+    def _update(self, gray):
+        """
+        Thêm histogram (đã subsample) của frame vào cửa sổ và tính khoảng percentile
+        (chỉ mỗi `update_interval` frame, các frame khác dùng lại khoảng gần nhất)
+
+        Returns:
+            tuple: (low, high) intensity
+        """
+        step = self.sample_step
+        sample = gray[::step, ::step] if step > 1 else gray
+        with self._lock:
+            self._frames_until_update -= 1
+            if self._frames_until_update > 0:
+                return self.range
+            self._frames_until_update = self.update_interval
+
+            row = self._histograms[self._next]
+            if self._frames >= self.window:
+                # Frame cũ nhất rời khỏi cửa sổ
+                self._total -= row
+            cv2.calcHist([sample], [0], None, [256], [0, 256], hist=row.reshape(256, 1))
+            self._total += row
+            self._next = (self._next + 1) % self.window
+            self._frames += 1
+
+            cumulative = np.cumsum(self._total)
+            count = cumulative[-1]
+            low = int(np.searchsorted(cumulative, count * self.low_percentile / 100.0, side='right'))
+            high = int(np.searchsorted(cumulative, count * self.high_percentile / 100.0, side='left'))
+            low = min(low, 255)
+            high = max(low, min(high, 255))
+            self.range = (float(low), float(high))
+            return self.range
+
+
+def normalize_range(gray, low, high, out=None):
+    """
+    Map khoảng [low, high] về 0-255 trong một pass, giá trị ngoài khoảng bị saturate
+
+    (addWeighted saturate kết quả âm về 0, khác convertScaleAbs lấy trị tuyệt đối)
+
+    Args:
+        gray (numpy.ndarray): Ảnh grayscale uint8
+        low (float): Intensity map về 0
+        high (float): Intensity map về 255
+        out (numpy.ndarray): Buffer output (optional)
+
+    Returns:
+        numpy.ndarray: Ảnh đã normalize
+    """
+    value_range = high - low
+    scale = 255.0 / value_range if value_range > 0 else 0.0
+    return cv2.addWeighted(gray, scale, gray, 0.0, -low * scale, dst=out)
@@ -0,0 +1,320 @@
+"""
+Palette module
+Lookup-table (LUT) cho thermal palettes - map intensity (0-255) sang màu BGR
+"""
+
+import json
+import os
+import threading
+
+import cv2
+import numpy as np
+from utils.logger import logger
+
+
+# OpenCV colormaps built-in (tên -> constant)
+OPENCV_COLORMAPS = {
+    'autumn': cv2.COLORMAP_AUTUMN,
+    'bone': cv2.COLORMAP_BONE,
+    'jet': cv2.COLORMAP_JET,
+    'winter': cv2.COLORMAP_WINTER,
+    'rainbow': cv2.COLORMAP_RAINBOW,
+    'ocean': cv2.COLORMAP_OCEAN,
+    'summer': cv2.COLORMAP_SUMMER,
+    'spring': cv2.COLORMAP_SPRING,
+    'cool': cv2.COLORMAP_COOL,
+    'hsv': cv2.COLORMAP_HSV,
+    'pink': cv2.COLORMAP_PINK,
+    'hot': cv2.COLORMAP_HOT,
+    'parula': cv2.COLORMAP_PARULA,
+    'magma': cv2.COLORMAP_MAGMA,
+    'inferno': cv2.COLORMAP_INFERNO,
+    'plasma': cv2.COLORMAP_PLASMA,
+    'viridis': cv2.COLORMAP_VIRIDIS,
+    'cividis': cv2.COLORMAP_CIVIDIS,
+    'twilight': cv2.COLORMAP_TWILIGHT,
+    'turbo': cv2.COLORMAP_TURBO,
+}
+
+
+def _day_color(intensity):
+    """
+    Màu BGR của palette ban ngày cho một giá trị intensity
+
+    Args:
+        intensity (int): Giá trị intensity (0-255)
+
+    Returns:
+        tuple: Màu (B, G, R)
+    """
+    if intensity < 60:  # Lạnh - xanh đen
+        return (intensity // 2, 0, 0)
+    elif intensity < 120:  # Ấm - đỏ đậm
+        return (0, 0, intensity)
+    elif intensity < 180:  # Nóng - đỏ cam
+        return (0, intensity // 3, intensity)
+    elif intensity < 220:  # Rất nóng - vàng
+        return (0, intensity // 2, intensity)
+    else:  # Cực nóng - trắng
+        return (intensity // 3, intensity // 2, intensity)
+
+
+def _night_color(intensity):
+    """
+    Màu BGR của palette ban đêm cho một giá trị intensity
+
+    Args:
+        intensity (int): Giá trị intensity (0-255)
+
+    Returns:
+        tuple: Màu (B, G, R)
+    """
+    if intensity < 50:  # Rất lạnh - xanh đậm
+        return (intensity, 0, 100)
+    elif intensity < 100:  # Lạnh - xanh nhạt
+        return (intensity, intensity // 2, 150)
+    elif intensity < 150:  # Ấm - tím
+        return (intensity, intensity // 3, 200)
+    elif intensity < 200:  # Nóng - đỏ
+        return (50, intensity // 4, intensity)
+    else:  # Rất nóng - trắng/vàng
+        return (100, intensity // 2, intensity)
+
+
+def _build_lut(color_fn):
+    """Tạo LUT 256x3 (uint8) từ hàm màu"""
+    return np.array([color_fn(i) for i in range(256)], dtype=np.uint8)
+
+
+def build_day_lut():
+    """
+    Tạo LUT cho thermal palette ban ngày (màu nóng - đỏ/vàng)
+
+    Returns:
+        numpy.ndarray: LUT shape (256, 3), dtype uint8
+    """
+    return _build_lut(_day_color)
+
+
+def build_night_lut():
+    """
+    Tạo LUT cho thermal palette ban đêm (màu lạnh - xanh/tím)
+
+    Returns:
+        numpy.ndarray: LUT shape (256, 3), dtype uint8
+    """
+    return _build_lut(_night_color)
+
+
+def apply_lut(intensity, lut, out=None):
+    """
+    Áp dụng LUT lên intensity map trong một lần vectorized
+
+    Args:
+        intensity (numpy.ndarray): Ảnh grayscale uint8 shape (H, W)
+        lut (numpy.ndarray): LUT shape (256, 3)
+        out (numpy.ndarray): Buffer output (H, W, 3) để ghi in-place (optional)
+
+    Returns:
+        numpy.ndarray: Ảnh BGR shape (H, W, 3)
+    """
+    if out is None:
+        return lut[intensity]
+    np.take(lut, intensity, axis=0, out=out)
+    return out
+
+
+def build_opencv_lut(colormap):
+    """
+    Compile một OpenCV colormap thành LUT
+
+    Args:
+        colormap (int): OpenCV colormap constant (vd: cv2.COLORMAP_JET)
+
+    Returns:
+        numpy.ndarray: LUT shape (256, 3), dtype uint8
+    """
+    ramp = np.arange(256, dtype=np.uint8).reshape(256, 1)
+    return cv2.applyColorMap(ramp, colormap).reshape(256, 3)
+
+
+def build_gradient_lut(stops):
+    """
+    Tạo LUT bằng nội suy tuyến tính giữa các điểm màu
+
+    Args:
+        stops (list): Danh sách [position (0-255), [B, G, R]]
+
+    Returns:
+        numpy.ndarray: LUT shape (256, 3), dtype uint8
+    """
+    stops = sorted(stops, key=lambda stop: stop[0])
+    positions = np.array([stop[0] for stop in stops], dtype=np.float64)
+    colors = np.array([stop[1] for stop in stops], dtype=np.float64)
+    ramp = np.arange(256, dtype=np.float64)
+    channels = [np.interp(ramp, positions, colors[:, c]) for c in range(3)]
+    return np.clip(np.rint(np.stack(channels, axis=1)), 0, 255).astype(np.uint8)
+
+
+def load_palette_file(path):
+    """
+    Đọc custom palette từ file
+
+    Hỗ trợ:
+        - .npy: mảng (256, 3) màu BGR
+        - .json: {"colors": [[B, G, R] x 256]} hoặc {"stops": [[pos, [B, G, R]], ...]}
+
+    Args:
+        path (str): Đường dẫn file palette
+
+    Returns:
+        numpy.ndarray: LUT shape (256, 3), dtype uint8
+
+    Raises:
+        ValueError: Nếu file không đúng định dạng
+    """
+    ext = os.path.splitext(path)[1].lower()
+
+    if ext == '.npy':
+        lut = np.load(path)
+    elif ext == '.json':
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if 'colors' in data:
+            lut = np.array(data['colors'])
+        elif 'stops' in data:
+            lut = build_gradient_lut(data['stops'])
+        else:
+            raise ValueError("JSON palette must contain 'colors' or 'stops'")
+    else:
+        raise ValueError(f"Unsupported palette file type: {ext}")
+
+    lut = np.asarray(lut)
+    if lut.shape != (256, 3):
+        raise ValueError(f"Palette must have shape (256, 3), got {lut.shape}")
+    if lut.min() < 0 or lut.max() > 255:
+        raise ValueError("Palette colors must be in range 0-255")
+
+    return lut.astype(np.uint8)
+
+
+class PaletteRegistry:
+    """Registry quản lý palettes và cache LUT đã compile"""
+
+    def __init__(self):
+        """Khởi tạo registry với các palette built-in"""
+        self._builders = {}
+        self._cache = {}
+        self._lock = threading.Lock()
+
+        # Legacy thermal ramps
+        self.register('thermal_day', build_day_lut)
+        self.register('thermal_night', build_night_lut)
+
+        # OpenCV colormaps
+        for name, colormap in OPENCV_COLORMAPS.items():
+            self.register(name, lambda colormap=colormap: build_opencv_lut(colormap))
+
+    def register(self, name, builder):
+        """
+        Đăng ký palette mới
+
+        Args:
+            name (str): Tên palette
+            builder (function | numpy.ndarray): Hàm tạo LUT hoặc LUT (256, 3)
+        """
+        if not callable(builder):
+            lut = np.asarray(builder)
+            if lut.shape != (256, 3):
+                raise ValueError(f"Palette must have shape (256, 3), got {lut.shape}")
+            lut = lut.astype(np.uint8)
+            builder = lambda: lut
+
+        with self._lock:
+            self._builders[name] = builder
+            # Palette đăng ký lại -> bỏ LUT cũ trong cache
+            self._cache.pop(name, None)
+
+        logger.debug(f"Palette registered: {name}")
+
+    def load_file(self, path, name=None):
+        """
+        Load custom palette từ file và đăng ký vào registry
+
+        Args:
+            path (str): Đường dẫn file palette (.npy/.json)
+            name (str): Tên palette (default: tên file)
+
+        Returns:
+            str: Tên palette đã đăng ký hoặc None nếu lỗi
+        """
+        if name is None:
+            name = os.path.splitext(os.path.basename(path))[0]
+
+        try:
+            lut = load_palette_file(path)
+        except Exception as e:
+            logger.error(f"Failed to load palette {path}: {e}")
+            return None
+
+        self.register(name, lut)
+        logger.info(f"Custom palette loaded: {name} ({path})")
+        return name
+
+    def get_lut(self, name):
+        """
+        Lấy LUT đã compile (compile lần đầu rồi cache)
+
+        Args:
+            name (str | int): Tên palette hoặc OpenCV colormap constant
+
+        Returns:
+            numpy.ndarray: LUT shape (256, 3), dtype uint8
+
+        Raises:
+            KeyError: Nếu palette không tồn tại
+        """
+        if isinstance(name, (int, np.integer)) and not isinstance(name, bool):
+            name = self._colormap_name(int(name))
+
+        with self._lock:
+            lut = self._cache.get(name)
+            if lut is not None:
+                return lut
+
+            builder = self._builders.get(name)
+            if builder is None:
+                raise KeyError(f"Unknown palette: {name}")
+
+            lut = builder()
+            # LUT dùng chung giữa các thread -> read-only
+            lut.setflags(write=False)
+            self._cache[name] = lut
+
+        logger.debug(f"Palette compiled: {name}")
+        return lut
+
+    def names(self):
+        """
+        Danh sách tên palette đã đăng ký
+
+        Returns:
+            list: Tên các palette
+        """
+        with self._lock:
+            return list(self._builders)
+
+    def __contains__(self, name):
+        with self._lock:
+            return name in self._builders
+
+    def _colormap_name(self, colormap):
+        """Tìm tên palette từ OpenCV colormap constant"""
+        for name, value in OPENCV_COLORMAPS.items():
+            if value == colormap:
+                return name
+        raise KeyError(f"Unknown OpenCV colormap: {colormap}")
+
+
+# Global palette registry
+palette_registry = PaletteRegistry()
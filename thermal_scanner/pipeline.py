@@ -0,0 +1,387 @@
+"""
+Pipeline module
+Pipeline nhiều stage: capture -> processing workers -> presenter, nối bằng bounded queues
+"""
+
+import threading
+import time
+from collections import deque
+
+from utils.logger import logger
+
+
+class DropOldestQueue:
+    """Bounded queue: khi đầy thì bỏ item cũ nhất (hoặc block nếu tắt drop)"""
+
+    def __init__(self, maxsize=2, drop_oldest=True):
+        """
+        Khởi tạo queue
+
+        Args:
+            maxsize (int): Số item tối đa
+            drop_oldest (bool): True = bỏ item cũ nhất khi đầy, False = block producer
+        """
+        self.maxsize = max(1, maxsize)
+        self.drop_oldest = drop_oldest
+        self.dropped = 0
+        self._items = deque()
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def put(self, item):
+        """
+        Thêm item vào queue
+
+        Args:
+            item: Item cần thêm
+
+        Returns:
+            object: Item bị bỏ (nếu có) hoặc None
+        """
+        with self._cond:
+            evicted = None
+            if self.drop_oldest:
+                if len(self._items) >= self.maxsize:
+                    evicted = self._items.popleft()
+                    self.dropped += 1
+            else:
+                while len(self._items) >= self.maxsize and not self._closed:
+                    self._cond.wait()
+
+            if self._closed:
+                return item
+
+            self._items.append(item)
+            self._cond.notify_all()
+            return evicted
+
+    def get(self, timeout=None):
+        """
+        Lấy item (block tới khi có item hoặc queue đóng)
+
+        Args:
+            timeout (float): Thời gian chờ tối đa (giây)
+
+        Returns:
+            object: Item hoặc None nếu timeout / queue đã đóng và rỗng
+        """
+        with self._cond:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while not self._items:
+                if self._closed:
+                    return None
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def close(self):
+        """Đóng queue - consumer nhận hết item còn lại rồi dừng"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def clear(self):
+        """Bỏ toàn bộ item đang chờ"""
+        with self._cond:
+            self._items.clear()
+            self._cond.notify_all()
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def __len__(self):
+        with self._cond:
+            return len(self._items)
+
+
+class StageStats:
+    """Thống kê latency của một stage (ms)"""
+
+    def __init__(self, smoothing=0.1):
+        """
+        Args:
+            smoothing (float): Hệ số EMA cho latency trung bình
+        """
+        self.smoothing = smoothing
+        self.count = 0
+        self.last_ms = 0.0
+        self.avg_ms = 0.0
+        self.max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        """Ghi nhận một mẫu latency (giây)"""
+        ms = seconds * 1000.0
+        with self._lock:
+            self.count += 1
+            self.last_ms = ms
+            self.max_ms = max(self.max_ms, ms)
+            if self.count == 1:
+                self.avg_ms = ms
+            else:
+                self.avg_ms += self.smoothing * (ms - self.avg_ms)
+
+    def snapshot(self):
+        """
+        Returns:
+            dict: {'count', 'last_ms', 'avg_ms', 'max_ms'}
+        """
+        with self._lock:
+            return {
+                'count': self.count,
+                'last_ms': self.last_ms,
+                'avg_ms': self.avg_ms,
+                'max_ms': self.max_ms,
+            }
+
+
+class FramePacket:
+    """Frame đi qua pipeline cùng timestamps"""
+
+    __slots__ = ('seq', 'frame', 'thermal', 'slot', 'captured_at', 'processed_at')
+
+    def __init__(self, seq, frame, captured_at, slot=None):
+        self.seq = seq
+        self.frame = frame
+        self.thermal = None
+        self.slot = slot
+        self.captured_at = captured_at
+        self.processed_at = None
+
+
+class FramePipeline:
+    """Pipeline processing workers -> presenter, nhận frame từ capture thread"""
+
+    def __init__(self, process_fn, present_fn, workers=1, queue_size=2, drop_oldest=True,
+                 release_fn=None):
+        """
+        Khởi tạo pipeline
+
+        Args:
+            process_fn (function): Hàm xử lý frame -> thermal frame; nhận thêm
+                buffer output khi packet có frame slot
+            present_fn (function): Hàm nhận FramePacket đã xử lý (presenter)
+            workers (int): Số processing worker threads
+            queue_size (int): Kích thước mỗi queue giữa các stage
+            drop_oldest (bool): True = bỏ frame cũ khi stage sau chậm (live),
+                False = back-pressure về capture (offline, không mất frame)
+            release_fn (function): Gọi với FramePacket bị bỏ (để trả frame slot)
+        """
+        self.process_fn = process_fn
+        self.present_fn = present_fn
+        self.release_fn = release_fn
+        self.workers = max(1, workers)
+        self.drop_oldest = drop_oldest
+
+        self.process_queue = DropOldestQueue(queue_size, drop_oldest)
+        self.present_queue = DropOldestQueue(queue_size, drop_oldest)
+
+        self.stats = {
+            'capture': StageStats(),
+            'process': StageStats(),
+            'present': StageStats(),
+            'end_to_end': StageStats(),
+        }
+        self.presented = 0
+        self.skipped = 0
+
+        self._seq = 0
+        self._threads = []
+        self._worker_threads = []
+        self._running = False
+
+    def start(self):
+        """Khởi động worker và presenter threads"""
+        self._running = True
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"thermal-worker-{i}", daemon=True)
+            self._worker_threads.append(thread)
+        presenter = threading.Thread(target=self._presenter_loop, name="thermal-presenter", daemon=True)
+        self._threads = self._worker_threads + [presenter]
+        for thread in self._threads:
+            thread.start()
+        logger.info(f"Frame pipeline started with {self.workers} worker(s)")
+
+    def submit(self, frame, captured_at=None, read_seconds=None, slot=None):
+        """
+        Đẩy frame từ capture stage vào pipeline
+
+        Args:
+            frame (numpy.ndarray): Frame gốc
+            captured_at (float): Thời điểm đọc frame (time.perf_counter)
+            read_seconds (float): Thời gian đọc frame (cho stats capture)
+            slot (FrameSlot): Frame slot chứa frame và thermal buffer (optional)
+        """
+        if captured_at is None:
+            captured_at = time.perf_counter()
+        if read_seconds is not None:
+            self.stats['capture'].record(read_seconds)
+
+        packet = FramePacket(self._seq, frame, captured_at, slot)
+        self._seq += 1
+        self._discard(self.process_queue.put(packet))
+
+    def _discard(self, packet):
+        """Trả lại tài nguyên của packet bị bỏ"""
+        if packet is not None and self.release_fn is not None:
+            self.release_fn(packet)
+
+    def finish(self, timeout=None):
+        """
+        Đóng input và đợi các frame còn lại đi hết pipeline
+
+        Args:
+            timeout (float): Thời gian chờ tối đa cho mỗi thread
+        """
+        self.process_queue.close()
+        for thread in self._worker_threads:
+            thread.join(timeout)
+        self.present_queue.close()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._running = False
+
+    def stop(self, timeout=2.0):
+        """Dừng pipeline ngay, bỏ các frame đang chờ"""
+        self._running = False
+        self.process_queue.clear()
+        self.present_queue.clear()
+        self.process_queue.close()
+        self.present_queue.close()
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout)
+
+    def _worker_loop(self):
+        """Processing worker: lấy frame, tạo thermal frame"""
+        while True:
+            packet = self.process_queue.get()
+            if packet is None:
+                break
+
+            start = time.perf_counter()
+            try:
+                if packet.slot is not None:
+                    # Ghi thermal frame trực tiếp vào buffer của slot
+                    packet.thermal = self.process_fn(packet.frame, packet.slot.thermal)
+                else:
+                    packet.thermal = self.process_fn(packet.frame)
+            except Exception as e:
+                logger.error(f"Error in processing worker: {e}")
+            packet.processed_at = time.perf_counter()
+            self.stats['process'].record(packet.processed_at - start)
+
+            self._discard(self.present_queue.put(packet))
+
+    def _presenter_loop(self):
+        """Presenter: đưa frame đã xử lý ra ngoài theo đúng thứ tự"""
+        next_seq = 0
+        pending = {}
+
+        while True:
+            packet = self.present_queue.get()
+            if packet is None:
+                break
+
+            if self.drop_oldest:
+                # Live: frame về trễ hơn frame đã hiển thị thì bỏ
+                if packet.seq < next_seq:
+                    self.skipped += 1
+                    self._discard(packet)
+                    continue
+                self._present(packet)
+                next_seq = packet.seq + 1
+            else:
+                # Offline: không mất frame -> sắp xếp lại theo seq
+                pending[packet.seq] = packet
+                while next_seq in pending:
+                    self._present(pending.pop(next_seq))
+                    next_seq += 1
+
+    def _present(self, packet):
+        """Gọi presenter cho một packet và ghi stats"""
+        if packet.thermal is None:
+            self.skipped += 1
+            self._discard(packet)
+            return
+
+        start = time.perf_counter()
+        try:
+            self.present_fn(packet)
+        except Exception as e:
+            logger.error(f"Error in frame presenter: {e}")
+        end = time.perf_counter()
+
+        self.presented += 1
+        self.stats['present'].record(end - start)
+        self.stats['end_to_end'].record(end - packet.captured_at)
+
+    def get_stats(self):
+        """
+        Thống kê latency từng stage và số frame bị drop
+
+        Returns:
+            dict: Stats theo stage + counters
+        """
+        stats = {name: stage.snapshot() for name, stage in self.stats.items()}
+        stats['dropped'] = self.process_queue.dropped + self.present_queue.dropped
+        stats['skipped'] = self.skipped
+        stats['presented'] = self.presented
+        stats['queue_depth'] = {
+            'process': len(self.process_queue),
+            'present': len(self.present_queue),
+        }
+        return stats
+
+
+class FrameMailbox:
+    """Mailbox một chỗ: chỉ giữ frame mới nhất, frame chưa kịp lấy sẽ bị thay"""
+
+    def __init__(self):
+        self._item = None
+        self._lock = threading.Lock()
+        self.posted = 0
+        self.dropped = 0
+        self.taken = 0
+
+    def post(self, item):
+        """
+        Đặt item mới nhất (không bao giờ block)
+
+        Args:
+            item: Frame / handle cần chuyển
+        """
+        with self._lock:
+            if self._item is not None:
+                # Consumer chưa lấy frame trước -> bỏ
+                self.dropped += 1
+            self._item = item
+            self.posted += 1
+
+    def take(self):
+        """
+        Lấy item mới nhất nếu có
+
+        Returns:
+            object: Item hoặc None nếu không có frame mới
+        """
+        with self._lock:
+            item = self._item
+            if item is not None:
+                self._item = None
+                self.taken += 1
+            return item
+
+    def get_stats(self):
+        """
+        Returns:
+            dict: {'posted', 'dropped', 'taken'}
+        """
+        with self._lock:
+            return {'posted': self.posted, 'dropped': self.dropped, 'taken': self.taken}
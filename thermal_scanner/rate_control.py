@@ -0,0 +1,217 @@
+"""
+Rate control module
+Điều khiển frame rate theo deadline, tự giảm chất lượng khi xử lý không kịp target FPS
+"""
+
+import threading
+import time
+
+from utils.logger import logger
+
+
+# Các mức chất lượng, từ đầy đủ tới rẻ nhất
+#   enhancement_budget: hệ số nhân vào budget của night enhancement (auto backend)
+#   scale: tỷ lệ độ phân giải khi xử lý
+#   skip: chỉ xử lý 1 trong N frame
+QUALITY_LEVELS = (
+    {'name': 'full', 'enhancement_budget': 1.0, 'scale': 1.0, 'skip': 1},
+    {'name': 'cheap_enhancement', 'enhancement_budget': 0.25, 'scale': 1.0, 'skip': 1},
+    {'name': 'half_resolution', 'enhancement_budget': 0.25, 'scale': 0.5, 'skip': 1},
+    {'name': 'skip_frames', 'enhancement_budget': 0.25, 'scale': 0.5, 'skip': 2},
+)
+
+
+class FrameRateController:
+    """Deadline scheduler + điều chỉnh chất lượng theo tải xử lý"""
+
+    def __init__(self, target_fps=15.0, adaptive=True, high_load=0.9, low_load=0.5,
+                 degrade_after=1.0, recover_after=5.0, levels=QUALITY_LEVELS):
+        """
+        Khởi tạo frame rate controller
+
+        Args:
+            target_fps (float): FPS mục tiêu
+            adaptive (bool): Tự giảm/tăng chất lượng theo tải
+            high_load (float): Tải (thời gian xử lý / chu kỳ frame) để giảm chất lượng
+            low_load (float): Tải để tăng lại chất lượng
+            degrade_after (float): Số giây quá tải liên tục trước khi giảm chất lượng
+            recover_after (float): Số giây tải thấp liên tục trước khi tăng chất lượng
+            levels (tuple): Các mức chất lượng
+        """
+        self.adaptive = adaptive
+        self.high_load = high_load
+        self.low_load = low_load
+        self.degrade_after = degrade_after
+        self.recover_after = recover_after
+        self.levels = levels
+
+        self.level = 0
+        self.load = 0.0
+        self.target_met = True
+        self.missed_deadlines = 0
+        self.frames = 0
+
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._deadline = None
+        self._over = 0
+        self._under = 0
+        self._reported = False
+        self._started_at = None
+        self.set_target_fps(target_fps)
+
+    def set_target_fps(self, target_fps):
+        """
+        Đổi FPS mục tiêu
+
+        Args:
+            target_fps (float): FPS mục tiêu (> 0)
+        """
+        if target_fps <= 0:
+            raise ValueError(f"Invalid target FPS: {target_fps}")
+        self.target_fps = float(target_fps)
+        self.period = 1.0 / self.target_fps
+        self._reported = False
+
+    def add_listener(self, listener):
+        """
+        Đăng ký callback khi đổi mức chất lượng
+
+        Args:
+            listener (function): listener(level_index, level_settings)
+        """
+        self._listeners.append(listener)
+
+    def reset(self):
+        """Bắt đầu lại lịch frame (giữ mức chất lượng hiện tại)"""
+        self._deadline = None
+        self._over = 0
+        self._under = 0
+        self.frames = 0
+        self.missed_deadlines = 0
+        self._started_at = None
+
+    def wait(self):
+        """
+        Ngủ tới đúng slot kế tiếp (không busy-wait)
+
+        Returns:
+            float: Thời điểm bắt đầu slot (time.perf_counter)
+        """
+        now = time.perf_counter()
+        if self._deadline is None:
+            self._deadline = now
+            self._started_at = now
+
+        remaining = self._deadline - now
+        if remaining > 0:
+            time.sleep(remaining)
+            now = self._deadline
+        elif -remaining > self.period:
+            # Trễ hơn một chu kỳ -> bỏ slot đã lỡ, không chạy dồn để đuổi kịp
+            self.missed_deadlines += 1
+            self._deadline = now
+
+        self._deadline += self.period
+        self.frames += 1
+        return now
+
+    def update(self, process_seconds, workers=1):
+        """
+        Cập nhật tải xử lý và điều chỉnh mức chất lượng
+
+        Args:
+            process_seconds (float): Thời gian xử lý trung bình mỗi frame
+            workers (int): Số processing workers chạy song song
+
+        Returns:
+            int: Mức chất lượng hiện tại
+        """
+        # Ở mức skip frame, mỗi frame được xử lý có N chu kỳ
+        skip = self.levels[self.level]['skip']
+        load = process_seconds / (self.period * max(1, workers) * skip)
+        self.load = load
+        if not self.adaptive:
+            self.target_met = load <= 1.0
+            return self.level
+
+        if load > self.high_load:
+            self._over += 1
+            self._under = 0
+        elif load < self.low_load:
+            self._under += 1
+            self._over = 0
+        else:
+            self._over = 0
+            self._under = 0
+
+        if self._over >= self.degrade_after * self.target_fps:
+            self._over = 0
+            if self.level < len(self.levels) - 1:
+                self._set_level(self.level + 1)
+            elif load > 1.0:
+                self._report_unreachable(load)
+        elif self._under >= self.recover_after * self.target_fps and self.level > 0:
+            self._under = 0
+            self._set_level(self.level - 1)
+
+        if load <= 1.0:
+            self.target_met = True
+            self._reported = False
+        return self.level
+
+    def set_level(self, level):
+        """
+        Đặt mức chất lượng thủ công
+
+        Args:
+            level (int): Index trong QUALITY_LEVELS
+        """
+        self._set_level(max(0, min(level, len(self.levels) - 1)))
+
+    def get_stats(self):
+        """
+        Returns:
+            dict: {'target_fps', 'achieved_fps', 'load', 'level', 'level_name',
+                   'target_met', 'missed_deadlines'}
+        """
+        achieved = 0.0
+        if self._started_at is not None and self.frames > 1:
+            elapsed = time.perf_counter() - self._started_at
+            achieved = (self.frames - 1) / elapsed if elapsed > 0 else 0.0
+        return {
+            'target_fps': self.target_fps,
+            'achieved_fps': achieved,
+            'load': self.load,
+            'level': self.level,
+            'level_name': self.levels[self.level]['name'],
+            'target_met': self.target_met,
+            'missed_deadlines': self.missed_deadlines,
+        }
+
+    def _set_level(self, level):
+        """Đổi mức chất lượng và báo cho listeners"""
+        with self._lock:
+            if level == self.level:
+                return
+            previous = self.level
+            self.level = level
+
+        settings = self.levels[level]
+        direction = "Reducing" if level > previous else "Restoring"
+        logger.info(f"{direction} processing quality: {settings['name']} "
+                    f"(load {self.load:.2f} at {self.target_fps:.0f} FPS)")
+        for listener in list(self._listeners):
+            try:
+                listener(level, settings)
+            except Exception as e:
+                logger.error(f"Error in rate control listener: {e}")
+
+    def _report_unreachable(self, load):
+        """Báo (một lần) khi mức thấp nhất vẫn không đạt target FPS"""
+        self.target_met = False
+        if not self._reported:
+            self._reported = True
+            achievable = self.target_fps / load if load > 0 else 0.0
+            logger.warning(f"Target {self.target_fps:.0f} FPS cannot be met at lowest quality "
+                           f"(load {load:.2f}, ~{achievable:.1f} FPS achievable)")
@@ -0,0 +1,273 @@
+"""
+Recorder module
+Ghi thermal video liên tục trên encoder thread riêng, có chia segment và pre-trigger buffer
+"""
+
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+import cv2
+import numpy as np
+from utils.logger import logger
+
+
+VIDEO_CODECS = {
+    '.avi': 'MJPG',
+    '.mp4': 'mp4v',
+    '.mkv': 'XVID',
+}
+
+# Sentinel kết thúc một recording
+_STOP = object()
+
+
+class ThermalRecorder:
+    """Recorder không bao giờ block capture thread: frame thừa bị bỏ thay vì chờ"""
+
+    def __init__(self, directory="recordings", fps=15.0, ext='.avi', pre_trigger_seconds=0.0,
+                 segment_seconds=None, segment_bytes=None, max_queue=None, prefix="thermal_rec"):
+        """
+        Khởi tạo recorder
+
+        Args:
+            directory (str): Thư mục lưu video
+            fps (float): FPS của video output
+            ext (str): Định dạng video (.avi/.mp4/.mkv)
+            pre_trigger_seconds (float): Số giây trước khi bấm record được giữ lại
+            segment_seconds (float): Chia file mới sau mỗi N giây (optional)
+            segment_bytes (int): Chia file mới khi file vượt N bytes (optional)
+            max_queue (int): Số frame tối đa chờ encode (default: 2 giây + pre-trigger)
+            prefix (str): Tiền tố tên file
+        """
+        if ext not in VIDEO_CODECS:
+            raise ValueError(f"Unsupported video format: {ext}. Must be one of {list(VIDEO_CODECS)}")
+
+        self.directory = directory
+        self.fps = fps
+        self.ext = ext
+        self.prefix = prefix
+        self.segment_seconds = segment_seconds
+        self.segment_bytes = segment_bytes
+        self.pre_trigger_frames = int(round(pre_trigger_seconds * fps))
+
+        if max_queue is None:
+            max_queue = int(fps * 2) + self.pre_trigger_frames
+        self._queue = queue.Queue(maxsize=max(1, max_queue))
+
+        # Pre-trigger ring: buffers cấp phát trước, ghi đè vòng tròn
+        self._ring = []
+        self._ring_times = []
+        self._ring_next = 0
+        self._ring_count = 0
+
+        self.is_recording = False
+        self.dropped = 0
+        self.written = 0
+        self.segments = []
+
+        self._lock = threading.Lock()
+        self._writer = None
+        self._segment_path = None
+        self._segment_start = None
+        self._segment_size = None
+        self._session_stamp = None
+        self._thread = threading.Thread(target=self._run, name="thermal-recorder", daemon=True)
+        self._thread.start()
+
+    def push(self, frame, timestamp=None):
+        """
+        Nhận frame từ pipeline (gọi mỗi frame, không block)
+
+        Args:
+            frame (numpy.ndarray): Thermal frame BGR
+            timestamp (float): Thời điểm frame (time.time)
+        """
+        if timestamp is None:
+            timestamp = time.time()
+
+        with self._lock:
+            if self.is_recording:
+                try:
+                    self._queue.put_nowait((frame.copy(), timestamp))
+                except queue.Full:
+                    # Encoder chậm -> bỏ frame, không back-pressure capture
+                    self.dropped += 1
+            elif self.pre_trigger_frames:
+                self._push_ring(frame, timestamp)
+
+    def start(self):
+        """
+        Bắt đầu recording (bao gồm các frame trong pre-trigger buffer)
+
+        Returns:
+            bool: True nếu bắt đầu thành công
+        """
+        with self._lock:
+            if self.is_recording:
+                logger.warning("Recording is already running")
+                return False
+
+            self._session_stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            # Chuyển frame pre-trigger sang encoder; ring cấp phát buffers mới
+            buffered = self._drain_ring()
+            for item in buffered:
+                try:
+                    self._queue.put_nowait(item)
+                except queue.Full:
+                    self.dropped += 1
+            self.is_recording = True
+
+        logger.info(f"Recording started ({len(buffered)} pre-trigger frames)")
+        return True
+
+    def stop(self):
+        """Dừng recording (encoder ghi nốt các frame đang chờ)"""
+        with self._lock:
+            if not self.is_recording:
+                return
+            self.is_recording = False
+        # Sentinel đưa vào ngoài lock để push() không bị block theo
+        self._put_control(_STOP)
+        logger.info("Recording stopped")
+
+    def close(self, timeout=5.0):
+        """Dừng recording và encoder thread"""
+        self.stop()
+        self._put_control(None)
+        self._thread.join(timeout)
+
+    def get_stats(self):
+        """
+        Returns:
+            dict: {'recording', 'written', 'dropped', 'pending', 'segments'}
+        """
+        return {
+            'recording': self.is_recording,
+            'written': self.written,
+            'dropped': self.dropped,
+            'pending': self._queue.qsize(),
+            'segments': list(self.segments),
+        }
+
+    def _put_control(self, item):
+        """
+        Đưa sentinel vào queue không block: queue đầy thì bỏ frame cũ nhất
+
+        Args:
+            item: _STOP (đóng segment) hoặc None (dừng encoder thread)
+        """
+        # Giữ lock để push() không chiếm chỗ vừa giải phóng (mọi thao tác đều non-blocking)
+        with self._lock:
+            while True:
+                try:
+                    self._queue.put_nowait(item)
+                    return
+                except queue.Full:
+                    pass
+                try:
+                    oldest = self._queue.get_nowait()
+                except queue.Empty:
+                    continue
+                if oldest is None or (oldest is _STOP and item is _STOP):
+                    # Sentinel đang chờ đã đủ để đóng segment/dừng encoder
+                    self._queue.put_nowait(oldest)
+                    return
+                if oldest is not _STOP:
+                    self.dropped += 1
+
+    def _push_ring(self, frame, timestamp):
+        """Copy frame vào pre-trigger ring (không cấp phát khi đã đủ buffers)"""
+        if len(self._ring) < self.pre_trigger_frames:
+            self._ring.append(frame.copy())
+            self._ring_times.append(timestamp)
+        else:
+            buffer = self._ring[self._ring_next]
+            if buffer.shape != frame.shape:
+                buffer = self._ring[self._ring_next] = frame.copy()
+            else:
+                np.copyto(buffer, frame)
+            self._ring_times[self._ring_next] = timestamp
+        self._ring_next = (self._ring_next + 1) % self.pre_trigger_frames
+        self._ring_count = min(self._ring_count + 1, self.pre_trigger_frames)
+
+    def _drain_ring(self):
+        """Lấy các frame trong ring theo thứ tự thời gian và reset ring"""
+        count = self._ring_count
+        size = len(self._ring)
+        start = (self._ring_next - count) % size if size else 0
+        items = [(self._ring[(start + i) % size], self._ring_times[(start + i) % size])
+                 for i in range(count)]
+        self._ring = []
+        self._ring_times = []
+        self._ring_next = 0
+        self._ring_count = 0
+        return items
+
+    def _run(self):
+        """Encoder thread"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._close_segment()
+                break
+            if item is _STOP:
+                self._close_segment()
+                continue
+
+            frame, timestamp = item
+            try:
+                self._write(frame, timestamp)
+            except Exception as e:
+                logger.error(f"Error writing recording: {e}")
+                self._close_segment()
+
+    def _write(self, frame, timestamp):
+        """Ghi frame, mở/chia segment khi cần"""
+        height, width = frame.shape[:2]
+        if self._writer is not None and self._needs_rotation(width, height, timestamp):
+            self._close_segment()
+
+        if self._writer is None:
+            self._open_segment(width, height, timestamp)
+
+        self._writer.write(frame)
+        self.written += 1
+
+    def _needs_rotation(self, width, height, timestamp):
+        """Kiểm tra có cần mở segment mới không"""
+        if self._segment_size != (width, height):
+            return True
+        if self.segment_seconds and timestamp - self._segment_start >= self.segment_seconds:
+            return True
+        if self.segment_bytes and os.path.exists(self._segment_path):
+            return os.path.getsize(self._segment_path) >= self.segment_bytes
+        return False
+
+    def _open_segment(self, width, height, timestamp):
+        """Mở file video cho segment mới"""
+        os.makedirs(self.directory, exist_ok=True)
+        index = len(self.segments)
+        filename = f"{self.prefix}_{self._session_stamp}_part{index:03d}{self.ext}"
+        path = os.path.join(self.directory, filename)
+
+        fourcc = cv2.VideoWriter_fourcc(*VIDEO_CODECS[self.ext])
+        writer = cv2.VideoWriter(path, fourcc, self.fps, (width, height))
+        if not writer.isOpened():
+            raise IOError(f"Cannot open video writer: {path}")
+
+        self._writer = writer
+        self._segment_path = path
+        self._segment_start = timestamp
+        self._segment_size = (width, height)
+        self.segments.append(path)
+        logger.info(f"Recording segment opened: {path}")
+
+    def _close_segment(self):
+        """Đóng segment hiện tại"""
+        if self._writer is not None:
+            self._writer.release()
+            self._writer = None
+            logger.info(f"Recording segment closed: {self._segment_path}")
@@ -0,0 +1,423 @@
+"""
+Streaming module
+HTTP server (asyncio) phát thermal stream dạng MJPEG và snapshot cho máy headless/remote
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+
+import cv2
+import numpy as np
+
+# Add current directory to path để import modules
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from frame_pool import FrameHandle
+from pipeline import FrameMailbox
+from utils.logger import logger
+
+
+BOUNDARY = 'thermalframe'
+
+INDEX_PAGE = (
+    "<!DOCTYPE html><html><head><title>Thermal Camera</title></head>"
+    "<body style='margin:0;background:#1e1e1e'>"
+    "<img src='/stream' style='display:block;margin:auto;max-width:100%;max-height:100vh'>"
+    "</body></html>"
+)
+
+
+class MjpegStreamer:
+    """MJPEG server: mỗi frame encode JPEG một lần, dùng chung cho mọi client"""
+
+    def __init__(self, host='127.0.0.1', port=8080, jpeg_quality=80, client_timeout=5.0,
+                 write_buffer=256 * 1024):
+        """
+        Khởi tạo streamer
+
+        Args:
+            host (str): Địa chỉ bind (mặc định chỉ localhost)
+            port (int): Port (0 = port tự chọn)
+            jpeg_quality (int): Chất lượng JPEG (0-100)
+            client_timeout (float): Ngắt client không nhận dữ liệu trong N giây
+            write_buffer (int): Giới hạn buffer gửi của mỗi client (bytes)
+        """
+        self.host = host
+        self.port = port
+        self.jpeg_quality = jpeg_quality
+        self.client_timeout = client_timeout
+        self.write_buffer = write_buffer
+
+        self.clients = 0
+        self.encoded = 0
+        self.published = 0
+        self.dropped_clients = 0
+
+        # Frame mới nhất từ pipeline (frame chưa kịp encode bị thay)
+        self._mailbox = FrameMailbox()
+        self._latest = None
+        self._latest_seq = 0
+        self._copy = None
+        self._jpeg = None
+        self._jpeg_seq = 0
+        self._encode_lock = threading.Lock()
+        self._wakeup = threading.Event()
+
+        self._loop = None
+        self._server = None
+        self._frame_event = None
+        self._client_tasks = set()
+        self._client_writers = set()
+        self._thread = None
+        self._encoder = None
+        self._running = False
+        self._ready = threading.Event()
+
+    def start(self):
+        """
+        Chạy server trên thread riêng
+
+        Returns:
+            bool: True nếu server đã listen
+        """
+        if self._running:
+            return True
+
+        self._running = True
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run_loop, name="mjpeg-server", daemon=True)
+        self._thread.start()
+        self._encoder = threading.Thread(target=self._encode_loop, name="mjpeg-encoder", daemon=True)
+        self._encoder.start()
+
+        self._ready.wait(5.0)
+        if self._server is None:
+            self.stop()
+            return False
+
+        logger.info(f"MJPEG server listening on http://{self.host}:{self.port}/")
+        return True
+
+    def stop(self):
+        """Dừng server và ngắt mọi client"""
+        if not self._running:
+            return
+        self._running = False
+        self._wakeup.set()
+
+        if self._loop is not None and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._shutdown)
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+        if self._encoder is not None:
+            self._encoder.join(timeout=5.0)
+        self._thread = None
+        self._encoder = None
+        logger.info("MJPEG server stopped")
+
+    def attach(self, camera_handler):
+        """Nhận frame từ camera handler (listener chạy trên presenter thread)"""
+        camera_handler.add_frame_listener(self.publish)
+
+    def detach(self, camera_handler):
+        """Ngừng nhận frame từ camera handler"""
+        camera_handler.remove_frame_listener(self.publish)
+
+    def publish(self, frame):
+        """
+        Đưa frame mới vào stream (không bao giờ block pipeline)
+
+        Args:
+            frame (FrameHandle | numpy.ndarray): Thermal frame (ndarray sẽ được copy)
+        """
+        if not isinstance(frame, FrameHandle):
+            # Caller có thể ghi đè buffer ngay sau khi gọi -> giữ bản copy riêng
+            frame = frame.copy()
+        self._mailbox.post(frame)
+        self.published += 1
+        self._wakeup.set()
+
+    def get_stats(self):
+        """
+        Returns:
+            dict: {'clients', 'published', 'encoded', 'dropped_clients'}
+        """
+        return {
+            'clients': self.clients,
+            'published': self.published,
+            'encoded': self.encoded,
+            'dropped_clients': self.dropped_clients,
+        }
+
+    def get_snapshot(self):
+        """
+        JPEG của frame mới nhất (encode nếu chưa có)
+
+        Returns:
+            bytes: JPEG hoặc None nếu chưa có frame
+        """
+        self._take_latest()
+        return self._encode_latest()
+
+    def _take_latest(self):
+        """Lấy frame mới nhất từ mailbox (nếu có)"""
+        item = self._mailbox.take()
+        if item is None:
+            return
+        with self._encode_lock:
+            if isinstance(item, FrameHandle):
+                # Copy ra khỏi frame slot để encode không bị rách
+                data = item.thermal
+                if self._copy is None or self._copy.shape != data.shape:
+                    self._copy = np.empty_like(data)
+                np.copyto(self._copy, data)
+                if not item.is_valid():
+                    return
+                item = self._copy
+            self._latest = item
+            self._latest_seq += 1
+
+    def _encode_latest(self):
+        """Encode frame mới nhất một lần duy nhất (cache theo seq)"""
+        with self._encode_lock:
+            if self._latest is None:
+                return None
+            if self._jpeg_seq != self._latest_seq:
+                ok, buffer = cv2.imencode('.jpg', self._latest,
+                                          [cv2.IMWRITE_JPEG_QUALITY, int(self.jpeg_quality)])
+                if not ok:
+                    logger.warning("JPEG encoding failed")
+                    return self._jpeg
+                self._jpeg = buffer.tobytes()
+                self._jpeg_seq = self._latest_seq
+                self.encoded += 1
+            return self._jpeg
+
+    def _encode_loop(self):
+        """Encoder thread: encode frame mới khi có client đang xem"""
+        while self._running:
+            self._wakeup.wait(0.5)
+            self._wakeup.clear()
+            if not self._running:
+                break
+
+            if not self.clients:
+                continue
+            self._take_latest()
+            jpeg_seq = self._jpeg_seq
+            if self._encode_latest() is not None and self._jpeg_seq != jpeg_seq:
+                try:
+                    self._loop.call_soon_threadsafe(self._notify_frame)
+                except RuntimeError:
+                    # Event loop đã đóng trong lúc stop()
+                    break
+
+    def _notify_frame(self):
+        """Đánh thức mọi client đang chờ frame mới (chạy trên event loop)"""
+        event = self._frame_event
+        self._frame_event = asyncio.Event()
+        event.set()
+
+    def _run_loop(self):
+        """Event loop thread"""
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._frame_event = asyncio.Event()
+        try:
+            self._server = self._loop.run_until_complete(
+                asyncio.start_server(self._handle_client, self.host, self.port)
+            )
+            self.port = self._server.sockets[0].getsockname()[1]
+        except OSError as e:
+            logger.error(f"Cannot start MJPEG server on {self.host}:{self.port}: {e}")
+            self._server = None
+            self._ready.set()
+            self._loop.close()
+            return
+
+        self._ready.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.run_until_complete(self._loop.shutdown_asyncgens())
+            self._loop.close()
+
+    def _shutdown(self):
+        """Đóng server và client tasks (chạy trên event loop)"""
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        # Abort transport để drain() đang chờ client chậm kết thúc ngay
+        for writer in list(self._client_writers):
+            writer.transport.abort()
+        for task in list(self._client_tasks):
+            task.cancel()
+
+        async def finish():
+            if self._client_tasks:
+                await asyncio.gather(*self._client_tasks, return_exceptions=True)
+            self._loop.stop()
+
+        self._loop.create_task(finish())
+
+    async def _handle_client(self, reader, writer):
+        """Xử lý một HTTP request"""
+        task = asyncio.current_task()
+        self._client_tasks.add(task)
+        self._client_writers.add(writer)
+        writer.transport.set_write_buffer_limits(high=self.write_buffer)
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.client_timeout)
+            parts = request.split(b"\r\n", 1)[0].decode('latin-1').split()
+            if len(parts) < 2 or parts[0] != 'GET':
+                await self._send(writer, 405, 'text/plain', b"Method Not Allowed")
+                return
+
+            path = parts[1].split('?', 1)[0]
+            if path == '/stream':
+                await self._stream(writer)
+            elif path == '/snapshot':
+                jpeg = await self._loop.run_in_executor(None, self.get_snapshot)
+                if jpeg is None:
+                    await self._send(writer, 503, 'text/plain', b"No frame available")
+                else:
+                    await self._send(writer, 200, 'image/jpeg', jpeg)
+            elif path == '/stats':
+                body = json.dumps(self.get_stats()).encode()
+                await self._send(writer, 200, 'application/json', body)
+            elif path == '/':
+                await self._send(writer, 200, 'text/html; charset=utf-8', INDEX_PAGE.encode())
+            else:
+                await self._send(writer, 404, 'text/plain', b"Not Found")
+
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Error serving client: {e}")
+        finally:
+            self._client_tasks.discard(task)
+            self._client_writers.discard(writer)
+            writer.close()
+
+    async def _send(self, writer, status, content_type, body):
+        """Gửi response đơn giản"""
+        reason = {200: 'OK', 404: 'Not Found', 405: 'Method Not Allowed',
+                  503: 'Service Unavailable'}.get(status, '')
+        header = (f"HTTP/1.1 {status} {reason}\r\n"
+                  f"Content-Type: {content_type}\r\n"
+                  f"Content-Length: {len(body)}\r\n"
+                  "Cache-Control: no-cache\r\n"
+                  "Connection: close\r\n\r\n")
+        writer.write(header.encode() + body)
+        if not await self._drain(writer):
+            raise asyncio.TimeoutError()
+
+    async def _drain(self, writer):
+        """
+        Chờ buffer gửi của client xả bớt, tối đa client_timeout
+
+        Returns:
+            bool: False nếu client không nhận dữ liệu kịp
+        """
+        drain = asyncio.ensure_future(writer.drain())
+        try:
+            done, _ = await asyncio.wait({drain}, timeout=self.client_timeout)
+        finally:
+            if not drain.done():
+                drain.cancel()
+        if not done:
+            return False
+        drain.result()
+        return True
+
+    async def _stream(self, writer):
+        """Gửi multipart MJPEG tới khi client ngắt kết nối"""
+        writer.write((f"HTTP/1.1 200 OK\r\n"
+                      f"Content-Type: multipart/x-mixed-replace; boundary={BOUNDARY}\r\n"
+                      "Cache-Control: no-cache\r\n"
+                      "Connection: close\r\n\r\n").encode())
+        self.clients += 1
+        self._wakeup.set()
+        sent_seq = None
+        try:
+            while True:
+                jpeg, seq = self._jpeg, self._jpeg_seq
+                if jpeg is None or seq == sent_seq:
+                    await self._frame_event.wait()
+                    continue
+
+                writer.write((f"--{BOUNDARY}\r\n"
+                              "Content-Type: image/jpeg\r\n"
+                              f"Content-Length: {len(jpeg)}\r\n\r\n").encode())
+                writer.write(jpeg)
+                writer.write(b"\r\n")
+                sent_seq = seq
+                # Client chậm chỉ bỏ lỡ frame (luôn gửi frame mới nhất), không làm chậm ai khác
+                if not await self._drain(writer):
+                    self.dropped_clients += 1
+                    logger.warning("MJPEG client too slow, disconnected")
+                    return
+        finally:
+            self.clients -= 1
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Serve the thermal stream as MJPEG over HTTP")
+    parser.add_argument('source', nargs='?', default=None,
+                        help="Camera index, video file, image directory or synthetic[:WxH[:N]] (default: auto camera)")
+    parser.add_argument('--host', default='127.0.0.1', help="Bind address (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=8080, help="Port (default: 8080)")
+    parser.add_argument('--quality', type=int, default=80, help="JPEG quality (default: 80)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Headless mode: capture + thermal + MJPEG server"""
+    from camera_handler import ThermalCameraHandler
+    from frame_source import open_frame_source
+
+    args = parse_args(argv)
+
+    frame_source = None
+    if args.source is not None:
+        try:
+            frame_source = open_frame_source(args.source, loop=True)
+        except ValueError as e:
+            print(f"Error: {e}")
+            return 1
+
+    handler = ThermalCameraHandler(frame_source=frame_source)
+    handler.realtime = True
+    streamer = MjpegStreamer(args.host, args.port, jpeg_quality=args.quality)
+    if not streamer.start():
+        print(f"Error: Cannot listen on {args.host}:{args.port}")
+        return 1
+
+    streamer.attach(handler)
+    if not handler.start_capture():
+        print("Error: Cannot start camera")
+        streamer.stop()
+        return 1
+
+    print(f"Streaming on http://{args.host}:{streamer.port}/ (Ctrl+C to stop)")
+    try:
+        while handler.is_running:
+            time.sleep(0.5)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        handler.stop_capture()
+        streamer.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,11 +5,11 @@ Giao diện Tkinter với dark mode theme
 
 import tkinter as tk
 from tkinter import ttk, messagebox
-import cv2
-from PIL import Image, ImageTk
 import threading
 import os
+import time
 from camera_handler import ThermalCameraHandler
+from display import DisplayPresenter
 from utils.logger import logger
 
 
@@ -25,6 +25,17 @@ class ThermalCameraUI:
         self.is_camera_running = False
         self.current_photo = None
         
+        # Frame hand-off: Tk timer lấy frame mới nhất từ mailbox
+        self.display_fps = 60
+        self.poll_interval_ms = max(1, int(1000 / self.display_fps))
+        self._poll_job = None
+        self.frames_displayed = 0
+        self.frames_torn = 0
+        
+        # Status line FPS/latency cập nhật định kỳ (không phải mỗi frame)
+        self.metrics_interval = 0.5
+        self._metrics_updated_at = 0.0
+        
         # Dark mode colors
         self.colors = {
             'bg': '#2b2b2b',
@@ -87,6 +98,9 @@ class ThermalCameraUI:
         )
         self.video_label.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
+        # Display presenter - cache kích thước, tái sử dụng PhotoImage
+        self.display = DisplayPresenter(self.video_label)
+        
         # Control buttons frame
         self.control_frame = tk.Frame(
             self.main_frame,
@@ -197,14 +211,14 @@ class ThermalCameraUI:
             
             # Start camera in separate thread để không block UI
             def start_camera_thread():
-                success = self.camera_handler.start_capture(self._update_frame)
+                # Frame đi qua camera_handler.frame_mailbox, không callback từ thread này
+                success = self.camera_handler.start_capture()
                 
                 if success:
                     self.is_camera_running = True
                     self.root.after(0, self._on_camera_started)
                 else:
-                    self.root.after(0, lambda: self._update_status("Failed to start camera"))
-                    messagebox.showerror("Error", "Cannot start camera. Please check if camera is available.")
+                    self.root.after(0, self._on_camera_failed)
             
             threading.Thread(target=start_camera_thread, daemon=True).start()
             
@@ -212,6 +226,11 @@ class ThermalCameraUI:
             logger.error(f"Error starting camera: {e}")
             messagebox.showerror("Error", f"Failed to start camera: {e}")
     
+    def _on_camera_failed(self):
+        """Callback khi không start được camera (chạy trên Tk thread)"""
+        self._update_status("Failed to start camera")
+        messagebox.showerror("Error", "Cannot start camera. Please check if camera is available.")
+    
     def _on_camera_started(self):
         """Callback khi camera đã start thành công"""
         self.start_btn.config(state=tk.DISABLED)
@@ -238,24 +257,91 @@ class ThermalCameraUI:
             messagebox.showerror("Error", f"Failed to stop camera: {e}")
     
     def _capture_image(self):
-        """Capture current frame"""
+        """Capture current frame (encode và lưu ở background)"""
         try:
             if not self.is_camera_running:
                 messagebox.showwarning("Warning", "Camera is not running")
                 return
             
-            filepath = self.camera_handler.capture_image()
+            def on_saved(filepath):
+                # Gọi từ writer thread -> chuyển về Tk thread
+                self.root.after(0, lambda: self._on_image_captured(filepath))
             
-            if filepath:
-                self._update_status(f"Image saved: {os.path.basename(filepath)}")
-                messagebox.showinfo("Success", f"Image captured and saved:\n{filepath}")
-            else:
+            future = self.camera_handler.capture_image_async(callback=on_saved)
+            
+            if future is None:
                 messagebox.showerror("Error", "Failed to capture image")
+            else:
+                self._update_status("Saving image...")
                 
         except Exception as e:
             logger.error(f"Error capturing image: {e}")
             messagebox.showerror("Error", f"Failed to capture image: {e}")
     
+    def _on_image_captured(self, filepath):
+        """Callback khi capture đã ghi xong (chạy trên Tk thread)"""
+        if filepath:
+            self._update_status(f"Image saved: {os.path.basename(filepath)}")
+        else:
+            self._update_status("Failed to capture image")
+            messagebox.showerror("Error", "Failed to capture image")
+    
+    def _poll_frames(self):
+        """Lấy frame mới nhất từ mailbox theo timer của Tk (display refresh rate)"""
+        try:
+            handle = self.camera_handler.frame_mailbox.take()
+            if handle is not None:
+                start = time.perf_counter()
+                self._update_frame(handle.thermal)
+                now = time.perf_counter()
+                self.camera_handler.metrics.record('display', now - start)
+                if now - self._metrics_updated_at >= self.metrics_interval:
+                    self._metrics_updated_at = now
+                    self._update_metrics_line()
+                if handle.is_valid():
+                    self.frames_displayed += 1
+                else:
+                    # Slot bị ghi đè trong lúc render - frame kế tiếp sẽ thay thế
+                    self.frames_torn += 1
+            elif self.camera_handler.reconnecting:
+                # Không có frame mới trong lúc reconnect - vẫn cập nhật status line
+                now = time.perf_counter()
+                if now - self._metrics_updated_at >= self.metrics_interval:
+                    self._metrics_updated_at = now
+                    self._update_metrics_line()
+        finally:
+            self._poll_job = self.root.after(self.poll_interval_ms, self._poll_frames)
+    
+    def _update_metrics_line(self):
+        """Hiển thị FPS thực tế, latency end-to-end và thời gian từng stage"""
+        text = self.camera_handler.metrics.format_status()
+        pipeline_stats = self.camera_handler.get_pipeline_stats()
+        if pipeline_stats:
+            text += f" | latency {pipeline_stats['end_to_end']['avg_ms']:.0f} ms"
+        rate_stats = self.camera_handler.get_rate_stats()
+        if rate_stats['level']:
+            text += f" | quality: {rate_stats['level_name']}"
+        if not rate_stats['target_met']:
+            text += f" | target {rate_stats['target_fps']:.0f} FPS not met"
+        if self.camera_handler.reconnecting:
+            text += " | camera lost, reconnecting..."
+        self.info_label.config(text=text)
+    
+    def get_display_stats(self):
+        """
+        Thống kê hiển thị: số frame đã hiển thị và bị bỏ
+        
+        Returns:
+            dict: {'displayed', 'dropped', 'torn', 'posted'}
+        """
+        mailbox_stats = self.camera_handler.frame_mailbox.get_stats()
+        return {
+            'displayed': self.frames_displayed,
+            'dropped': mailbox_stats['dropped'],
+            'torn': self.frames_torn,
+            'posted': mailbox_stats['posted'],
+        }
+    
     def _update_frame(self, frame):
         """
         Update video display với frame mới
@@ -264,37 +350,7 @@ class ThermalCameraUI:
             frame (numpy.ndarray): Frame từ camera
         """
         try:
-            # Convert OpenCV frame (BGR) to PIL Image (RGB)
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            pil_image = Image.fromarray(frame_rgb)
-            
-            # Tính toán kích thước để fit toàn bộ video frame
-            frame_width = self.video_label.winfo_width()
-            frame_height = self.video_label.winfo_height()
-            
-            # Nếu chưa có kích thước thì dùng mặc định lớn
-            if frame_width <= 1 or frame_height <= 1:
-                display_size = (1000, 750)
-            else:
-                # Giữ tỷ lệ khung hình 4:3
-                aspect_ratio = 4/3
-                if frame_width/frame_height > aspect_ratio:
-                    display_width = int(frame_height * aspect_ratio)
-                    display_height = frame_height
-                else:
-                    display_width = frame_width
-                    display_height = int(frame_width / aspect_ratio)
-                
-                display_size = (max(display_width-10, 640), max(display_height-10, 480))
-            
-            pil_image = pil_image.resize(display_size, Image.Resampling.LANCZOS)
-            
-            # Convert to PhotoImage
-            photo = ImageTk.PhotoImage(pil_image)
-            
-            # Update label
-            self.video_label.configure(image=photo, text="")
-            self.video_label.image = photo  # Keep reference
+            self.display.render(frame)
             
         except Exception as e:
             logger.error(f"Error updating frame: {e}")
@@ -315,6 +371,10 @@ class ThermalCameraUI:
                 if self.is_camera_running:
                     self.camera_handler.stop_capture()
                 
+                if self._poll_job is not None:
+                    self.root.after_cancel(self._poll_job)
+                    self._poll_job = None
+                
                 logger.info("Application exiting")
                 self.root.quit()
                 self.root.destroy()
@@ -330,6 +390,7 @@ class ThermalCameraUI:
             self.root.protocol("WM_DELETE_WINDOW", self._exit_application)
             
             logger.info("Starting UI main loop")
+            self._poll_job = self.root.after(self.poll_interval_ms, self._poll_frames)
             self.root.mainloop()
             
         except Exception as e: